@@ -62,11 +62,42 @@ class ApiConfig {
   }
 }
 
+/// 解析 JWT 的 exp，距离过期不到一分钟（或解析失败）时返回 true
+bool tokenExpiresSoon(String token) {
+  try {
+    final parts = token.split('.');
+    final payload = jsonDecode(
+      utf8.decode(base64Url.decode(base64Url.normalize(parts[1]))),
+    );
+    final exp = (payload['exp'] as num).toInt();
+    final now = DateTime.now().millisecondsSinceEpoch ~/ 1000;
+    return exp - now < 60;
+  } catch (_) {
+    return true;
+  }
+}
+
 /// API 服务类 - 统一处理所有后端接口调用
 class ApiService {
-  final String? token;
+  String? token;
   
-  ApiService({this.token});
+  /// access token 快过期时调用，返回新的 access token（由 AuthService 提供）
+  final Future<String?> Function()? onTokenExpiring;
+  
+  ApiService({this.token, this.onTokenExpiring});
+  
+  /// access token 只有十几分钟有效期，快过期时先换一个新的再发请求
+  Future<void> _refreshTokenIfNeeded() async {
+    final current = token;
+    if (current != null && onTokenExpiring != null && tokenExpiresSoon(current)) {
+      token = await onTokenExpiring!() ?? current;
+    }
+  }
+  
+  Future<Map<String, String>> _authHeaders() async {
+    await _refreshTokenIfNeeded();
+    return ApiConfig.getHeaders(token);
+  }
   
   // ==================== 认证相关 ====================
   
@@ -152,13 +183,30 @@ class ApiService {
     }
   }
   
+  /// 用 refresh token 换一对新的 token（旧的 refresh token 随即作废）
+  Future<Map<String, dynamic>> refreshToken(String refreshToken) async {
+    final response = await http.post(
+      Uri.parse('${ApiConfig.baseUrl}/auth/refresh'),
+      headers: ApiConfig.getHeaders(null),
+      body: jsonEncode({
+        'refresh_token': refreshToken,
+      }),
+    );
+    
+    if (response.statusCode == 200) {
+      return jsonDecode(response.body);
+    } else {
+      throw Exception('刷新登录状态失败: ${response.body}');
+    }
+  }
+  
   // ==================== 用户相关 ====================
   
   /// 获取当前用户信息
   Future<Map<String, dynamic>> getCurrentUser() async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/users/me'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -187,7 +235,7 @@ class ApiService {
     
     final response = await http.put(
       Uri.parse('${ApiConfig.baseUrl}/users/me'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
       body: jsonEncode(body),
     );
     
@@ -204,6 +252,7 @@ class ApiService {
     final request = http.MultipartRequest('POST', uri);
     
     // 添加认证头
+    await _refreshTokenIfNeeded();
     if (token != null) {
       request.headers['Authorization'] = 'Bearer $token';
     }
@@ -277,7 +326,7 @@ class ApiService {
     
     final response = await http.get(
       uri,
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -298,7 +347,7 @@ class ApiService {
   }) async {
     final response = await http.post(
       Uri.parse('${ApiConfig.baseUrl}/posts/'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
       body: jsonEncode({
         'content': content,
         'amount': amount,
@@ -319,7 +368,7 @@ class ApiService {
   Future<PostModel> getPostDetail(int postId) async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/posts/$postId'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -345,7 +394,7 @@ class ApiService {
 
     final response = await http.get(
       uri,
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
 
     if (response.statusCode == 200) {
@@ -367,7 +416,7 @@ class ApiService {
   }) async {
     final response = await http.put(
       Uri.parse('${ApiConfig.baseUrl}/posts/$postId'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
       body: jsonEncode({
         'content': content,
         'amount': amount,
@@ -389,7 +438,7 @@ class ApiService {
   Future<void> deletePost(int postId) async {
     final response = await http.delete(
       Uri.parse('${ApiConfig.baseUrl}/posts/$postId'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
 
     if (response.statusCode != 204) {
@@ -403,7 +452,7 @@ class ApiService {
   Future<List<CommentModel>> getComments(int postId) async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/comments/?post_id=$postId'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -422,7 +471,7 @@ class ApiService {
   }) async {
     final response = await http.post(
       Uri.parse('${ApiConfig.baseUrl}/comments/'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
       body: jsonEncode({
         'post_id': postId,
         'content': content,
@@ -446,7 +495,7 @@ class ApiService {
   }) async {
     final response = await http.post(
       Uri.parse('${ApiConfig.baseUrl}/interactions/toggle?post_id=$postId&action=$action'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -462,7 +511,7 @@ class ApiService {
   Future<List<NotificationModel>> getNotifications() async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/notifications/'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -477,7 +526,7 @@ class ApiService {
   Future<void> markNotificationRead(int notificationId) async {
     final response = await http.put(
       Uri.parse('${ApiConfig.baseUrl}/notifications/$notificationId/read'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode != 200) {
@@ -489,7 +538,7 @@ class ApiService {
   Future<void> markAllNotificationsRead() async {
     final response = await http.put(
       Uri.parse('${ApiConfig.baseUrl}/notifications/read-all'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode != 200) {
@@ -503,7 +552,7 @@ class ApiService {
   Future<double> getRecoveryBalance() async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/recovery/balance'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -518,7 +567,7 @@ class ApiService {
   Future<LotteryPrize> drawLottery() async {
     final response = await http.post(
       Uri.parse('${ApiConfig.baseUrl}/recovery/lottery/draw'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -533,7 +582,7 @@ class ApiService {
   Future<List<RecoveryRecord>> getRecoveryRecords() async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/recovery/records'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -559,7 +608,7 @@ class ApiService {
     
     final response = await http.get(
       uri,
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -578,7 +627,7 @@ class ApiService {
   }) async {
     final response = await http.post(
       Uri.parse('${ApiConfig.baseUrl}/gifts/$giftId/exchange'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
       body: jsonEncode({
         'address': address,
         if (phone != null) 'phone': phone,
@@ -596,7 +645,7 @@ class ApiService {
   Future<List<ExchangeRecord>> getExchangeRecords() async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/gifts/exchange-records'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -613,7 +662,7 @@ class ApiService {
   Future<Map<String, dynamic>> getGrowthSummary() async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/growth/summary'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -638,7 +687,7 @@ class ApiService {
     
     final response = await http.get(
       uri,
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -655,7 +704,7 @@ class ApiService {
   Future<Map<String, dynamic>> getReviewSummary({String period = 'month'}) async {
     final response = await http.get(
       Uri.parse('${ApiConfig.baseUrl}/review/summary?period=$period'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
     );
     
     if (response.statusCode == 200) {
@@ -669,7 +718,7 @@ class ApiService {
   Future<void> saveReviewMessage(String message) async {
     final response = await http.post(
       Uri.parse('${ApiConfig.baseUrl}/review/message'),
-      headers: ApiConfig.getHeaders(token),
+      headers: await _authHeaders(),
       body: jsonEncode({
         'message': message,
       }),
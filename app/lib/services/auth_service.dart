@@ -4,10 +4,12 @@ import 'api_service.dart';
 /// 认证服务 - 管理用户登录状态和 token
 class AuthService {
   static const String _tokenKey = 'auth_token';
+  static const String _refreshTokenKey = 'refresh_token';
   static const String _userIdKey = 'user_id';
   static const String _phoneKey = 'user_phone';
   
   final ApiService _apiService = ApiService();
+  Future<String?>? _refreshing;
   
   /// 注册
   Future<bool> register(String phone, String code, String password) async {
@@ -24,6 +26,7 @@ class AuthService {
       // 保存 token
       final prefs = await SharedPreferences.getInstance();
       await prefs.setString(_tokenKey, token);
+      await _saveRefreshToken(prefs, response);
       
       // 保存用户信息
       if (response['user_id'] != null) {
@@ -55,6 +58,7 @@ class AuthService {
       // 保存 token
       final prefs = await SharedPreferences.getInstance();
       await prefs.setString(_tokenKey, token);
+      await _saveRefreshToken(prefs, response);
       
       // 保存用户信息（从 token 解析或从响应获取）
       if (response['user_id'] != null) {
@@ -86,6 +90,7 @@ class AuthService {
       // 保存 token
       final prefs = await SharedPreferences.getInstance();
       await prefs.setString(_tokenKey, token);
+      await _saveRefreshToken(prefs, response);
       
       // 保存用户信息（从 token 解析或从响应获取）
       if (response['user_id'] != null) {
@@ -118,13 +123,49 @@ class AuthService {
   Future<void> logout() async {
     final prefs = await SharedPreferences.getInstance();
     await prefs.remove(_tokenKey);
+    await prefs.remove(_refreshTokenKey);
     await prefs.remove(_userIdKey);
     await prefs.remove(_phoneKey);
   }
   
   /// 获取 API 服务实例（带 token）
+  /// access token 只有十几分钟有效期，快过期时由 ApiService 回调这里用 refresh token 换新的
   Future<ApiService> getApiService() async {
     final token = await getToken();
-    return ApiService(token: token);
+    return ApiService(token: token, onTokenExpiring: _refresh);
+  }
+  
+  static Future<void> _saveRefreshToken(
+    SharedPreferences prefs,
+    Map<String, dynamic> response,
+  ) async {
+    final refreshToken = response['refresh_token'] as String?;
+    if (refreshToken != null) {
+      await prefs.setString(_refreshTokenKey, refreshToken);
+    }
+  }
+  
+  /// 换新 token，成功时返回新的 access token；
+  /// 同时有多个请求要换时共用一次（refresh token 只能用一次）
+  Future<String?> _refresh() {
+    return _refreshing ??= _doRefresh().whenComplete(() => _refreshing = null);
+  }
+  
+  Future<String?> _doRefresh() async {
+    final prefs = await SharedPreferences.getInstance();
+    final refreshToken = prefs.getString(_refreshTokenKey);
+    if (refreshToken == null) {
+      return null;
+    }
+    try {
+      final response = await _apiService.refreshToken(refreshToken);
+      final token = response['access_token'] as String;
+      await prefs.setString(_tokenKey, token);
+      await _saveRefreshToken(prefs, response);
+      return token;
+    } catch (e) {
+      print('刷新登录状态失败: $e');
+      return null;
+    }
   }
 }
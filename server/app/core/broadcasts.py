@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.pubsub import broker
+from app.models.notification import Broadcast
+
+
+# 广播在通知列表里的 id 取负数，和个人通知的 id 区分开；
+# 标记已读 / 游标分页都靠符号判断是哪张表。
+# 合并排序按 (created_at, 输出 id) 倒序，所以广播表内部是 created_at 倒序、id 正序。
+
+
+def create_broadcast(db: Session, title: str, content: str) -> Broadcast:
+    """发一条全站广播：只写一行，提交后推给所有在线连接"""
+    broadcast = Broadcast(title=title, content=content)
+    db.add(broadcast)
+    db.commit()
+    db.refresh(broadcast)
+    broker.publish_all(
+        "notification",
+        {
+            "id": -broadcast.id,
+            "type": "system",
+            "title": broadcast.title,
+            "content": broadcast.content,
+        },
+    )
+    return broadcast
+
+
+def broadcast_rows(
+    db: Session,
+    registered_at: datetime | None,
+    seen_id: int,
+    before: tuple[datetime, int] | None,
+    take: int,
+) -> list[dict]:
+    """
+    取用户能看到的广播（注册之后发的），转成和通知列表一致的 dict。
+    before 是游标位置 (created_at, 输出 id)，只取排在它后面的。
+    """
+    stmt = select(Broadcast.id, Broadcast.title, Broadcast.content, Broadcast.created_at)
+    if registered_at is not None:
+        stmt = stmt.where(Broadcast.created_at >= registered_at)
+    if before is not None:
+        stmt = stmt.where(tuple_(Broadcast.created_at, -Broadcast.id) < before)
+    stmt = stmt.order_by(Broadcast.created_at.desc(), Broadcast.id).limit(take)
+    return [
+        {
+            "id": -row.id,
+            "type": "system",
+            "title": row.title,
+            "content": row.content,
+            "related_id": None,
+            "is_read": row.id <= seen_id,
+            "created_at": row.created_at,
+            "actor_count": 1,
+            "latest_actors": [],
+            "updated_at": row.created_at,
+        }
+        for row in db.execute(stmt)
+    ]
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.core import metrics
+from app.core.config import settings
+
+
+@dataclass
+class CachedPage:
+    body: bytes
+    headers: dict[str, str]
+    post_ids: list[int]
+    expires_at: float
+    size: int = field(init=False)
+
+    def __post_init__(self):
+        self.size = len(self.body)
+
+
+class FeedCache:
+    """
+    帖子流页面缓存。
+    - key 为 (tag, cursor, skip, limit)，value 是已经序列化好的响应字节
+    - 按总字节数做 LRU 淘汰，每条记录带 TTL
+    - 写操作按帖子 / 标签精确失效：
+      * 帖子内容或计数变化：只删包含该帖子的页
+      * 新帖 / 删帖：offset 分页整体会错位，删这些 feed 下所有 offset 页和首页；
+        游标页只包含比游标更早的帖子，新帖不会影响它们
+      * 改标签：帖子插入/移出某个标签流的中间位置，删整个标签流
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, CachedPage] = OrderedDict()
+        self._by_post: dict[int, set[tuple]] = {}
+        self._by_feed: dict[str, set[tuple]] = {}
+        self._bytes = 0
+        # 每次失效递增；写入时代数变了说明查询期间有写操作，结果可能已过期，不缓存
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(tag: str | None, cursor: str | None, skip: int, limit: int) -> tuple:
+        return (tag or "", cursor, 0 if cursor else skip, limit)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: tuple) -> CachedPage | None:
+        with self._lock:
+            page = self._entries.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            if page.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def set(
+        self,
+        key: tuple,
+        body: bytes,
+        headers: dict[str, str],
+        post_ids: list[int],
+        generation: int,
+    ) -> None:
+        page = CachedPage(
+            body=body,
+            headers=headers,
+            post_ids=post_ids,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        if page.size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = page
+            self._bytes += page.size
+            for post_id in post_ids:
+                self._by_post.setdefault(post_id, set()).add(key)
+            self._by_feed.setdefault(key[0], set()).add(key)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_post(self, post_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in list(self._by_post.get(post_id, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_offset_pages(self, feeds: list[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for feed in feeds:
+                for key in list(self._by_feed.get(feed, ())):
+                    if key[1] is None:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def invalidate_feeds(self, feeds: list[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for feed in feeds:
+                for key in list(self._by_feed.get(feed, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_post.clear()
+            self._by_feed.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: tuple) -> None:
+        page = self._entries.pop(key, None)
+        if page is None:
+            return
+        self._bytes -= page.size
+        for post_id in page.post_ids:
+            keys = self._by_post.get(post_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_post[post_id]
+        keys = self._by_feed.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_feed[key[0]]
+
+
+feed_cache = FeedCache(
+    max_bytes=settings.FEED_CACHE_MAX_BYTES,
+    ttl_seconds=settings.FEED_CACHE_TTL_SECONDS,
+)
+metrics.register("feed_cache", feed_cache.stats)
@@ -2,6 +2,13 @@ from pydantic_settings import BaseSettings
 import os
 
 
+def async_uri(uri: str) -> str:
+    """同步驱动的连接字符串换成对应的异步驱动"""
+    if uri.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + uri[len("postgresql://"):]
+    return "sqlite+aiosqlite://" + uri[len("sqlite://"):]
+
+
 class Settings(BaseSettings):
     """
     基础配置。
@@ -42,10 +49,104 @@ class Settings(BaseSettings):
             # SQLite 连接字符串（默认）
             return f"sqlite:///./{self.SQLITE_DB_PATH}"
 
+    # PostgreSQL 连接池（每个进程）
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+
+    # PostgreSQL 读副本：逗号分隔的 host 或 host:port（用户名、密码、库名和主库相同），为空表示不用副本。
+    # 只读请求（GET）读副本，写请求和刚写过数据的用户读主库；副本连不上或延迟过大时自动回到主库
+    POSTGRES_READ_REPLICAS: str = ""
+    DB_REPLICA_POOL_SIZE: int = 10  # 每个副本
+    DB_REPLICA_MAX_OVERFLOW: int = 20
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5
+    REPLICA_MAX_LAG_SECONDS: float = 5  # 复制延迟超过它的副本暂停使用
+    READ_YOUR_WRITES_SECONDS: float = 5  # 用户写入后这段时间内读主库，不要小于 REPLICA_MAX_LAG_SECONDS
+
+    @property
+    def POSTGRES_REPLICA_URIS(self) -> list[str]:
+        """读副本的连接字符串"""
+        uris = []
+        for entry in self.POSTGRES_READ_REPLICAS.split(","):
+            host, _, port = entry.strip().partition(":")
+            if host:
+                uris.append(
+                    f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+                    f"@{host}:{port or self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+                )
+        return uris
+
+    # SQLite 生产配置：每个连接设置 WAL、synchronous=NORMAL、mmap、缓存和 busy_timeout；
+    # 写操作排队使用唯一的写连接，读操作走只读连接池，读写互不阻塞
+    SQLITE_PRODUCTION: bool = False
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_READ_POOL_OVERFLOW: int = 32  # 读连接上限不低于线程池线程数（40），读请求不用排队
+    SQLITE_WRITE_TIMEOUT_SECONDS: float = 30  # 排队等写连接的最长时间
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 和其他进程（迁移脚本、归档脚本）抢写锁时的等待时间
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # 每个连接的页缓存
+    SQLITE_MMAP_SIZE_MB: int = 256
+
+    # 异步数据库引擎（PostgreSQL 用 asyncpg，SQLite 用 aiosqlite）。
+    # 开启后带数据库的接口在事件循环里执行，等数据库时不占线程；关闭时走同步引擎 + 线程池
+    DB_ASYNC: bool = False
+
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        """异步驱动的连接字符串"""
+        return async_uri(self.SQLALCHEMY_DATABASE_URI)
+
+    # 每个请求的 SQL 统计：响应头带语句数和数据库耗时（X-DB-Queries / Server-Timing），
+    # 单条语句超过 DB_SLOW_QUERY_MS 时输出一行 JSON 慢查询日志（0 表示不记）
+    DB_STATS_HEADERS: bool = True
+    DB_SLOW_QUERY_MS: float = 200
+    # 开发模式：同一个请求里同一条语句执行 DB_N_PLUS_ONE_THRESHOLD 次以上时输出 N+1 提示
+    DB_DEBUG: bool = False
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+
     # JWT 设置
     JWT_SECRET_KEY: str = "change-me-to-a-random-secret-in-production"
     JWT_ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 天
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # access token 只带用户 id，短期有效
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # 用 /auth/refresh 换新的一对 token，每次换完旧的作废
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 10  # 多进程部署时，其他进程吊销的 token 最多滞后这么久生效
+
+    # 鉴权缓存：已登录用户资料（按用户 id）和 JWT 解码结果（按 token 哈希）
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60
+    AUTH_TOKEN_CACHE_SIZE: int = 50000
+
+    # 密码哈希专用线程池：bcrypt 很慢，不能占满接口线程池；排队满了直接返回 503
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1  # bcrypt 是纯 CPU 活，多于核数只会抢走接口的 CPU
+    PASSWORD_HASH_QUEUE: int = 16
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # 老哈希的 cost 和它不一致时，登录成功后自动重新哈希
+
+    # 帖子流页面缓存（匿名访问的 GET /posts/）
+    FEED_CACHE_ENABLED: bool = True
+    FEED_CACHE_TTL_SECONDS: float = 30
+    FEED_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # 点赞写后合并：开启后点赞只追加增量记录，后台每隔一段时间批量合并到 posts.likes
+    LIKE_WRITE_BEHIND: bool = False
+    LIKE_FLUSH_INTERVAL_MS: int = 200
+    LIKE_FLUSH_BATCH: int = 10000
+
+    # 通知生成：点赞 / 评论事件进内存队列，后台线程批量写入 notifications
+    NOTIFY_ENABLED: bool = True
+    NOTIFY_QUEUE_SIZE: int = 10000
+    NOTIFY_BATCH_SIZE: int = 200
+    NOTIFY_BATCH_WAIT_MS: int = 50
+    # 同一帖子的同类未读通知在这个窗口内合并成一条（"N 人赞了你的吐槽"），0 表示不合并
+    NOTIFY_COALESCE_WINDOW_MINUTES: int = 24 * 60
+    # 已读通知保留天数，超过的由 archive_notifications.py 移到归档表
+    NOTIFY_ARCHIVE_AFTER_DAYS: int = 90
+
+    # 实时推送（SSE）：每个连接的待发队列长度、心跳间隔，多进程部署时后端换成 redis
+    PUSH_BACKEND: str = "local"  # local / redis
+    PUSH_REDIS_URL: str = "redis://localhost:6379/0"
+    PUSH_QUEUE_SIZE: int = 100
+    PUSH_HEARTBEAT_SECONDS: float = 15
+    # 浏览器 EventSource 不能带请求头，先用 access token 换一张推送凭证放在 ?ticket= 里，
+    # 凭证只能用来连 /notifications/stream，有效期很短，出现在访问日志里也无妨
+    STREAM_TICKET_EXPIRE_SECONDS: int = 60
 
     class Config:
         env_file = ".env"
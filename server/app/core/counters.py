@@ -0,0 +1,45 @@
+from typing import Optional
+
+from sqlalchemy import case, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.core.ranking import set_hot_score
+from app.models.post import Post
+
+
+# 帖子上的点赞数 / 评论数一律用单条 UPDATE ... SET x = x + :delta RETURNING 更新：
+# 加减在数据库里完成，并发请求只在行锁上排队，不会像 Python 里读-改-写那样丢更新。
+# RETURNING 同时带回算热度分需要的字段，省掉一次回读。
+
+
+def _bump(db: Session, post_id: int, column, delta: int) -> Optional[Row]:
+    new_value = column + delta
+    if delta < 0:
+        # 减到 0 为止，兼容历史上计数和互动记录不一致的数据
+        new_value = case((new_value < 0, 0), else_=new_value)
+    return db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values({column: new_value})
+        .returning(Post.likes, Post.comments_count, Post.created_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+
+def bump_likes(db: Session, post_id: int, delta: int) -> Optional[int]:
+    """原子地调整点赞数并刷新热度分，返回新的点赞数；帖子不存在时返回 None"""
+    row = _bump(db, post_id, Post.likes, delta)
+    if row is None:
+        return None
+    set_hot_score(db, post_id, row.likes, row.comments_count, row.created_at)
+    return row.likes
+
+
+def bump_comments(db: Session, post_id: int, delta: int) -> Optional[int]:
+    """原子地调整评论数并刷新热度分，返回新的评论数；帖子不存在时返回 None"""
+    row = _bump(db, post_id, Post.comments_count, delta)
+    if row is None:
+        return None
+    set_hot_score(db, post_id, row.likes, row.comments_count, row.created_at)
+    return row.comments_count
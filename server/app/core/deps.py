@@ -1,49 +1,153 @@
-from typing import Generator
+import time
+from typing import AsyncGenerator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from fastapi.security.utils import get_authorization_scheme_param
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.identity import token_cache, token_key, user_cache
+from app.core.revocation import revocations
+from app.core.security import ACCESS_TOKEN_TYPE, STREAM_TICKET_TYPE, decode_token
+from app.db.session import AsyncSessionLocal, SessionLocal, replicas
 from app.models.user import User
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db() -> Generator:
+async def get_db(request: Request) -> AsyncGenerator:
+    """
+    同步会话，接口本身仍在线程池里执行。
+    依赖写成 async 是为了让收尾的 close() 在事件循环里跑：同步依赖的收尾要再排一个线程池线程，
+    线程全被"等连接"的请求占满时，手里有连接的请求还不掉连接，就互相卡死到连接池超时
+    （SQLite 生产配置只有一个写连接，最容易碰到）。close() 只是回滚并归还连接，很快。
+    配置了读副本时按请求方法和当前用户选读库（见 app/db/replicas.py）。
+    """
     db = SessionLocal()
+    if replicas is not None:
+        replicas.route(db, request.method, peek_user_id(request))
     try:
         yield db
     finally:
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+async def get_async_db(request: Request) -> AsyncGenerator:
+    """DB_ASYNC 模式下的会话，由 app/core/routing.py 替换掉路由里的 get_db"""
+    async with AsyncSessionLocal() as db:
+        if replicas is not None:
+            replicas.route(db, request.method, peek_user_id(request))
+        yield db
+
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def decode_claims(token: str, token_type: str = ACCESS_TOKEN_TYPE) -> dict:
+    """校验 JWT（签名、过期、类型），返回声明，无效时抛 401；不检查吊销"""
+    try:
+        payload = decode_token(token)
+        int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise credentials_exception()
+    # 旧版 token 没有 typ，按 access token 处理，最多再用到它自己的 exp
+    if payload.get("typ", ACCESS_TOKEN_TYPE) != token_type:
+        raise credentials_exception()
+    return payload
+
+
+def decode_user_id(token: str) -> int:
+    """
+    校验 access token 并取出用户 id，无效或已吊销时抛 401。
+    解码结果按 token 哈希缓存到 JWT 过期为止；吊销名单在内存里，每次都查，不查库。
+    """
+    key = token_key(token)
+    claims = token_cache.get(key)
+    if claims is None:
+        payload = decode_claims(token)
+        claims = (int(payload["sub"]), payload.get("jti"), payload.get("iat"))
+        if "exp" in payload:
+            token_cache.set(key, claims, payload["exp"] - time.time())
+    user_id, jti, issued_at = claims
+    if revocations.is_revoked(jti, user_id, issued_at):
+        raise credentials_exception()
+    return user_id
+
+
+def decode_stream_ticket(ticket: str) -> int:
+    """
+    校验推送凭证并取出用户 id，无效、过期或已吊销时抛 401。
+    凭证只在建立连接时用一次，不进解码缓存；access token 在这里不认，推送凭证也不能当 access token 用
+    """
+    payload = decode_claims(ticket, STREAM_TICKET_TYPE)
+    user_id = int(payload["sub"])
+    if revocations.is_revoked(payload.get("jti"), user_id, payload.get("iat")):
+        raise credentials_exception()
+    return user_id
+
+
+def peek_user_id(request: Request) -> int | None:
+    """
+    读副本路由用：取请求里 token 对应的用户 id，没带 token 或 token 无效时返回 None。
+    这里不拦请求，鉴权仍由接口自己的 get_current_user / get_current_user_id 负责
+    """
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
-        sub: str | None = payload.get("sub")
-        if sub is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    user = db.query(User).filter(User.id == int(sub)).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        return decode_user_id(token)
+    except HTTPException:
+        return None
+
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """
+    只需要当前用户 id 的接口用这个：只校验 token，不加载用户。
+    纯内存计算，直接在事件循环里跑，不用为它占一个线程池线程
+    """
+    return decode_user_id(token)
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    return load_user(db, decode_user_id(token))
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """DB_ASYNC 模式下的 get_current_user，用户挂在接口同一个会话上"""
+    return await db.run_sync(load_user, decode_user_id(token))
+
+
+def load_user(db: Session, user_id: int) -> User:
+    values = user_cache.get(user_id)
+    if values is None:
+        row = db.execute(
+            select(*User.__table__.columns).where(User.id == user_id)
+        ).first()
+        # 只读了一行列值，马上结束读事务把连接还回去：
+        # 依赖返回后到接口开始执行之间还要再排一次线程池，不能一直占着连接
+        db.rollback()
+        if row is None:
+            raise credentials_exception()
+        values = row._asdict()
+        user_cache.set(user_id, values)
 
+    # 缓存里只存列值，每个请求拼一个新对象挂到自己的会话上（不查库），
+    # 之后修改它照常生成 UPDATE
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
@@ -0,0 +1,50 @@
+import hashlib
+
+from fastapi import Response, status
+
+
+def body_etag(body: bytes) -> str:
+    """按响应字节生成强 ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def row_etag(*rows, scope: str) -> str:
+    """
+    按 ORM 对象（或 Core 查询的行）的列值生成弱 ETag。
+    内容没变时可以直接返回 304，不用先做 Pydantic 校验和 JSON 序列化。
+    scope 标明是哪个接口、哪个用户的资源（如 "medals:42"），一起参与哈希：
+    否则不同接口、不同用户的空列表会得到同一个 ETag，共享缓存可能把别人的 304 返回回来。
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(scope.encode("utf-8"))
+    h.update(b"\x1d")
+    for row in rows:
+        if hasattr(row, "__mapper__"):
+            values = [getattr(row, attr.key) for attr in row.__mapper__.column_attrs]
+        else:
+            values = row
+        for value in values:
+            h.update(repr(value).encode("utf-8"))
+            h.update(b"\x1f")
+        h.update(b"\x1e")
+    return 'W/"' + h.hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 用弱比较：忽略 W/ 前缀"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == wanted
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={**(headers or {}), "ETag": etag},
+    )
@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import metrics
+from app.core.cache import feed_cache
+from app.core.config import settings
+from app.core.counters import bump_likes
+from app.models.interaction import LikeDelta
+
+PRUNE_CHUNK = 500  # 核对内存里的增量是否还在表里时，每条 IN 查询带的 id 数
+
+
+class LikeBuffer:
+    """
+    点赞写后合并（LIKE_WRITE_BEHIND）。
+    热门帖子被集中点赞时，每次点赞都要更新同一行 posts.likes，请求全部排在这一行上。
+    开启后：
+    - 点赞只在 like_deltas 追加一条 ±1，和互动记录同一个事务提交，不碰 posts 行
+    - 后台线程每 LIKE_FLUSH_INTERVAL_MS 毫秒用 DELETE ... RETURNING 取走一批增量，
+      按帖子求和后各做一次原子 UPDATE 并刷新热度分，和删除在同一个事务里提交
+    - 本进程记下尚未合并的增量，读帖子时叠加到 likes 上，所以读到的计数是准确的
+
+    崩溃恢复：增量先落库再算数，进程挂掉最多丢掉内存里的叠加值；
+    没合并的增量还在表里，启动时先同步合并一次，之后由任意进程的后台线程接着合并。
+    取走和累加在同一个事务里，事务失败就整体回滚、下次重试，每条增量只会被加一次。
+    多进程部署时，别的进程刚写入、还没合并的增量要等合并后才看得到（最多一个间隔）；
+    本进程记下的增量也可能被别的进程合并掉，每次合并后核对一遍，已经不在表里的从内存里去掉，
+    不会在 posts.likes 之外重复叠加。还没提交的增量别的连接看不到，不参与核对。
+    匿名帖子流缓存只在合并后失效，缓存页里的点赞数同样最多滞后一个间隔。
+    """
+
+    def __init__(self, interval_ms: int, batch: int):
+        self.interval = interval_ms / 1000
+        self.batch = batch
+        # post_id -> {增量记录 id: ±1}
+        self._pending: dict[int, dict[int, int]] = defaultdict(dict)
+        self._uncommitted: set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._session_factory: sessionmaker | None = None
+        self.recorded = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.merged_elsewhere = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def record(self, db: Session, post_id: int, delta: int) -> int:
+        """在调用方的事务里记一条增量，返回记录 id；调用方提交失败时要调用 discard"""
+        row = LikeDelta(post_id=post_id, delta=delta)
+        db.add(row)
+        db.flush()
+        # 提交前就记到内存：后台合并拿走这条记录后会把它从内存里删掉，顺序不会反
+        with self._lock:
+            self._pending[post_id][row.id] = delta
+            self._uncommitted.add(row.id)
+            self.recorded += 1
+        delta_id = row.id
+        event.listen(db, "after_commit", lambda session: self._committed(delta_id), once=True)
+        return delta_id
+
+    def _committed(self, delta_id: int) -> None:
+        with self._lock:
+            self._uncommitted.discard(delta_id)
+
+    def discard(self, post_id: int, delta_id: int) -> None:
+        """事务回滚时撤销记到内存的增量"""
+        with self._lock:
+            self._uncommitted.discard(delta_id)
+            self._forget(post_id, delta_id)
+
+    def _forget(self, post_id: int, delta_id: int) -> None:
+        """从内存里去掉一条增量（调用方持有锁）"""
+        deltas = self._pending.get(post_id)
+        if deltas is not None:
+            deltas.pop(delta_id, None)
+            if not deltas:
+                del self._pending[post_id]
+
+    def pending(self, post_id: int) -> int:
+        """本进程已记录、尚未合并到 posts.likes 的增量"""
+        if post_id not in self._pending:
+            return 0
+        with self._lock:
+            deltas = self._pending.get(post_id)
+            return sum(deltas.values()) if deltas else 0
+
+    def flush(self) -> int:
+        """合并一批增量，再核对内存里的增量是否已被别的进程合并，返回本次合并的记录数"""
+        t0 = time.perf_counter()
+        totals: dict[int, int] = defaultdict(int)
+        with self._session_factory() as db:
+            rows = db.execute(
+                delete(LikeDelta)
+                .where(
+                    LikeDelta.id.in_(
+                        select(LikeDelta.id).order_by(LikeDelta.id).limit(self.batch)
+                    )
+                )
+                .returning(LikeDelta.id, LikeDelta.post_id, LikeDelta.delta)
+                .execution_options(synchronize_session=False)
+            ).all()
+            if rows:
+                for row in rows:
+                    totals[row.post_id] += row.delta
+                for post_id, total in totals.items():
+                    if total:
+                        # 帖子已删除时 bump_likes 返回 None，增量直接丢弃
+                        bump_likes(db, post_id, total)
+                db.commit()
+                with self._lock:
+                    for row in rows:
+                        self._forget(row.post_id, row.id)
+                    self.flushed += len(rows)
+                    self.flushes += 1
+                    self.last_flush_ms = (time.perf_counter() - t0) * 1000
+            self._prune(db)
+        for post_id in totals:
+            feed_cache.invalidate_post(post_id)
+        return len(rows)
+
+    def _prune(self, db: Session) -> None:
+        """去掉内存里已经不在 like_deltas 表里（被别的进程合并掉）的已提交增量"""
+        with self._lock:
+            candidates = [
+                (post_id, delta_id)
+                for post_id, deltas in self._pending.items()
+                for delta_id in deltas
+                if delta_id not in self._uncommitted
+            ]
+        if not candidates:
+            return
+        ids = [delta_id for _, delta_id in candidates]
+        remaining = set()
+        for start in range(0, len(ids), PRUNE_CHUNK):
+            chunk = ids[start:start + PRUNE_CHUNK]
+            remaining.update(db.scalars(select(LikeDelta.id).where(LikeDelta.id.in_(chunk))))
+        gone = [(post_id, delta_id) for post_id, delta_id in candidates if delta_id not in remaining]
+        if not gone:
+            return
+        with self._lock:
+            for post_id, delta_id in gone:
+                self._forget(post_id, delta_id)
+            self.merged_elsewhere += len(gone)
+
+    def start(self, session_factory: sessionmaker) -> None:
+        """先同步合并启动前遗留的增量，再启动后台线程"""
+        if self._thread is not None:
+            return
+        self._session_factory = session_factory
+        while self.flush() >= self.batch:
+            pass
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="like-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程，并把剩下的增量全部合并"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        while self.flush() >= self.batch:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                while self.flush() >= self.batch:
+                    pass
+            except Exception as e:  # noqa: BLE001
+                # 合并失败时事务已回滚，增量还在表里，下个周期重试
+                self.flush_errors += 1
+                print(f"警告: 合并点赞增量失败: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending_posts = len(self._pending)
+            pending = sum(len(d) for d in self._pending.values())
+        return {
+            "enabled": self.enabled,
+            "pending": pending,
+            "pending_posts": pending_posts,
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "merged_elsewhere": self.merged_elsewhere,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+
+like_buffer = LikeBuffer(
+    interval_ms=settings.LIKE_FLUSH_INTERVAL_MS,
+    batch=settings.LIKE_FLUSH_BATCH,
+)
+metrics.register("like_buffer", like_buffer.stats)
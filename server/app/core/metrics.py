@@ -0,0 +1,13 @@
+from typing import Callable
+
+
+# 各组件把自己的统计函数注册进来，/metrics 统一输出
+_collectors: dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, collector: Callable[[], dict]) -> None:
+    _collectors[name] = collector
+
+
+def snapshot() -> dict:
+    return {name: collector() for name, collector in _collectors.items()}
@@ -0,0 +1,326 @@
+import json
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.pubsub import broker
+from app.core.unread import bump_unread, get_unread
+from app.models.notification import Notification
+from app.models.post import Post
+from app.models.user import User
+
+
+@dataclass
+class NotificationEvent:
+    """一次会产生通知的操作：type 为 like / comment，actor 是操作人"""
+
+    type: str
+    actor_id: int
+    post_id: int
+    text: str | None = None  # 评论内容
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+_STOP = object()
+SNIPPET_LENGTH = 30
+LATEST_ACTORS = 3  # 合并通知里保留的最近操作人个数
+
+
+def _snippet(text: str | None) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH] + "…"
+
+
+def _render(event: NotificationEvent, post, actors: list[dict], count: int) -> tuple[str, str]:
+    """按合并后的人数生成标题和内容"""
+    names = [a["nickname"] or "有位亏友" for a in actors]
+    if event.type == "like":
+        who = names[0] if count == 1 else f"{'、'.join(names[:2])} 等 {count} 人"
+        return "有人赞了你的吐槽", f"{who} 赞了你的吐槽：{_snippet(post.content)}"
+    title = "你的吐槽有新评论" if count == 1 else f"你的吐槽有 {count} 条新评论"
+    return title, f"{names[0]}：{_snippet(event.text)}"
+
+
+class Notifier:
+    """
+    通知生成管道。
+    点赞、评论接口提交事务后调用 publish 把事件放进有界队列就返回，不在请求里写通知；
+    后台线程攒一批（最多 batch_size 条或等 batch_wait 秒）后，
+    一次查出帖子作者和操作人昵称，合并同类事件后批量 INSERT / UPDATE。
+    - 内存有界：队列满时 publish 不等待，直接丢弃并计数，宁可少发通知也不拖慢点赞 / 评论
+      （DB_ASYNC 模式下 publish 在事件循环里调用，不能阻塞）
+    - 一批写入失败时这批事件不重试，计入 lost
+    - 关闭时放入结束标记，后台线程把队列里剩下的事件写完再退出
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        batch_size: int,
+        batch_wait_ms: int,
+        coalesce_window_minutes: int,
+    ):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.coalesce_window = (
+            timedelta(minutes=coalesce_window_minutes) if coalesce_window_minutes > 0 else None
+        )
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: threading.Thread | None = None
+        self._session_factory: sessionmaker | None = None
+        self.published = 0
+        self.dropped = 0
+        self.written = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.batches = 0
+        self.errors = 0
+        self.lost = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def publish(self, event: NotificationEvent) -> bool:
+        """放入队列，返回是否成功；管道没启动时直接忽略"""
+        if self._thread is None:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.published += 1
+        return True
+
+    def start(self, session_factory: sessionmaker) -> None:
+        if self._thread is not None:
+            return
+        self._session_factory = session_factory
+        self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        """停止接收新事件，等后台线程把队列写完"""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write_safely(batch)
+        # 结束标记之后不会再有新事件，把剩下的写完
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        for start in range(0, len(rest), self.batch_size):
+            self._write_safely(rest[start:start + self.batch_size])
+
+    def _write_safely(self, batch: list[NotificationEvent]) -> None:
+        try:
+            with self._session_factory() as db:
+                inserted, coalesced, touched = self.write(db, batch)
+                db.commit()
+        except Exception as e:  # noqa: BLE001
+            self.errors += 1
+            self.lost += len(batch)
+            print(f"警告: 写入通知失败（{len(batch)} 条事件）: {e}")
+            return
+        try:
+            with self._session_factory() as db:
+                self._push(db, touched)
+        except Exception as e:  # noqa: BLE001
+            print(f"警告: 推送通知失败: {e}")
+        self.written += inserted
+        self.coalesced += coalesced
+        self.skipped += len(batch) - inserted - coalesced
+        lag = (time.monotonic() - min(event.queued_at for event in batch)) * 1000
+        self.last_lag_ms = lag
+        self.max_lag_ms = max(self.max_lag_ms, lag)
+        self.batches += 1
+
+    def write(
+        self, db: Session, batch: list[NotificationEvent]
+    ) -> tuple[int, int, list[dict]]:
+        """
+        把一批事件转成通知写入（在调用方的事务里），
+        返回 (新插入的行数, 合并掉的事件数, 新增或更新的通知内容)。
+        同一接收人、同一帖子、同一类型的事件合并成一行：先在本批内合并，
+        再并入窗口内还没读的已有通知（原地 UPDATE），都没有才插入新行。
+        """
+        post_ids = {event.post_id for event in batch}
+        posts = {
+            row.id: row
+            for row in db.execute(
+                select(Post.id, Post.user_id, Post.content).where(Post.id.in_(post_ids))
+            )
+        }
+        actor_ids = {event.actor_id for event in batch}
+        nicknames = dict(
+            db.execute(select(User.id, User.nickname).where(User.id.in_(actor_ids))).all()
+        )
+
+        groups: dict[tuple, list[NotificationEvent]] = {}
+        for event in batch:
+            post = posts.get(event.post_id)
+            # 帖子已删除或者是自己给自己点赞 / 评论，不发通知
+            if post is None or post.user_id == event.actor_id:
+                continue
+            key = (post.user_id, event.type, str(event.post_id))
+            if self.coalesce_window is None:
+                key += (len(groups),)  # 不合并：每个事件单独一组
+            groups.setdefault(key, []).append(event)
+        if not groups:
+            return 0, 0, []
+
+        existing = {}
+        if self.coalesce_window is not None:
+            cutoff = datetime.utcnow() - self.coalesce_window
+            rows = db.execute(
+                select(
+                    Notification.id,
+                    Notification.user_id,
+                    Notification.type,
+                    Notification.related_id,
+                    Notification.actor_count,
+                    Notification.latest_actors,
+                )
+                .where(
+                    Notification.user_id.in_({key[0] for key in groups}),
+                    Notification.type.in_({key[1] for key in groups}),
+                    Notification.related_id.in_({key[2] for key in groups}),
+                    Notification.is_read.is_(False),
+                    Notification.created_at >= cutoff,
+                )
+            )
+            # 同一个 key 有多行时取最新的一行（在这里比 id，不让数据库为 ORDER BY 额外排序）
+            for row in rows:
+                key = (row.user_id, row.type, row.related_id)
+                if key not in existing or row.id > existing[key].id:
+                    existing[key] = row
+
+        now = datetime.utcnow()
+        inserts, updates, touched = [], [], []
+        for key, events in groups.items():
+            row = existing.get(key[:3])
+            count = row.actor_count if row else 0
+            actors = json.loads(row.latest_actors) if row and row.latest_actors else []
+            for event in events:
+                # 同一个人反复点赞 / 取消不重复计人数（只能认出最近几个人）
+                if event.type != "like" or all(a["id"] != event.actor_id for a in actors):
+                    count += 1
+                actor = {"id": event.actor_id, "nickname": nicknames.get(event.actor_id)}
+                actors = [actor] + [a for a in actors if a["id"] != event.actor_id]
+            actors = actors[:LATEST_ACTORS]
+            title, content = _render(events[-1], posts[events[-1].post_id], actors, count)
+            values = {
+                "title": title,
+                "content": content,
+                "actor_count": count,
+                "latest_actors": json.dumps(actors, ensure_ascii=False),
+                "updated_at": now,
+            }
+            touched.append(
+                {
+                    "user_id": key[0],
+                    "type": key[1],
+                    "related_id": key[2],
+                    "title": title,
+                    "content": content,
+                    "actor_count": count,
+                    "latest_actors": actors,
+                }
+            )
+            if row:
+                updates.append({"id": row.id, **values})
+            else:
+                inserts.append(
+                    {"user_id": key[0], "type": key[1], "related_id": key[2], **values}
+                )
+
+        if inserts:
+            db.execute(insert(Notification), inserts)
+            # 新通知都是未读，同一事务里给接收人的未读数加上；合并进未读行的不变
+            for user_id, count in Counter(row["user_id"] for row in inserts).items():
+                bump_unread(db, user_id, count)
+        if updates:
+            db.execute(update(Notification), updates)
+        coalesced = sum(len(events) for events in groups.values()) - len(inserts)
+        return len(inserts), coalesced, touched
+
+    def _push(self, db: Session, touched: list[dict]) -> None:
+        """提交后把新的 / 合并后的通知连同最新未读数推给在线的接收人"""
+        if not touched:
+            return
+        unread = {
+            user_id: get_unread(db, user_id) for user_id in {item["user_id"] for item in touched}
+        }
+        for item in touched:
+            broker.publish(
+                item["user_id"],
+                "notification",
+                {**item, "unread": unread[item["user_id"]]},
+            )
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "published": self.published,
+            "dropped": self.dropped,
+            "written": self.written,
+            "coalesced": self.coalesced,
+            "skipped": self.skipped,
+            "batches": self.batches,
+            "errors": self.errors,
+            "lost": self.lost,
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+        }
+
+
+notifier = Notifier(
+    maxsize=settings.NOTIFY_QUEUE_SIZE,
+    batch_size=settings.NOTIFY_BATCH_SIZE,
+    batch_wait_ms=settings.NOTIFY_BATCH_WAIT_MS,
+    coalesce_window_minutes=settings.NOTIFY_COALESCE_WINDOW_MINUTES,
+)
+metrics.register("notifier", notifier.stats)
@@ -0,0 +1,65 @@
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+
+# 游标分页：把最后一条记录的 (created_at, id) 编码成不透明字符串，
+# 下一页直接从这个位置往后取，避免 OFFSET 越翻越慢。
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: datetime | float, row_id: int) -> str:
+    """key 一般是 created_at；热门流用的是热度分（float）"""
+    key_str = key.isoformat() if isinstance(key, datetime) else repr(key)
+    raw = f"{key_str}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, key_type: type = datetime) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        key, row_id = raw.rsplit("|", 1)
+        if key_type is datetime:
+            return datetime.fromisoformat(key), int(row_id)
+        return key_type(key), int(row_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def paginate(
+    db: Session,
+    stmt,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    created_col,
+    id_col,
+):
+    """
+    按 (created_at, id) 倒序分页，返回 (rows, next_cursor)。
+    - 传 cursor：从游标位置往后取（走 created_at+id 复合索引，不随页数变慢）
+    - 不传 cursor：兼容老客户端，继续用 skip/offset
+    取满一页时返回下一页的游标，由调用方放进响应头 X-Next-Cursor。
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(created_col, id_col) < (created_at, row_id))
+    stmt = stmt.order_by(created_col.desc(), id_col.desc())
+    if not cursor:
+        stmt = stmt.offset(skip)
+    rows = db.execute(stmt.limit(limit)).all()
+    next_cursor = None
+    if rows and len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def cursor_headers(next_cursor: str | None) -> dict[str, str]:
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import threading
+
+from app.core import metrics
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # 只有 PUSH_BACKEND=redis 时才需要
+    redis = None
+
+
+REDIS_CHANNEL = "kuleme:push"
+
+
+def sse_message(event: str, data: dict) -> bytes:
+    """按 SSE 格式编码一条消息，同一条消息发给多个连接时只编码一次"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """一个推送连接：有界队列，队列满时丢弃新消息并记下，由连接补发一条 resync"""
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+        self.overflowed = False
+
+    def offer(self, message: bytes) -> bool:
+        """只在连接所在的事件循环里调用"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+
+
+class LocalBackend:
+    """单进程：发布直接投递给本进程的连接"""
+
+    _deliver = None
+
+    def start(self, deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, user_id: int | None, event: str, data: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(user_id, event, data)
+
+    def stop(self) -> None:
+        pass
+
+
+class RedisBackend:
+    """多进程：发布到 Redis 频道，每个进程各起一个线程订阅，再投递给自己的连接"""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("PUSH_BACKEND=redis 需要先安装 redis 包")
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread: threading.Thread | None = None
+
+    def start(self, deliver) -> None:
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(REDIS_CHANNEL)
+        self._thread = threading.Thread(
+            target=self._listen, args=(deliver,), name="push-redis", daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, deliver) -> None:
+        for item in self._pubsub.listen():
+            try:
+                message = json.loads(item["data"])
+                deliver(message["user_id"], message["event"], message["data"])
+            except Exception as e:  # noqa: BLE001
+                print(f"警告: 处理推送消息失败: {e}")
+
+    def publish(self, user_id: int | None, event: str, data: dict) -> None:
+        self._client.publish(
+            REDIS_CHANNEL,
+            json.dumps({"user_id": user_id, "event": event, "data": data}, default=str),
+        )
+
+    def stop(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+class PushBroker:
+    """
+    进程内的推送中转。
+    - 连接（SSE 接口）按用户订阅，每个连接一个有界队列，慢客户端只会丢自己的消息
+    - publish 可以在任意线程调用（接口的线程池、通知后台线程），
+      经由后端投递，再用 call_soon_threadsafe 放进各连接所在事件循环的队列
+    - 后端可替换：local 只在本进程内投递；redis 让多个 worker 进程互相转发
+    """
+
+    def __init__(self, queue_size: int, backend):
+        self.queue_size = queue_size
+        self.backend = backend
+        self._subs: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.publish_errors = 0
+
+    def start(self) -> None:
+        self.backend.start(self._deliver)
+
+    def stop(self) -> None:
+        self.backend.stop()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        sub = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subs.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.user_id]
+
+    def publish(self, user_id: int | None, event: str, data: dict) -> None:
+        """推送失败不影响业务：客户端重连后会重新拉取。user_id 为 None 时推给所有人"""
+        self.published += 1
+        try:
+            self.backend.publish(user_id, event, data)
+        except Exception as e:  # noqa: BLE001
+            self.publish_errors += 1
+            print(f"警告: 发布推送消息失败: {e}")
+
+    def publish_all(self, event: str, data: dict) -> None:
+        """推给所有在线连接（全站广播）"""
+        self.publish(None, event, data)
+
+    def _deliver(self, user_id: int | None, event: str, data: dict) -> None:
+        with self._lock:
+            if user_id is None:
+                subs = [sub for user_subs in self._subs.values() for sub in user_subs]
+            else:
+                subs = list(self._subs.get(user_id, ()))
+        if not subs:
+            return
+        message = sse_message(event, data)
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(self._offer, sub, message)
+            except RuntimeError:
+                # 连接所在的事件循环已经关闭
+                self.unsubscribe(sub)
+
+    def _offer(self, sub: Subscription, message: bytes) -> None:
+        if sub.offer(message):
+            self.delivered += 1
+        else:
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = len(self._subs)
+            connections = sum(len(s) for s in self._subs.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "connections": connections,
+            "users": users,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "publish_errors": self.publish_errors,
+        }
+
+
+def _make_backend():
+    if settings.PUSH_BACKEND.lower() == "redis":
+        return RedisBackend(settings.PUSH_REDIS_URL)
+    return LocalBackend()
+
+
+broker = PushBroker(queue_size=settings.PUSH_QUEUE_SIZE, backend=_make_backend())
+metrics.register("push", broker.stats)
@@ -0,0 +1,52 @@
+import math
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.post import Post, PostScore
+
+
+# 热度分采用 Reddit 式公式：log10(互动量) + 发布时间 / 衰减周期。
+# 时间项随发布时间线性增长，相当于所有旧帖按同一速度"衰减"，
+# 所以只在互动量变化时更新单个帖子的分数，不需要定期全表重算。
+HOT_EPOCH = datetime(2024, 1, 1)
+HOT_DECAY_SECONDS = 45000  # 约 12.5 小时：晚发这么久的帖子，互动量要多 10 倍才能排在前面
+COMMENT_WEIGHT = 2  # 一条评论算两个赞
+
+
+def hot_score(likes: int, comments_count: int, created_at: datetime) -> float:
+    engagement = (likes or 0) + COMMENT_WEIGHT * (comments_count or 0)
+    order = math.log10(engagement + 1)
+    seconds = (created_at - HOT_EPOCH).total_seconds()
+    return round(order + seconds / HOT_DECAY_SECONDS, 7)
+
+
+def refresh_hot_score(db: Session, post: Post) -> None:
+    """根据帖子当前的点赞/评论数更新热度分，在调用方的事务里执行"""
+    set_hot_score(db, post.id, post.likes, post.comments_count, post.created_at)
+
+
+def set_hot_score(
+    db: Session, post_id: int, likes: int, comments_count: int, created_at: datetime
+) -> None:
+    """按给定的计数写热度分，供原子计数更新（UPDATE ... RETURNING）后直接使用"""
+    score = hot_score(likes, comments_count, created_at)
+    updated = (
+        db.query(PostScore)
+        .filter(PostScore.post_id == post_id)
+        .update({PostScore.score: score}, synchronize_session=False)
+    )
+    if updated:
+        return
+    try:
+        with db.begin_nested():
+            db.add(PostScore(post_id=post_id, score=score))
+    except IntegrityError:
+        set_hot_score(db, post_id, likes, comments_count, created_at)
+
+
+def remove_hot_score(db: Session, post_id: int) -> None:
+    db.query(PostScore).filter(PostScore.post_id == post_id).delete(
+        synchronize_session=False
+    )
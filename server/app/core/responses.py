@@ -0,0 +1,40 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson 是可选依赖，没装时回退到标准库
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """序列化为 JSON 字节，输出格式和 Pydantic 的一致（datetime 为 ISO 格式）"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    只读列表接口用：直接把 dict / list 序列化成字节，
+    不再经过 response_model 的 Pydantic 校验。
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,176 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.user import RevokedToken
+
+# 增量同步时往前多看一段，防止漏掉提交得晚、created_at 却更早的记录
+SYNC_OVERLAP = timedelta(seconds=30)
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class RevocationList:
+    """
+    已吊销 token 的内存名单。每个请求鉴权时只查这里（两次字典查找），不查库。
+    - 吊销时先写 revoked_tokens 表，再记到本进程内存
+    - 后台线程每 TOKEN_REVOCATION_SYNC_SECONDS 秒按 created_at 增量拉取其他进程的吊销记录，
+      所以多进程部署时别处吊销的 access token 最多滞后一个间隔失效；
+      refresh token 换新前会先同步一次，不受这个延迟影响
+    - 记录过了对应 token 的 exp 就没用了，内存里随同步清掉，表里每小时删一次
+    """
+
+    def __init__(self, sync_seconds: float):
+        self.sync_seconds = sync_seconds
+        self._tokens: dict[str, float] = {}  # jti -> exp
+        self._users: dict[int, tuple[float, float]] = {}  # user_id -> (revoked_before, exp)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._session_factory: sessionmaker | None = None
+        self._synced_until: datetime | None = None
+        self._last_purge = float("-inf")
+        self.rejected = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def is_revoked(self, jti: str | None, user_id: int, issued_at: float | None) -> bool:
+        revoked = False
+        if jti is not None and jti in self._tokens:
+            revoked = True
+        else:
+            entry = self._users.get(user_id)
+            # 没有 iat 的旧 token 视为很早签发
+            if entry is not None and (issued_at or 0) < entry[0]:
+                revoked = True
+        if revoked:
+            self.rejected += 1
+        return revoked
+
+    def _remember(self, jti: str | None, user_id: int, revoked_before: float | None, exp: float) -> None:
+        with self._lock:
+            if jti is not None:
+                self._tokens[jti] = exp
+            elif revoked_before is not None:
+                before, until = self._users.get(user_id, (0.0, 0.0))
+                self._users[user_id] = (max(before, revoked_before), max(until, exp))
+
+    def revoke_token(self, db: Session, jti: str, user_id: int, exp: float) -> bool:
+        """
+        在调用方的事务里吊销单个 token，调用方负责提交。
+        同一个 jti 已经吊销过时返回 False（refresh token 被重复使用）。
+        """
+        try:
+            with db.begin_nested():
+                db.add(
+                    RevokedToken(
+                        jti=jti,
+                        user_id=user_id,
+                        expires_at=datetime.utcfromtimestamp(exp),
+                    )
+                )
+        except IntegrityError:
+            self._remember(jti, user_id, None, exp)
+            return False
+        self._remember(jti, user_id, None, exp)
+        return True
+
+    def revoke_user(self, db: Session, user_id: int) -> None:
+        """在调用方的事务里吊销该用户此刻之前签发的全部 token，调用方负责提交"""
+        now = time.time()
+        # refresh token 活得最久，过了它的有效期这条记录就没用了
+        exp = now + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        db.add(
+            RevokedToken(
+                user_id=user_id,
+                revoked_before=now,
+                expires_at=datetime.utcfromtimestamp(exp),
+            )
+        )
+        self._remember(None, user_id, now, exp)
+
+    def sync(self, db: Session) -> int:
+        """拉取上次同步之后新增的吊销记录，顺带清掉内存里已过期的，返回拉到的条数"""
+        started = datetime.utcnow()
+        stmt = select(
+            RevokedToken.jti,
+            RevokedToken.user_id,
+            RevokedToken.revoked_before,
+            RevokedToken.expires_at,
+        ).where(RevokedToken.expires_at > started)
+        if self._synced_until is not None:
+            stmt = stmt.where(RevokedToken.created_at >= self._synced_until - SYNC_OVERLAP)
+        rows = db.execute(stmt).all()
+        for row in rows:
+            exp = row.expires_at.replace(tzinfo=timezone.utc).timestamp()
+            self._remember(row.jti, row.user_id, row.revoked_before, exp)
+        self._synced_until = started
+
+        now = time.time()
+        with self._lock:
+            self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+            self._users = {uid: entry for uid, entry in self._users.items() if entry[1] > now}
+        self.syncs += 1
+        return len(rows)
+
+    def purge(self, db: Session) -> int:
+        """删除表里已过期的吊销记录，返回删除条数"""
+        result = db.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())
+        )
+        db.commit()
+        return result.rowcount
+
+    def start(self, session_factory: sessionmaker) -> None:
+        """先同步加载全部有效的吊销记录，再启动后台同步线程"""
+        if self._thread is not None:
+            return
+        self._session_factory = session_factory
+        with session_factory() as db:
+            self.sync(db)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="token-revocation-sync", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sync_seconds):
+            try:
+                with self._session_factory() as db:
+                    self.sync(db)
+                    if time.monotonic() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+                        self.purge(db)
+                        self._last_purge = time.monotonic()
+            except Exception as e:  # noqa: BLE001
+                # 同步失败时名单保持原样，下个周期重试
+                self.sync_errors += 1
+                print(f"警告: 同步 token 吊销名单失败: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            tokens = len(self._tokens)
+            users = len(self._users)
+        return {
+            "tokens": tokens,
+            "users": users,
+            "rejected": self.rejected,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+        }
+
+
+revocations = RevocationList(sync_seconds=settings.TOKEN_REVOCATION_SYNC_SECONDS)
+metrics.register("token_revocations", revocations.stats)
@@ -0,0 +1,118 @@
+import functools
+import inspect
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.params import Depends as DependsParam
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.deps import get_async_db, get_current_user, get_current_user_async, get_db
+
+# 异步模式下替换掉的依赖：同步版本 -> 异步版本
+ASYNC_DEPENDENCIES = {
+    get_db: get_async_db,
+    get_current_user: get_current_user_async,
+}
+
+
+_SUB_RESPONSE = "_db_router_response"
+
+
+def _session_endpoint(endpoint, response_model, status_code, use_async: bool):
+    """
+    把用到 get_db 的同步接口包成 async 接口，接口函数和 response_model 转换在同一步里执行：
+    - 同步模式：一起放进线程池。否则 FastAPI 会在接口返回后再排一次线程池做序列化，
+      这时会话还占着连接；线程全被"等连接"的请求占满时，两边互相卡死到连接池超时
+    - 异步模式（DB_ASYNC）：get_db / get_current_user 换成异步版本（两者拿到同一个 AsyncSession），
+      通过 AsyncSession.run_sync 在事件循环里执行，等数据库时不占线程；
+      ORM 对象也必须在 run_sync 里转换好，离开之后再触发懒加载会报错
+    转换时按 response_model 校验一次就直接序列化成 JSON，返回 Response，FastAPI 不会再校验一遍；
+    接口通过 response: Response 参数设置的状态码和响应头照样带上。
+    没有用到 get_db 的接口原样返回。
+    """
+    signature = inspect.signature(endpoint)
+    parameters = []
+    db_param = None
+    response_param = None
+    for param in signature.parameters.values():
+        if param.annotation is Response:
+            response_param = param.name
+        dependency = param.default
+        if isinstance(dependency, DependsParam) and dependency.dependency in ASYNC_DEPENDENCIES:
+            if dependency.dependency is get_db:
+                db_param = param.name
+            if use_async:
+                param = param.replace(default=Depends(ASYNC_DEPENDENCIES[dependency.dependency]))
+        parameters.append(param)
+    if db_param is None:
+        return endpoint
+    if response_param is None:
+        # 接口自己没声明 response 参数时补一个，拿到 FastAPI 注入的临时响应
+        response_param = _SUB_RESPONSE
+        parameters.append(
+            inspect.Parameter(
+                _SUB_RESPONSE, inspect.Parameter.KEYWORD_ONLY, annotation=Response
+            )
+        )
+
+    if isinstance(response_model, DefaultPlaceholder):
+        response_model = response_model.value
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+    if isinstance(status_code, DefaultPlaceholder):
+        status_code = status_code.value
+
+    def call(session, kwargs):
+        sub_response = kwargs[response_param]
+        if response_param == _SUB_RESPONSE:
+            kwargs = {k: v for k, v in kwargs.items() if k != _SUB_RESPONSE}
+        result = endpoint(**{**kwargs, db_param: session})
+        if adapter is None or isinstance(result, Response):
+            return result
+        content = adapter.dump_json(
+            adapter.validate_python(result, from_attributes=True), by_alias=True
+        )
+        response = Response(
+            content,
+            status_code=sub_response.status_code or status_code or 200,
+            media_type="application/json",
+        )
+        response.headers.raw.extend(
+            (name, value)
+            for name, value in sub_response.headers.raw
+            if name != b"content-length"
+        )
+        return response
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        if use_async:
+            return await kwargs[db_param].run_sync(call, kwargs)
+        return await run_in_threadpool(call, kwargs[db_param], kwargs)
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
+
+
+class DBRouter(APIRouter):
+    """
+    带数据库的路由统一用它，接口照常写成同步函数，不用按同步 / 异步维护两份：
+    - DB_ASYNC 关闭时接口在线程池执行（和 APIRouter 一样），只是序列化也放在同一次线程调用里
+    - DB_ASYNC 开启时接口在事件循环里通过 AsyncSession 执行
+    接口里有阻塞操作（算 bcrypt）的路由传 blocking=True，异步模式下也留在线程池。
+    """
+
+    def __init__(self, *args, blocking: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocking = blocking
+
+    def add_api_route(self, path, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _session_endpoint(
+                endpoint,
+                kwargs.get("response_model"),
+                kwargs.get("status_code"),
+                use_async=settings.DB_ASYNC and not self.blocking,
+            )
+        super().add_api_route(path, endpoint, **kwargs)
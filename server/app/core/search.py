@@ -0,0 +1,156 @@
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+# 帖子全文检索。
+# 中文没有空格分词，这里统一在应用层切成"单字 + 相邻双字"的 token，
+# 再交给数据库建倒排索引：
+# - SQLite：FTS5 虚表 posts_fts（rowid = 帖子 id）
+# - PostgreSQL：post_search 表的 tsvector 列 + GIN 索引
+# 查询同样切词后要求所有 token 都命中，按相关度排序。
+_CJK = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[0-9a-z]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+
+
+def _is_cjk(run: str) -> bool:
+    return bool(_CJK_RE.match(run))
+
+
+def index_tokens(content: str) -> list[str]:
+    """建索引用：中文连续片段切成单字和双字，英文数字按词"""
+    tokens = []
+    for run in _TOKEN_RE.findall(content.lower()):
+        if not _is_cjk(run):
+            tokens.append(run)
+            continue
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def query_tokens(q: str) -> list[str]:
+    """查询用：多字中文只用双字（更准），单字中文用单字"""
+    tokens = []
+    for run in _TOKEN_RE.findall(q.lower()):
+        if not _is_cjk(run) or len(run) == 1:
+            parts = [run]
+        else:
+            parts = [run[i:i + 2] for i in range(len(run) - 1)]
+        for part in parts:
+            if part not in tokens:
+                tokens.append(part)
+    return tokens
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def ensure_search_index(conn: Connection) -> None:
+    """建检索用的虚表 / 索引（已存在时跳过），在调用方的事务里执行"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS post_search ("
+            "post_id INTEGER PRIMARY KEY REFERENCES posts(id) ON DELETE CASCADE, "
+            "tsv TSVECTOR NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_post_search_tsv "
+            "ON post_search USING GIN (tsv)"
+        ))
+    else:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts "
+            "USING fts5(tokens, tokenize = 'unicode61')"
+        ))
+
+
+def index_post(db: Session, post_id: int, content: str) -> None:
+    """写入 / 更新单个帖子的索引，在调用方的事务里执行"""
+    tokens = " ".join(index_tokens(content))
+    remove_post(db, post_id)
+    if _dialect(db) == "postgresql":
+        db.execute(
+            text(
+                "INSERT INTO post_search (post_id, tsv) "
+                "VALUES (:post_id, to_tsvector('simple', :tokens))"
+            ),
+            {"post_id": post_id, "tokens": tokens},
+        )
+    else:
+        db.execute(
+            text("INSERT INTO posts_fts (rowid, tokens) VALUES (:post_id, :tokens)"),
+            {"post_id": post_id, "tokens": tokens},
+        )
+
+
+def remove_post(db: Session, post_id: int) -> None:
+    if _dialect(db) == "postgresql":
+        sql = "DELETE FROM post_search WHERE post_id = :post_id"
+    else:
+        sql = "DELETE FROM posts_fts WHERE rowid = :post_id"
+    db.execute(text(sql), {"post_id": post_id})
+
+
+def search_post_ids(
+    db: Session,
+    q: str,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[int], str | None]:
+    """
+    返回按相关度排序的帖子 id 和下一页游标。
+    score 越小越相关（SQLite bm25 本身就是负数越好，PostgreSQL 取 -ts_rank），
+    游标为 (score, post_id)。
+    """
+    tokens = query_tokens(q)
+    if not tokens:
+        return [], None
+
+    if _dialect(db) == "postgresql":
+        matches = (
+            "SELECT post_id, -ts_rank(tsv, query) AS score "
+            "FROM post_search, to_tsquery('simple', :query) AS query "
+            "WHERE tsv @@ query"
+        )
+        query = " & ".join(f"'{token}'" for token in tokens)
+    else:
+        matches = (
+            "SELECT rowid AS post_id, bm25(posts_fts) AS score "
+            "FROM posts_fts WHERE posts_fts MATCH :query"
+        )
+        query = " ".join(f'"{token}"' for token in tokens)
+
+    params = {"query": query, "limit": limit}
+    where = ""
+    if cursor:
+        params["score"], params["post_id"] = decode_cursor(cursor, key_type=float)
+        where = "WHERE score > :score OR (score = :score AND post_id > :post_id) "
+    rows = db.execute(
+        text(
+            f"SELECT post_id, score FROM ({matches}) AS matches "
+            f"{where}ORDER BY score, post_id LIMIT :limit"
+        ),
+        params,
+    ).all()
+
+    next_cursor = None
+    if rows and len(rows) == limit:
+        next_cursor = encode_cursor(float(rows[-1].score), rows[-1].post_id)
+    return [row.post_id for row in rows], next_cursor
+
+
+def is_search_index_empty(db: Session) -> bool:
+    table = "post_search" if _dialect(db) == "postgresql" else "posts_fts"
+    return db.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is None
+
+
+def clear_search_index(db: Session) -> None:
+    table = "post_search" if _dialect(db) == "postgresql" else "posts_fts"
+    db.execute(text(f"DELETE FROM {table}"))
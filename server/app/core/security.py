@@ -1,52 +1,191 @@
-from datetime import datetime, timedelta
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
+from fastapi import HTTPException, status
 from jose import jwt
 import bcrypt
 
+from app.core import metrics
 from app.core.config import settings
 
 
-def create_access_token(subject: str) -> str:
-    expire = datetime.utcnow() + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-    to_encode = {"sub": subject, "exp": expire}
-    encoded_jwt = jwt.encode(
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+STREAM_TICKET_TYPE = "stream"
+
+
+def _encode_token(subject: str, token_type: str, lifetime: timedelta) -> str:
+    """
+    token 只带最少的声明：sub（用户 id）、typ、jti（吊销用）、iat、exp。
+    iat 保留小数，改密码后"在此之前签发的全部作废"才不会误伤同一秒里新签的 token。
+    """
+    now = time.time()
+    to_encode = {
+        "sub": subject,
+        "typ": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": int(now + lifetime.total_seconds()),
+    }
+    return jwt.encode(
         to_encode,
         settings.JWT_SECRET_KEY,
         algorithm=settings.JWT_ALGORITHM,
     )
-    return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def create_access_token(subject: str) -> str:
+    return _encode_token(
+        subject,
+        ACCESS_TOKEN_TYPE,
+        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+def create_refresh_token(subject: str) -> str:
+    return _encode_token(
+        subject,
+        REFRESH_TOKEN_TYPE,
+        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+def create_stream_ticket(subject: str) -> str:
+    return _encode_token(
+        subject,
+        STREAM_TICKET_TYPE,
+        timedelta(seconds=settings.STREAM_TICKET_EXPIRE_SECONDS),
+    )
+
+
+def decode_token(token: str) -> dict:
+    """校验签名和过期时间，返回声明；无效时抛 JWTError"""
+    return jwt.decode(
+        token,
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+    )
+
+
+class HashPool:
     """
-    验证密码。
-    支持 passlib 格式和直接 bcrypt 格式。
+    密码哈希专用线程池。
+    bcrypt 一次要几百毫秒，登录高峰时如果直接在接口线程里算，会占满 Starlette 的线程池，
+    连带其他接口一起排队。这里限制同时在算的个数（workers）和排队个数（queue），
+    超过上限立即返回 503，让客户端稍后重试，接口线程最多被占用 workers + queue 个。
     """
+
+    def __init__(self, workers: int, queue: int):
+        self.limit = workers + queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.workers = workers
+        self.completed = 0
+        self.rejected = 0
+        self._wait_ms: deque[float] = deque(maxlen=1000)
+        self._exec_ms: deque[float] = deque(maxlen=1000)
+
+    def run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.limit:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="登录人数太多，请稍后再试",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+        queued_at = time.perf_counter()
+        try:
+            return self._executor.submit(self._timed, queued_at, fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _timed(self, queued_at: float, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._wait_ms.append((started - queued_at) * 1000)
+                self._exec_ms.append((finished - started) * 1000)
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            wait, execute = sorted(self._wait_ms), sorted(self._exec_ms)
+            return {
+                "workers": self.workers,
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms_p50": _percentile(wait, 50),
+                "wait_ms_p99": _percentile(wait, 99),
+                "exec_ms_p50": _percentile(execute, 50),
+                "exec_ms_p99": _percentile(execute, 99),
+            }
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 2)
+
+
+hash_pool = HashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue=settings.PASSWORD_HASH_QUEUE,
+)
+metrics.register("password_hash", hash_pool.stats)
+
+
+def _password_bytes(password: str) -> bytes:
+    password_bytes = password.encode('utf-8')
+    # bcrypt 限制密码不能超过 72 字节
+    if len(password_bytes) > 72:
+        password_bytes = password_bytes[:72]
+    return password_bytes
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     try:
-        # 尝试使用 bcrypt 直接验证
-        password_bytes = plain_password.encode('utf-8')
-        # bcrypt 限制密码不能超过 72 字节
-        if len(password_bytes) > 72:
-            password_bytes = password_bytes[:72]
-        hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        return bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode('utf-8'))
     except Exception:
         return False
 
 
+def _hashpw(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode('utf-8')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    验证密码（在哈希线程池里执行，繁忙时抛 503）。
+    支持 passlib 格式和直接 bcrypt 格式。
+    """
+    return hash_pool.run(_checkpw, plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """
-    生成密码哈希。
+    生成密码哈希（在哈希线程池里执行，繁忙时抛 503）。
     bcrypt 限制密码不能超过 72 字节，如果超过则截断。
     """
-    password_bytes = password.encode('utf-8')
-    # bcrypt 限制密码不能超过 72 字节
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    # 生成 salt 并哈希密码
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+    return hash_pool.run(_hashpw, password)
 
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """哈希的 cost 和当前配置不一致（$2b$<cost>$...）"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.PASSWORD_BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
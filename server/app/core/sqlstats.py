@@ -0,0 +1,197 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core import metrics
+from app.core.config import settings
+
+
+# 每个请求的 SQL 统计：中间件在请求开始时放一个 RequestQueries 到 contextvar 里，
+# 所有引擎（主库、副本、异步引擎底下的同步引擎）的执行事件往里记。
+# 同步接口在线程池里执行时 contextvar 会复制过去，指向的还是同一个对象；
+# 后台线程和脚本里的语句不在请求里，不统计。
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+SLOWEST_KEPT = 3  # 每个请求记最慢的几条语句
+
+_current: ContextVar["RequestQueries | None"] = ContextVar("request_queries", default=None)
+
+
+def _one_line(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def _log(record: dict) -> None:
+    """结构化日志：一行一个 JSON，方便按字段检索"""
+    print(json.dumps(record, ensure_ascii=False), flush=True)
+
+
+class RequestQueries:
+    """一个请求里执行过的语句：条数、总耗时、最慢的几条，以及每条语句的执行次数"""
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest: list[tuple[float, str]] = []
+        self.repeats: Counter[str] = Counter()
+
+    @property
+    def route(self) -> str | None:
+        """匹配到的路由（路径模板，不带具体 id），没匹配上时是 None"""
+        route = self.scope.get("route")
+        path = getattr(route, "path", None)
+        return f"{self.scope['method']} {path}" if path else None
+
+    def add(self, statement: str, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.repeats[statement] += 1
+        if len(self.slowest) < SLOWEST_KEPT or ms > self.slowest[-1][0]:
+            self.slowest.append((ms, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+
+class QueryStats:
+    """按路由汇总的语句数和数据库耗时，加上慢查询 / N+1 的次数，供 /metrics 输出"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict] = {}
+        self.slow_queries = 0
+        self.n_plus_one = 0
+
+    def record(self, queries: RequestQueries) -> None:
+        route = queries.route
+        if route is None:
+            return
+        with self._lock:
+            stats = self._routes.setdefault(
+                route, {"requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0}
+            )
+            stats["requests"] += 1
+            stats["queries"] += queries.count
+            stats["db_ms"] += queries.total_ms
+            stats["max_queries"] = max(stats["max_queries"], queries.count)
+
+    def count_slow_query(self) -> None:
+        with self._lock:
+            self.slow_queries += 1
+
+    def count_n_plus_one(self) -> None:
+        with self._lock:
+            self.n_plus_one += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {
+                route: {
+                    "requests": s["requests"],
+                    "avg_queries": round(s["queries"] / s["requests"], 2),
+                    "max_queries": s["max_queries"],
+                    "avg_db_ms": round(s["db_ms"] / s["requests"], 2),
+                }
+                for route, s in self._routes.items()
+            }
+            return {"slow_queries": self.slow_queries, "n_plus_one": self.n_plus_one, "routes": routes}
+
+
+query_stats = QueryStats()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    started = conn.info.pop("query_started", None)
+    if queries is None or started is None:
+        return
+    ms = (time.perf_counter() - started) * 1000
+    queries.add(statement, ms)
+    if settings.DB_SLOW_QUERY_MS and ms >= settings.DB_SLOW_QUERY_MS:
+        query_stats.count_slow_query()
+        _log(
+            {
+                "event": "slow_query",
+                "route": queries.route or queries.scope["path"],
+                "ms": round(ms, 1),
+                "statement": _one_line(statement),
+                "executemany": executemany,
+            }
+        )
+
+
+def _finish(queries: RequestQueries) -> None:
+    query_stats.record(queries)
+    if not settings.DB_DEBUG:
+        return
+    repeated = [
+        {"count": count, "statement": _one_line(statement)}
+        for statement, count in queries.repeats.most_common()
+        if count >= settings.DB_N_PLUS_ONE_THRESHOLD
+    ]
+    if not repeated:
+        return
+    query_stats.count_n_plus_one()
+    _log(
+        {
+            "event": "n_plus_one",
+            "route": queries.route or queries.scope["path"],
+            "queries": queries.count,
+            "db_ms": round(queries.total_ms, 1),
+            "repeated": repeated,
+            "slowest": [
+                {"ms": round(ms, 1), "statement": _one_line(s)} for ms, s in queries.slowest
+            ],
+        }
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    纯 ASGI 中间件（不缓冲响应体，SSE 长连接照常推送）：
+    请求开始时挂上 RequestQueries，响应头发出时带上目前为止的语句数和数据库耗时，
+    请求结束后汇总到 /metrics，开发模式下检查 N+1
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope)
+        token = _current.set(queries)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and settings.DB_STATS_HEADERS:
+                headers = MutableHeaders(scope=message)
+                headers.append(DB_QUERIES_HEADER, str(queries.count))
+                timing = f'db;dur={queries.total_ms:.1f};desc="{queries.count} queries"'
+                if queries.slowest:
+                    timing += f", db-slowest;dur={queries.slowest[0][0]:.1f}"
+                headers.append("Server-Timing", timing)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            _finish(queries)
+
+
+metrics.register("db_queries", query_stats.stats)
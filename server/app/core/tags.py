@@ -0,0 +1,78 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.post import Post, PostTag, TagStat
+
+
+def normalize_tags(tags: list[str] | None) -> list[str]:
+    """去掉空白和重复标签，保持原有顺序"""
+    result = []
+    for tag in tags or []:
+        tag = tag.strip()
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+
+def split_tags(tags_str: str | None) -> list[str]:
+    return tags_str.split(",") if tags_str else []
+
+
+def join_tags(tags: list[str]) -> str | None:
+    return ",".join(tags) if tags else None
+
+
+def _bump_tag_count(db: Session, tag: str, delta: int) -> None:
+    updated = (
+        db.query(TagStat)
+        .filter(TagStat.tag == tag)
+        .update(
+            {TagStat.post_count: TagStat.post_count + delta},
+            synchronize_session=False,
+        )
+    )
+    if updated or delta <= 0:
+        return
+    try:
+        with db.begin_nested():
+            db.add(TagStat(tag=tag, post_count=delta))
+    except IntegrityError:
+        # 并发请求刚好先插入了这个标签，改成累加
+        _bump_tag_count(db, tag, delta)
+
+
+def sync_post_tags(db: Session, post: Post, tags: list[str]) -> None:
+    """
+    让 post_tags 关联表和计数器跟帖子的标签保持一致。
+    在调用方的事务里执行，post 需要已经 flush 出 id。
+    """
+    existing = {
+        tag for (tag,) in db.query(PostTag.tag).filter(PostTag.post_id == post.id)
+    }
+    wanted = set(tags)
+
+    removed = existing - wanted
+    if removed:
+        db.query(PostTag).filter(
+            PostTag.post_id == post.id,
+            PostTag.tag.in_(removed),
+        ).delete(synchronize_session=False)
+    for tag in removed:
+        _bump_tag_count(db, tag, -1)
+
+    for tag in tags:
+        if tag in existing:
+            continue
+        db.add(PostTag(post_id=post.id, tag=tag, created_at=post.created_at))
+        _bump_tag_count(db, tag, 1)
+
+
+def remove_post_tags(db: Session, post_id: int) -> None:
+    tags = [tag for (tag,) in db.query(PostTag.tag).filter(PostTag.post_id == post_id)]
+    if not tags:
+        return
+    db.query(PostTag).filter(PostTag.post_id == post_id).delete(
+        synchronize_session=False
+    )
+    for tag in tags:
+        _bump_tag_count(db, tag, -1)
@@ -0,0 +1,88 @@
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.notification import Broadcast, NotificationCounter
+from app.models.user import User
+
+
+# 未读通知数由 notification_counters 维护，所有增减都在调用方的事务里执行，
+# 和通知本身的插入 / 标记已读一起提交或回滚。
+# 全站广播不进计数，按用户的 broadcast_seen_id 游标在读取时现算（广播表很小）。
+
+
+def bump_unread(db: Session, user_id: int, delta: int) -> None:
+    new_value = NotificationCounter.unread + delta
+    if delta < 0:
+        new_value = case((new_value < 0, 0), else_=new_value)
+    updated = (
+        db.query(NotificationCounter)
+        .filter(NotificationCounter.user_id == user_id)
+        .update({NotificationCounter.unread: new_value}, synchronize_session=False)
+    )
+    if updated or delta <= 0:
+        return
+    try:
+        with db.begin_nested():
+            db.add(NotificationCounter(user_id=user_id, unread=delta))
+    except IntegrityError:
+        # 并发写入刚好先建了这一行，改成累加
+        bump_unread(db, user_id, delta)
+
+
+def get_unread(db: Session, user_id: int) -> int:
+    """未读总数 = 个人通知计数 + 注册之后、已读游标之后的广播条数"""
+    counter = db.execute(
+        select(NotificationCounter.unread, NotificationCounter.broadcast_seen_id).where(
+            NotificationCounter.user_id == user_id
+        )
+    ).first()
+    unread, seen_id = counter if counter else (0, 0)
+    registered_at = select(User.created_at).where(User.id == user_id).scalar_subquery()
+    broadcasts = db.execute(
+        select(func.count(Broadcast.id)).where(
+            Broadcast.id > seen_id,
+            or_(registered_at.is_(None), Broadcast.created_at >= registered_at),
+        )
+    ).scalar()
+    return (unread or 0) + (broadcasts or 0)
+
+
+def get_broadcast_seen_id(db: Session, user_id: int) -> int:
+    seen_id = (
+        db.query(NotificationCounter.broadcast_seen_id)
+        .filter(NotificationCounter.user_id == user_id)
+        .scalar()
+    )
+    return seen_id or 0
+
+
+def mark_broadcasts_seen(db: Session, user_id: int, upto_id: int | None = None) -> None:
+    """
+    把广播已读游标推进到 upto_id（默认最新一条），只进不退。
+    upto_id 来自客户端，超过最新广播的按最新一条算：游标跑到前面去，之后发的广播就永远算已读了
+    """
+    latest = db.query(func.max(Broadcast.id)).scalar() or 0
+    upto_id = latest if upto_id is None else min(upto_id, latest)
+    if upto_id <= 0:
+        return
+    updated = (
+        db.query(NotificationCounter)
+        .filter(NotificationCounter.user_id == user_id)
+        .update(
+            {
+                NotificationCounter.broadcast_seen_id: case(
+                    (NotificationCounter.broadcast_seen_id < upto_id, upto_id),
+                    else_=NotificationCounter.broadcast_seen_id,
+                )
+            },
+            synchronize_session=False,
+        )
+    )
+    if updated:
+        return
+    try:
+        with db.begin_nested():
+            db.add(NotificationCounter(user_id=user_id, unread=0, broadcast_seen_id=upto_id))
+    except IntegrityError:
+        mark_broadcasts_seen(db, user_id, upto_id)
@@ -0,0 +1,142 @@
+"""
+数据回填：按已有数据重算派生表。
+基线迁移（app/db/migrations/v001_baseline.py）在这些表为空时调用一次，
+服务器根目录下的同名脚本加 --force 可以清空后全量重算。
+都在调用方的事务里执行，由调用方提交；跳过时返回 None。
+"""
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.ranking import hot_score
+from app.core.search import (
+    clear_search_index,
+    index_post,
+    is_search_index_empty,
+)
+from app.core.tags import normalize_tags, split_tags
+from app.models import user  # noqa: F401  Post 关联了 User，单独运行脚本时也要注册
+from app.models.notification import Notification, NotificationCounter
+from app.models.post import Post, PostScore, PostTag, TagStat
+
+BATCH_SIZE = 5000
+SEARCH_BATCH_SIZE = 2000
+
+
+def backfill_notification_counters(db: Session, force: bool = False) -> int | None:
+    """按 notifications 里的未读条数重算每个用户的未读数，返回回填的用户数"""
+    if not force and db.query(NotificationCounter.user_id).first() is not None:
+        return None
+
+    db.query(NotificationCounter).delete(synchronize_session=False)
+    result = db.execute(
+        insert(NotificationCounter).from_select(
+            ["user_id", "unread"],
+            select(Notification.user_id, func.count(Notification.id))
+            .where(Notification.is_read.is_(False))
+            .group_by(Notification.user_id),
+        )
+    )
+    return result.rowcount
+
+
+def backfill_post_tags(db: Session, force: bool = False) -> tuple[int, int] | None:
+    """根据 posts.tags 回填 post_tags 并重算 tag_stats，返回 (标签关联数, 标签数)"""
+    if not force and db.query(PostTag.post_id).first() is not None:
+        return None
+
+    db.query(PostTag).delete(synchronize_session=False)
+    db.query(TagStat).delete(synchronize_session=False)
+
+    # 按 id 分批扫描，避免一次性把所有帖子读进内存
+    last_id = 0
+    total = 0
+    while True:
+        rows = (
+            db.query(Post.id, Post.tags, Post.created_at)
+            .filter(Post.id > last_id, Post.tags.isnot(None))
+            .order_by(Post.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+        values = [
+            {"post_id": post_id, "tag": tag, "created_at": created_at}
+            for post_id, tags, created_at in rows
+            for tag in normalize_tags(split_tags(tags))
+        ]
+        if values:
+            db.execute(insert(PostTag), values)
+        total += len(values)
+        last_id = rows[-1].id
+
+    counts = (
+        db.query(PostTag.tag, func.count(PostTag.post_id))
+        .group_by(PostTag.tag)
+        .all()
+    )
+    if counts:
+        db.execute(
+            insert(TagStat),
+            [{"tag": tag, "post_count": count} for tag, count in counts],
+        )
+    return total, len(counts)
+
+
+def backfill_post_scores(db: Session, force: bool = False) -> int | None:
+    """按帖子当前的点赞/评论数重算热度分，返回帖子数"""
+    if not force and db.query(PostScore.post_id).first() is not None:
+        return None
+
+    db.query(PostScore).delete(synchronize_session=False)
+
+    last_id = 0
+    total = 0
+    while True:
+        rows = (
+            db.query(Post.id, Post.likes, Post.comments_count, Post.created_at)
+            .filter(Post.id > last_id)
+            .order_by(Post.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+        db.execute(
+            insert(PostScore),
+            [
+                {
+                    "post_id": row.id,
+                    "score": hot_score(row.likes, row.comments_count, row.created_at),
+                }
+                for row in rows
+            ],
+        )
+        total += len(rows)
+        last_id = rows[-1].id
+    return total
+
+
+def backfill_search_index(db: Session, force: bool = False) -> int | None:
+    """按 posts.content 重建检索索引，返回帖子数；索引表要先用 ensure_search_index 建好"""
+    if not force and not is_search_index_empty(db):
+        return None
+
+    clear_search_index(db)
+    last_id = 0
+    total = 0
+    while True:
+        rows = (
+            db.query(Post.id, Post.content)
+            .filter(Post.id > last_id)
+            .order_by(Post.id)
+            .limit(SEARCH_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+        for post_id, content in rows:
+            index_post(db, post_id, content)
+        total += len(rows)
+        last_id = rows[-1].id
+    return total
@@ -3,3 +3,13 @@ from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+
+def ensure_indexes(bind) -> None:
+    """
+    补建模型里声明的索引，压测脚本建临时库时用。
+    create_all 只会给新建的表建索引，已有的表需要在这里补上；正式库的索引由 app/db/migrations 负责。
+    建不上时（例如唯一索引遇到重复数据）直接抛错，不带着缺索引的库继续跑
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
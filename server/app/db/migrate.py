@@ -0,0 +1,36 @@
+"""
+数据库迁移命令，在 server 目录下运行：
+  python -m app.db.migrate            执行全部未执行的迁移
+  python -m app.db.migrate --to N     只升级到版本 N
+  python -m app.db.migrate status     查看当前版本和待执行的迁移
+不支持回滚：迁移只加不删，回退代码时旧版本照样能用新的表结构。
+"""
+import argparse
+
+from app.db.migrations import LATEST_VERSION, current_version, pending_migrations, upgrade
+from app.db.session import engine
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.db.migrate")
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    parser.add_argument("--to", type=int, default=None, help="目标版本，默认升级到最新")
+    args = parser.parse_args()
+
+    version = current_version(engine)
+    print(f"数据库: {engine.url.render_as_string(hide_password=True)}")
+    print(f"当前版本: {version}，最新版本: {LATEST_VERSION}")
+    if args.command == "status":
+        for migration in pending_migrations(engine):
+            print(f"  待执行 {migration.name}: {migration.description}")
+        return
+
+    applied = upgrade(engine, target=args.to)
+    if not applied:
+        print("✓ 已是最新版本")
+    else:
+        print(f"\n✅ 迁移完成，当前版本: {current_version(engine)}")
+
+
+if __name__ == "__main__":
+    main()
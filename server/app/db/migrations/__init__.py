@@ -0,0 +1,143 @@
+"""
+版本化的数据库迁移。
+- 每个迁移是本目录下的 vNNN_名称.py：模块文档字符串第一行是说明，upgrade(conn) 在传入的事务里改结构
+- schema_version 表记录执行过的版本；每个迁移和它的版本记录在同一个事务里提交
+- 部署时用 python -m app.db.migrate 执行，服务启动时只调用 check_schema 检查版本，不改表
+新库由 v001 按当前模型直接建好，之后的迁移在新库上照样执行一遍，所以都要能重复执行：
+加字段用 add_columns（已有的跳过），建索引用 create_indexes（checkfirst）。
+之后的迁移新建的索引在模块的 INDEXES（模型 -> 索引名列表）里声明，v001 建表时跳过它们，
+新库停在某个版本时的索引和老库升级到这个版本时一致，清理数据之类的前置步骤也只在所属的迁移里做。
+SQLite 的 DDL 不跟事务一起回滚，迁移中途失败后会带着做了一半的改动重跑，这一点更重要。
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# 不放进 Base.metadata：业务代码的 create_all 不该碰它
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# PostgreSQL 上多个实例同时执行迁移时用它排队
+ADVISORY_LOCK_ID = 20240917
+
+
+class Migration:
+    def __init__(self, version: int, name: str, description: str, upgrade, indexes: list[str]):
+        self.version = version
+        self.name = name
+        self.description = description
+        self.upgrade = upgrade
+        self.indexes = indexes  # 这个迁移新建的索引
+
+
+def _load() -> list[Migration]:
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        if not (info.name.startswith("v") and info.name[1:4].isdigit()):
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        description = (module.__doc__ or "").strip().splitlines()[0]
+        indexes = [name for names in getattr(module, "INDEXES", {}).values() for name in names]
+        migrations.append(
+            Migration(int(info.name[1:4]), info.name, description, module.upgrade, indexes)
+        )
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"迁移版本号重复: {versions}")
+    return migrations
+
+
+def current_version(bind) -> int:
+    """库里已执行到的版本，还没有 schema_version 表时是 0"""
+    if not inspect(bind).has_table(schema_version.name):
+        return 0
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            return current_version(conn)
+    return bind.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def pending_migrations(engine: Engine) -> list[Migration]:
+    version = current_version(engine)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def upgrade(engine: Engine, target: int | None = None) -> list[Migration]:
+    """按顺序执行未执行的迁移（最多到 target），返回本次执行的迁移"""
+    schema_metadata.create_all(bind=engine)
+    applied = []
+    for migration in MIGRATIONS:
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            # 拿到锁之后再看一次，别的实例可能刚执行完
+            if migration.version <= current_version(conn):
+                continue
+            migration.upgrade(conn)
+            conn.execute(
+                schema_version.insert().values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.utcnow(),
+                )
+            )
+        print(f"✓ 已执行迁移 {migration.name}: {migration.description}")
+        applied.append(migration)
+    return applied
+
+
+def check_schema(engine: Engine) -> None:
+    """
+    服务启动时调用：库结构落后于代码时直接报错退出，提示先执行迁移。
+    库比代码新（先迁移、旧版本实例还在滚动重启）时只提示：迁移只加不删，旧代码照样能用
+    """
+    version = current_version(engine)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"数据库结构版本为 {version}，当前代码需要 {LATEST_VERSION}，"
+            f"请先在 server 目录下运行: python -m app.db.migrate"
+        )
+    if version > LATEST_VERSION:
+        print(f"提示: 数据库结构版本 {version} 比当前代码（{LATEST_VERSION}）新")
+
+
+def add_columns(conn: Connection, table: str, columns: dict[str, str]) -> list[str]:
+    """给已有的表补字段（字段名 -> 类型和默认值的 DDL），已有的跳过，返回补上的字段"""
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return []
+    existing = {c["name"] for c in inspector.get_columns(table)}
+    missing = [name for name in columns if name not in existing]
+    for name in missing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {columns[name]}"))
+        print(f"✓ 已添加 {table}.{name} 字段")
+    return missing
+
+
+def create_indexes(conn: Connection, model, *names: str) -> None:
+    """按模型里的声明建索引（已存在时跳过）"""
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in names:
+        indexes[name].create(bind=conn, checkfirst=True)
+
+
+def later_indexes(version: int) -> set[str]:
+    """version 之后的迁移新建的索引（它们的 INDEXES）"""
+    return {name for m in MIGRATIONS if m.version > version for name in m.indexes}
+
+
+# 放在最后：迁移模块会从这里导入 add_columns 等工具函数
+MIGRATIONS = _load()
+LATEST_VERSION = MIGRATIONS[-1].version
@@ -0,0 +1,107 @@
+"""基线：按当前模型建表，并把引入版本化迁移之前的库补齐到同一结构
+
+取代原来每次启动都执行的 migrate_add_user_fields / migrate_interaction_index /
+migrate_notification_fields 等脚本。新库上只是建表；老库上补字段、清理重复互动后建唯一索引、
+补建索引和检索表，再回填为空的派生表。
+"""
+from sqlalchemy import func, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.core.search import ensure_search_index
+from app.db.backfill import (
+    backfill_notification_counters,
+    backfill_post_scores,
+    backfill_post_tags,
+    backfill_search_index,
+)
+from app.db.base import Base
+from app.db.migrations import add_columns, later_indexes
+from app.models import (  # noqa: F401  注册全部模型
+    comment,
+    gift,
+    growth,
+    medal,
+    notification,
+    recovery,
+    user,
+)
+from app.models.interaction import Interaction
+from app.models.post import Post
+
+# 建表之后才加进模型的字段
+LEGACY_COLUMNS = {
+    "users": {
+        "avatar": "VARCHAR(500)",
+        "bio": "VARCHAR(200)",
+        "tags": "VARCHAR(500)",
+        "hide_total_loss": "INTEGER DEFAULT 0",
+        "hide_medals": "INTEGER DEFAULT 0",
+    },
+    "notifications": {
+        "actor_count": "INTEGER NOT NULL DEFAULT 1",
+        "latest_actors": "TEXT",
+        "updated_at": "TIMESTAMP",
+    },
+    "notification_counters": {
+        "broadcast_seen_id": "INTEGER NOT NULL DEFAULT 0",
+    },
+}
+
+
+def dedupe_interactions(db: Session) -> int:
+    """同一用户对同一帖子的同一种互动只保留最早的一条，点赞数按清理后的记录重算"""
+    keep_ids = (
+        db.query(func.min(Interaction.id))
+        .group_by(Interaction.user_id, Interaction.post_id, Interaction.action_type)
+    )
+    duplicates = (
+        db.query(Interaction).filter(Interaction.id.notin_(keep_ids)).delete(
+            synchronize_session=False
+        )
+    )
+    if duplicates:
+        like_counts = (
+            db.query(func.count(Interaction.id))
+            .filter(
+                Interaction.post_id == Post.id,
+                Interaction.action_type == "like",
+            )
+            .scalar_subquery()
+        )
+        db.query(Post).update({Post.likes: like_counts}, synchronize_session=False)
+        print(f"✓ 已清理 {duplicates} 条重复的互动记录")
+    return duplicates
+
+
+def upgrade(conn: Connection) -> None:
+    # 只建缺的表，索引在清理完重复数据之后统一建
+    existing = set(inspect(conn).get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            conn.execute(CreateTable(table))
+    for table, columns in LEGACY_COLUMNS.items():
+        missing = add_columns(conn, table, columns)
+        if table == "notifications" and "updated_at" in missing:
+            conn.exec_driver_sql("UPDATE notifications SET updated_at = created_at")
+
+    with Session(bind=conn) as db:
+        # 唯一索引 uq_interactions_user_post_action 要先清掉重复数据才建得上
+        dedupe_interactions(db)
+        # 失败时整个迁移失败，不跳过；之后的迁移新建的索引留给它们
+        skipped = later_indexes(1)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in skipped:
+                    index.create(bind=conn, checkfirst=True)
+        ensure_search_index(conn)
+
+        for label, backfill in (
+            ("未读通知数", backfill_notification_counters),
+            ("帖子标签", backfill_post_tags),
+            ("热度分", backfill_post_scores),
+            ("检索索引", backfill_search_index),
+        ):
+            if backfill(db) is not None:
+                print(f"✓ 已回填{label}")
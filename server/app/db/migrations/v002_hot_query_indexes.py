@@ -0,0 +1,77 @@
+"""热点查询补组合索引，user_medals 改成 (user_id, medal_id) 唯一
+
+评论、回血 / 积分 / 兑换记录按 (过滤列, created_at) 建索引，翻页不再临时排序；
+通知补 (user_id, is_read, created_at)，互动补按帖子查的索引，广播和热门标签补排序用的索引。
+被组合索引覆盖的单列索引删掉，少一份写入开销（只删索引，旧版本代码照样能用）。
+这些索引列在 INDEXES 里，v001 建表时不建，新库上也由这里建。
+检查方式: tests/test_query_plans.py（python -m pytest -q），或 python -m benchmarks.check_query_plans
+"""
+from sqlalchemy import func
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.migrations import create_indexes
+from app.models.comment import Comment
+from app.models.gift import ExchangeRecord
+from app.models.growth import PointsRecord
+from app.models.interaction import Interaction
+from app.models.medal import UserMedal
+from app.models.notification import Broadcast, Notification
+from app.models.post import TagStat
+from app.models.recovery import RecoveryRecord
+
+# 本迁移新建的索引
+INDEXES = {
+    UserMedal: ["uq_user_medals_user_medal"],
+    Comment: ["ix_comments_post_id_created_at"],
+    Notification: ["ix_notifications_user_id_is_read_created_at"],
+    Interaction: ["ix_interactions_post_id_user_id_action_type"],
+    RecoveryRecord: ["ix_recovery_records_user_id_created_at"],
+    PointsRecord: ["ix_points_records_user_id_created_at"],
+    ExchangeRecord: ["ix_exchange_records_user_id_created_at"],
+    Broadcast: ["ix_broadcasts_created_at_id"],
+    TagStat: ["ix_tag_stats_post_count"],
+}
+
+# 被新的组合索引覆盖的旧索引
+REPLACED_INDEXES = [
+    "ix_recovery_records_user_id",
+    "ix_points_records_user_id",
+    "ix_exchange_records_user_id",
+    "ix_user_medals_user_id",
+    "ix_broadcasts_created_at",
+]
+
+
+def dedupe_user_medals(db: Session) -> int:
+    """同一用户同一枚勋章只保留一条进度：优先已解锁的，其次进度高的，再其次最早的"""
+    ranked = (
+        db.query(
+            UserMedal.id,
+            func.row_number()
+            .over(
+                partition_by=(UserMedal.user_id, UserMedal.medal_id),
+                order_by=(UserMedal.is_unlocked.desc(), UserMedal.progress.desc(), UserMedal.id),
+            )
+            .label("rank"),
+        )
+        .subquery()
+    )
+    duplicates = (
+        db.query(UserMedal)
+        .filter(UserMedal.id.in_(db.query(ranked.c.id).filter(ranked.c.rank > 1)))
+        .delete(synchronize_session=False)
+    )
+    if duplicates:
+        print(f"✓ 已清理 {duplicates} 条重复的勋章进度")
+    return duplicates
+
+
+def upgrade(conn: Connection) -> None:
+    with Session(bind=conn) as db:
+        # 唯一索引 uq_user_medals_user_medal 要先清掉重复数据才建得上
+        dedupe_user_medals(db)
+    for model, names in INDEXES.items():
+        create_indexes(conn, model, *names)
+    for name in REPLACED_INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
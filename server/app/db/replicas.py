@@ -0,0 +1,182 @@
+import itertools
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from app.core.identity import TTLCache
+from app.db.routing import RoutingSession
+
+# 只读请求：这些方法的接口读副本，其余请求整个读主库，事务里先读后写时不会读到副本上的旧数据
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+# 记最近写过数据的用户，满了按 LRU 淘汰（被淘汰的用户提前回到副本读）
+RECENT_WRITERS_MAX = 100000
+
+# 副本复制延迟（秒）：已经回放完收到的 WAL 时算 0，
+# 否则主库空闲时 pg_last_xact_replay_timestamp 一直停在最后一次写入，会被误判成延迟很大
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """一个读副本：同步引擎，以及 DB_ASYNC 时对应的异步引擎"""
+
+    def __init__(self, name: str, engine: Engine, async_engine=None):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = False
+        self.lag_seconds: float | None = None
+        self.last_error: str | None = None
+        self.failures = 0
+
+
+class ReplicaSet:
+    """
+    PostgreSQL 读副本路由（POSTGRES_READ_REPLICAS），get_db 在请求开始时调用 route：
+    - 只读请求（GET / HEAD）的读按轮询分到健康的副本，写照常走主库（RoutingSession）
+    - 读你所写：用户提交过写入后 READ_YOUR_WRITES_SECONDS 秒内，他的请求全部读主库，
+      不会出现"刚发的吐槽刷新后不见了"。只记在本进程，多进程部署时要按用户粘到同一进程才完全生效
+    - 后台线程每 REPLICA_HEALTH_CHECK_SECONDS 秒检查一次副本：连不上或复制延迟超过
+      REPLICA_MAX_LAG_SECONDS 的暂停使用，恢复后自动加回；请求中发现副本断线时立即摘掉，不等下次检查
+    - 没有健康的副本时全部读主库
+    start 之前所有副本都算不健康，没有启动检查的脚本只用主库。
+    """
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        check_seconds: float,
+        max_lag_seconds: float,
+        read_your_writes_seconds: float,
+    ):
+        self.replicas = replicas
+        self.check_seconds = check_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._recent_writers = TTLCache(
+            max_entries=RECENT_WRITERS_MAX, ttl_seconds=read_your_writes_seconds
+        )
+        self._round_robin = itertools.count()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.failovers = 0
+
+        for replica in replicas:
+            for e in (replica.engine, getattr(replica.async_engine, "sync_engine", None)):
+                if e is not None:
+                    event.listen(e, "handle_error", self._on_error(replica))
+        event.listen(RoutingSession, "after_commit", self._after_commit)
+
+    def _on_error(self, replica: Replica):
+        def on_error(context) -> None:
+            if context.is_disconnect:
+                self._mark(replica, False, None, str(context.original_exception))
+
+        return on_error
+
+    def _after_commit(self, session: RoutingSession) -> None:
+        user_id = session.info.get("user_id")
+        if session.wrote and user_id is not None:
+            self._recent_writers.set(user_id, True)
+
+    def pick(self) -> Replica | None:
+        """轮询选一个健康的副本，没有时返回 None"""
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def route(self, session, method: str, user_id: int | None) -> None:
+        """
+        给本次请求的会话选读库，session 是 RoutingSession 或包着它的 AsyncSession。
+        不走副本时 reader 保持为主库
+        """
+        sync_session = getattr(session, "sync_session", session)
+        sync_session.info["user_id"] = user_id
+        if method not in READ_METHODS:
+            self.primary_reads += 1
+            return
+        if user_id is not None and self._recent_writers.get(user_id):
+            self.pinned_reads += 1
+            return
+        replica = self.pick()
+        if replica is None:
+            self.primary_reads += 1
+            return
+        self.replica_reads += 1
+        if sync_session is session:
+            sync_session.reader = replica.engine
+        else:
+            sync_session.reader = replica.async_engine.sync_engine
+
+    def _mark(self, replica: Replica, healthy: bool, lag: float | None, error: str | None) -> None:
+        replica.lag_seconds = lag
+        replica.last_error = error
+        if healthy == replica.healthy:
+            return
+        replica.healthy = healthy
+        if healthy:
+            print(f"提示: 读副本 {replica.name} 已恢复")
+        else:
+            replica.failures += 1
+            self.failovers += 1
+            print(f"警告: 读副本 {replica.name} 暂停使用，读请求改走主库: {error}")
+
+    def check(self) -> None:
+        """检查每个副本能否连上、复制延迟是否在允许范围内"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    lag = float(conn.execute(LAG_QUERY).scalar() or 0)
+            except Exception as e:  # noqa: BLE001
+                self._mark(replica, False, None, str(e))
+                continue
+            if lag > self.max_lag_seconds:
+                self._mark(replica, False, lag, f"复制延迟 {lag:.1f}s")
+            else:
+                self._mark(replica, True, lag, None)
+
+    def start(self) -> None:
+        """先同步检查一遍，再启动后台检查线程"""
+        if self._thread is not None:
+            return
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="replica-health", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_seconds):
+            self.check()
+
+    def stats(self) -> dict:
+        return {
+            "replicas": {
+                r.name: {
+                    "healthy": r.healthy,
+                    "lag_seconds": r.lag_seconds,
+                    "failures": r.failures,
+                    "last_error": r.last_error,
+                }
+                for r in self.replicas
+            },
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+            "failovers": self.failovers,
+        }
@@ -0,0 +1,51 @@
+from sqlalchemy import Select, TextClause, event
+from sqlalchemy.orm import Session
+
+
+def _is_read(clause) -> bool:
+    if isinstance(clause, Select):
+        return clause._for_update_arg is None
+    # 检索之类手写的 SELECT
+    if isinstance(clause, TextClause):
+        sql = clause.text.lstrip().upper()
+        return sql.startswith("SELECT") and "FOR UPDATE" not in sql
+    return False
+
+
+class RoutingSession(Session):
+    """
+    读写分离的会话：
+    - 普通 SELECT 走 reader（只读连接池）
+    - flush、UPDATE / INSERT / DELETE、其他 text() 以及 SELECT ... FOR UPDATE 走 writer
+    - 事务里一旦用过 writer，之后的读也走 writer，才能读到自己还没提交的写入；
+      事务结束（提交或回滚）后重新从 reader 读
+    - wrote 记录当前事务是否发出过写操作，提交后的回调据此判断"刚写过"（见 app/db/replicas.py）
+    reader 可以在用会话之前换掉（比如换成某个读副本，或者直接换成 writer）。
+    """
+
+    def __init__(self, *args, writer, reader, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.reader = reader
+        self.pinned = False
+        self.wrote = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if mapper is None and clause is None:
+            # 只是查方言（app/core/search.py），读写两边是同一种数据库，不改变路由状态
+            return self.writer
+        if _is_read(clause):
+            if not self.pinned:
+                return self.reader
+        else:
+            self.wrote = True
+        self.pinned = True
+        return self.writer
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _unpin(session: RoutingSession, transaction) -> None:
+    # 只在最外层事务结束时恢复，SAVEPOINT 结束不算
+    if transaction.parent is None:
+        session.pinned = False
+        session.wrote = False
@@ -1,22 +1,98 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 import os
 
-from app.core.config import settings
+from app.core import metrics
+from app.core.config import async_uri, settings
+from app.db.replicas import Replica, ReplicaSet
+from app.db.routing import RoutingSession
 
 
 # 根据数据库类型配置连接参数
 db_type = os.getenv("DATABASE_TYPE", settings.DATABASE_TYPE).lower()
+sqlite_production = db_type != "postgresql" and settings.SQLITE_PRODUCTION
 
+
+def sqlite_readonly_uri(uri: str) -> str:
+    """sqlite:///./kuleme.db -> sqlite:///file:./kuleme.db?mode=ro&uri=true"""
+    prefix, _, path = uri.partition(":///")
+    return f"{prefix}:///file:{path}?mode=ro&uri=true"
+
+
+def sqlite_pragmas(readonly: bool):
+    """SQLite 生产配置：每个新连接都要设置一遍（journal_mode 写进库文件，其余只对当前连接有效）"""
+
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+        if readonly:
+            cursor.execute("PRAGMA query_only = ON")
+        else:
+            cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.close()
+
+    return on_connect
+
+
+def sqlite_engines(create, uri: str):
+    """
+    SQLite 生产配置的两个引擎：
+    - 写引擎只有一个连接，写事务在连接池上排队（不会再有 database is locked）
+    - 只读引擎（mode=ro）是一组连接，WAL 下读不会被写阻塞
+    create 是 create_engine 或 create_async_engine
+    """
+    writer = create(
+        uri,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_WRITE_TIMEOUT_SECONDS,
+        echo=False,
+    )
+    reader = create(
+        sqlite_readonly_uri(uri),
+        connect_args={"check_same_thread": False},
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=settings.SQLITE_READ_POOL_OVERFLOW,
+        echo=False,
+    )
+    for e, readonly in ((writer, False), (reader, True)):
+        event.listen(getattr(e, "sync_engine", e), "connect", sqlite_pragmas(readonly))
+    return writer, reader
+
+
+def replica_engine(create, uri: str):
+    """读副本的引擎，连接池大小单独配置"""
+    return create(
+        uri,
+        pool_size=settings.DB_REPLICA_POOL_SIZE,
+        max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=False,
+    )
+
+
+read_engine = None
+replica_list: list[Replica] = []
 if db_type == "postgresql":
     # PostgreSQL 连接池配置
     engine = create_engine(
         settings.SQLALCHEMY_DATABASE_URI,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
         pool_pre_ping=True,  # 自动重连
         echo=False,  # 设置为 True 可以看到 SQL 日志
     )
+    for uri in settings.POSTGRES_REPLICA_URIS:
+        e = replica_engine(create_engine, uri)
+        replica_list.append(Replica(f"{e.url.host}:{e.url.port}", e))
+elif sqlite_production:
+    # 迁移脚本、建表直接用写引擎
+    engine, read_engine = sqlite_engines(create_engine, settings.SQLALCHEMY_DATABASE_URI)
 else:
     # SQLite 连接配置（不需要连接池）
     engine = create_engine(
@@ -25,5 +101,77 @@ else:
         echo=False,  # 设置为 True 可以看到 SQL 日志
     )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if read_engine is not None or replica_list:
+    # 有读副本时 reader 默认是主库，get_db 按请求换成副本
+    SessionLocal = sessionmaker(
+        class_=RoutingSession,
+        writer=engine,
+        reader=read_engine if read_engine is not None else engine,
+        autocommit=False,
+        autoflush=False,
+    )
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# 异步引擎（DB_ASYNC）：只给接口用，迁移脚本和后台线程仍然用上面的同步引擎
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+    if db_type == "postgresql":
+        async_engine = create_async_engine(
+            settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            echo=False,
+        )
+        if replica_list:
+            for replica in replica_list:
+                replica.async_engine = replica_engine(
+                    create_async_engine,
+                    async_uri(replica.engine.url.render_as_string(hide_password=False)),
+                )
+            AsyncSessionLocal = async_sessionmaker(
+                sync_session_class=RoutingSession,
+                writer=async_engine.sync_engine,
+                reader=async_engine.sync_engine,
+                autocommit=False,
+                autoflush=False,
+            )
+        else:
+            AsyncSessionLocal = async_sessionmaker(
+                bind=async_engine, autocommit=False, autoflush=False
+            )
+    elif sqlite_production:
+        # 接口用异步写连接，后台线程用同步写连接，两者之间靠 busy_timeout 排队
+        async_engine, async_read_engine = sqlite_engines(
+            create_async_engine, settings.SQLALCHEMY_ASYNC_DATABASE_URI
+        )
+        AsyncSessionLocal = async_sessionmaker(
+            sync_session_class=RoutingSession,
+            writer=async_engine.sync_engine,
+            reader=async_read_engine.sync_engine,
+            autocommit=False,
+            autoflush=False,
+        )
+    else:
+        async_engine = create_async_engine(
+            settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+            echo=False,
+        )
+        AsyncSessionLocal = async_sessionmaker(
+            bind=async_engine, autocommit=False, autoflush=False
+        )
+
+# 读副本：健康检查线程由 main.py 的 lifespan 启动
+replicas = None
+if replica_list:
+    replicas = ReplicaSet(
+        replica_list,
+        check_seconds=settings.REPLICA_HEALTH_CHECK_SECONDS,
+        max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+        read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    )
+    metrics.register("read_replicas", replicas.stats)
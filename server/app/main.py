@@ -1,11 +1,19 @@
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
-from app.db.base import Base
-from app.db.session import engine
+from app.core.likes import like_buffer
+from app.core.notifier import notifier
+from app.core.pubsub import broker
+from app.core.revocation import revocations
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.sqlstats import DB_QUERIES_HEADER, QueryStatsMiddleware
+from app.db.migrations import check_schema
+from app.db.session import SessionLocal, engine, replicas
 from app.routers import (
     auth,
     users,
@@ -18,11 +26,38 @@ from app.routers import (
     growth,
     medals,
     review,
+    metrics,
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 表结构由 python -m app.db.migrate 在部署时升级，这里只检查版本，落后时拒绝启动
+    check_schema(engine)
+    # 点赞写后合并：启动时先合并上次遗留的增量，退出时把剩下的合并完
+    if settings.LIKE_WRITE_BEHIND:
+        like_buffer.start(SessionLocal)
+    # token 吊销名单：启动时从库里加载，之后后台定时同步其他进程的吊销记录
+    revocations.start(SessionLocal)
+    # PostgreSQL 读副本：启动时检查一遍，之后后台定时检查，不健康的副本暂停使用
+    if replicas is not None:
+        replicas.start()
+    # 实时推送的后端（redis 后端会起一个订阅线程）
+    broker.start()
+    # 通知生成管道：退出时先把队列里的事件写完
+    if settings.NOTIFY_ENABLED:
+        notifier.start(SessionLocal)
+    yield
+    notifier.stop()
+    like_buffer.stop()
+    broker.stop()
+    revocations.stop()
+    if replicas is not None:
+        replicas.stop()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.PROJECT_NAME)
+    app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
     # 允许 Flutter App 访问（开发时可以先放开）
     app.add_middleware(
@@ -31,28 +66,11 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", DB_QUERIES_HEADER, "Server-Timing"],
     )
+    # 每个请求的 SQL 语句数 / 数据库耗时，慢查询日志和 N+1 检查
+    app.add_middleware(QueryStatsMiddleware)
 
-    # 创建数据库表
-    Base.metadata.create_all(bind=engine)
-    
-    # 执行数据库迁移（添加用户表新字段）
-    try:
-        import sys
-        import os as os_module
-        # 添加server目录到路径
-        server_dir = os_module.path.dirname(os_module.path.dirname(os_module.path.abspath(__file__)))
-        if server_dir not in sys.path:
-            sys.path.insert(0, server_dir)
-        from migrate_add_user_fields import migrate_database
-        migrate_database()
-    except ImportError as e:
-        # 如果迁移脚本不存在，跳过（首次运行时会自动创建表）
-        print(f"提示: 跳过数据库迁移（{e}）")
-    except Exception as e:
-        # 迁移失败不影响启动，但会记录错误
-        print(f"警告: 数据库迁移失败: {e}")
-    
     # 创建上传目录
     os.makedirs("uploads/avatars", exist_ok=True)
     
@@ -71,6 +89,7 @@ def create_app() -> FastAPI:
     app.include_router(growth.router)
     app.include_router(medals.router)
     app.include_router(review.router)
+    app.include_router(metrics.router)
 
     return app
 
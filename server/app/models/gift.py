@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -29,9 +29,13 @@ class Gift(Base):
 
 class ExchangeRecord(Base):
     __tablename__ = "exchange_records"
+    __table_args__ = (
+        # 兑换记录按用户过滤、按时间倒序翻页
+        Index("ix_exchange_records_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     gift_id = Column(Integer, nullable=False)
     gift_name = Column(String, nullable=False)
     points_used = Column(Integer, default=0, nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 
 from app.db.base import Base
 
@@ -18,9 +18,13 @@ class UserLevel(Base):
 class PointsRecord(Base):
     """积分记录"""
     __tablename__ = "points_records"
+    __table_args__ = (
+        # 积分记录按用户过滤、按时间倒序翻页
+        Index("ix_points_records_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     amount = Column(Integer, nullable=False)  # 正数为获得，负数为消耗
     description = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -12,6 +12,18 @@ class Interaction(Base):
     """
 
     __tablename__ = "interactions"
+    __table_args__ = (
+        # 同一用户对同一帖子的同一种互动只能有一条；也覆盖切换时的存在性检查和批量状态查询
+        Index(
+            "uq_interactions_user_post_action",
+            "user_id",
+            "post_id",
+            "action_type",
+            unique=True,
+        ),
+        # 删帖时按帖子找互动记录
+        Index("ix_interactions_post_id_user_id_action_type", "post_id", "user_id", "action_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -24,3 +36,18 @@ class Interaction(Base):
     user = relationship("User", backref="interactions")
     post = relationship("Post", backref="interactions")
 
+
+
+class LikeDelta(Base):
+    """
+    点赞计数的待合并增量（写后合并模式下使用，只追加）。
+    和互动记录在同一个事务里写入，后台定期按帖子汇总后加到 posts.likes 并删除。
+    post_id 不加外键：帖子删除时可能还有没合并的增量，合并时直接丢弃。
+    """
+
+    __tablename__ = "like_deltas"
+
+    id = Column(Integer, primary_key=True)
+    post_id = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -28,9 +28,13 @@ class Medal(Base):
 class UserMedal(Base):
     """用户勋章关联表"""
     __tablename__ = "user_medals"
+    __table_args__ = (
+        # 每个用户每枚勋章只有一条进度；也覆盖按用户查已解锁数
+        Index("uq_user_medals_user_medal", "user_id", "medal_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     medal_id = Column(Integer, nullable=False, index=True)
     is_unlocked = Column(Boolean, default=False, nullable=False)
     progress = Column(Integer, default=0, nullable=False)  # 当前进度
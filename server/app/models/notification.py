@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -8,6 +8,12 @@ from app.db.base import Base
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # 通知列表按 (created_at, id) 倒序游标分页
+        Index("ix_notifications_user_id_created_at_id", "user_id", "created_at", "id"),
+        # 全部已读、通知合并时查窗口内未读的通知
+        Index("ix_notifications_user_id_is_read_created_at", "user_id", "is_read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -17,8 +23,68 @@ class Notification(Base):
     content = Column(String(500), nullable=False)
     related_id = Column(String(50), nullable=True)  # 关联的 post/comment id
 
+    # 合并通知："A、B 等 N 人赞了你的吐槽"，同类事件在时间窗口内更新这一行而不是新插一行
+    actor_count = Column(Integer, nullable=False, default=1)
+    latest_actors = Column(Text, nullable=True)  # 最近几个操作人，JSON: [{"id", "nickname"}]
+
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)  # 最近一次合并进来的时间
 
     user = relationship("User", backref="notifications")
 
+
+
+class NotificationCounter(Base):
+    """
+    每个用户的未读通知数。
+    写通知、标记已读时在同一个事务里增减，角标直接读这一行，不用数通知表。
+    全站广播不计入 unread，按 broadcast_seen_id 在读取时现算。
+    """
+
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+    # 已读到的最后一条全站广播；比它新的广播算未读
+    broadcast_seen_id = Column(Integer, nullable=False, default=0)
+
+
+class NotificationArchive(Base):
+    """归档的旧通知（已读且超过保留期），结构和 notifications 一致"""
+
+    __tablename__ = "notifications_archive"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+
+    type = Column(String(20), nullable=False)
+    title = Column(String(100), nullable=False)
+    content = Column(String(500), nullable=False)
+    related_id = Column(String(50), nullable=True)
+
+    actor_count = Column(Integer, nullable=False, default=1)
+    latest_actors = Column(Text, nullable=True)
+
+    is_read = Column(Boolean, default=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Broadcast(Base):
+    """
+    全站系统通知（type=system）。
+    只写一行，不给每个用户插通知；读通知列表和未读数时按用户注册时间、已读游标合并进去。
+    """
+
+    __tablename__ = "broadcasts"
+    __table_args__ = (
+        # 通知列表里按 created_at 倒序、id 正序合并，倒着扫这个索引正好是这个顺序
+        Index("ix_broadcasts_created_at_id", "created_at", text("id DESC")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(100), nullable=False)
+    content = Column(String(500), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
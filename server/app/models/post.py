@@ -1,13 +1,22 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Float, Boolean
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
+# post_tags / tag_stats 里标签的最大长度，发帖接口按它校验
+TAG_MAX_LENGTH = 50
+
 
 class Post(Base):
   __tablename__ = "posts"
+  __table_args__ = (
+    # 游标分页：按 (created_at, id) 倒序翻页
+    Index("ix_posts_created_at_id", "created_at", "id"),
+    # 我的帖子：按用户过滤后再按时间翻页
+    Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+  )
 
   id = Column(Integer, primary_key=True, index=True)
   user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -26,3 +35,41 @@ class Post(Base):
 
   user = relationship("User", backref="posts")
 
+
+
+class PostTag(Base):
+  """帖子-标签关联表，按标签筛选帖子流时走 (tag, created_at, post_id) 索引"""
+  __tablename__ = "post_tags"
+  __table_args__ = (
+    Index("ix_post_tags_tag_created_at_post_id", "tag", "created_at", "post_id"),
+  )
+
+  post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+  tag = Column(String(TAG_MAX_LENGTH), primary_key=True)
+  created_at = Column(DateTime, nullable=False)  # 冗余帖子发布时间，用于按标签翻页
+
+
+class TagStat(Base):
+  """每个标签下的帖子数（计数器，随发帖/改帖/删帖增减）"""
+  __tablename__ = "tag_stats"
+  __table_args__ = (
+    # 热门标签按帖子数倒序
+    Index("ix_tag_stats_post_count", "post_count"),
+  )
+
+  tag = Column(String(TAG_MAX_LENGTH), primary_key=True)
+  post_count = Column(Integer, default=0, nullable=False)
+
+
+class PostScore(Base):
+  """
+  帖子热度分（热门吐槽流）。
+  点赞、评论时增量更新单条记录，列表直接按 (score, post_id) 索引倒序取，不做全表排序。
+  """
+  __tablename__ = "post_scores"
+  __table_args__ = (
+    Index("ix_post_scores_score_post_id", "score", "post_id"),
+  )
+
+  post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+  score = Column(Float, nullable=False, default=0.0)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -16,9 +16,13 @@ class RecoveryRecordType(str, enum.Enum):
 
 class RecoveryRecord(Base):
     __tablename__ = "recovery_records"
+    __table_args__ = (
+        # 回血记录按用户过滤、按时间倒序翻页
+        Index("ix_recovery_records_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     type = Column(SQLEnum(RecoveryRecordType), nullable=False)
     amount = Column(Float, nullable=False)  # 正数为收入，负数为支出
     description = Column(String, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Float, Integer, String
 
 from app.db.base import Base
 
@@ -23,3 +23,22 @@ class User(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+
+
+class RevokedToken(Base):
+    """
+    已吊销的 token，两种记录：
+    - jti 不为空：吊销单个 token（退出登录、refresh token 用过一次即作废）
+    - jti 为空：吊销该用户 revoked_before 之前签发的全部 token（改密码）
+    过了 expires_at 对应的 token 本来就失效了，记录可以删掉。
+    鉴权时查的是内存里的名单（app/core/revocation.py），这张表用于进程间同步和重启恢复。
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, nullable=True)
+    user_id = Column(Integer, nullable=False)
+    revoked_before = Column(Float, nullable=True)  # 时间戳，和 JWT 的 iat 比较
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # 进程间增量同步
@@ -1,13 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, verify_password, get_password_hash
-from app.core.deps import get_db
+from app.core.security import (
+    REFRESH_TOKEN_TYPE,
+    create_access_token,
+    create_refresh_token,
+    get_password_hash,
+    password_needs_rehash,
+    verify_password,
+)
+from app.core.config import settings
+from app.core.deps import credentials_exception, decode_claims, get_db, oauth2_scheme
+from app.core.identity import invalidate_user
+from app.core.revocation import revocations
+from app.core.routing import DBRouter
 from app.models.user import User
-from app.schemas.auth import LoginRequest, PasswordLoginRequest, RegisterRequest, ResetPasswordRequest, Token
+from app.schemas.auth import (
+    LoginRequest,
+    LogoutRequest,
+    PasswordLoginRequest,
+    RefreshRequest,
+    RegisterRequest,
+    ResetPasswordRequest,
+    Token,
+)
 
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+# 登录注册要算 bcrypt（会阻塞），异步模式下也留在线程池
+router = DBRouter(prefix="/auth", tags=["auth"], blocking=True)
+
+
+def issue_tokens(user_id: int) -> Token:
+    return Token(
+        access_token=create_access_token(str(user_id)),
+        refresh_token=create_refresh_token(str(user_id)),
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
 
 
 @router.post("/login", response_model=Token)
@@ -38,8 +66,7 @@ def login(
         db.commit()
         db.refresh(user)
 
-    token = create_access_token(str(user.id))
-    return Token(access_token=token)
+    return issue_tokens(user.id)
 
 
 @router.post("/login/password", response_model=Token)
@@ -52,7 +79,13 @@ def login_with_password(
     - 使用手机号作为账号
     - 验证密码
     """
-    user = db.query(User).filter(User.phone == data.phone).first()
+    user = (
+        db.query(User.id, User.password_hash)
+        .filter(User.phone == data.phone)
+        .first()
+    )
+    # 算哈希要几百毫秒，先结束读事务把数据库连接还回连接池
+    db.rollback()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -70,9 +103,21 @@ def login_with_password(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="密码错误",
         )
+
+    # 老哈希的 cost 和当前配置不一致时，趁明文还在顺手重新哈希；哈希池繁忙就等下次登录
+    if password_needs_rehash(user.password_hash):
+        try:
+            new_hash = get_password_hash(data.password)
+        except HTTPException:
+            new_hash = None
+        if new_hash:
+            db.query(User).filter(User.id == user.id).update(
+                {User.password_hash: new_hash}, synchronize_session=False
+            )
+            db.commit()
+            invalidate_user(user.id)
     
-    token = create_access_token(str(user.id))
-    return Token(access_token=token)
+    return issue_tokens(user.id)
 
 
 @router.post("/register", response_model=Token)
@@ -108,25 +153,27 @@ def register(
         )
     
     # 检查用户是否已存在
-    existing_user = db.query(User).filter(User.phone == data.phone).first()
+    existing_user = db.query(User.id).filter(User.phone == data.phone).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="该手机号已被注册",
         )
+    # 算哈希期间不占用数据库连接
+    db.rollback()
+    password_hash = get_password_hash(data.password)
     
     # 创建新用户
     user = User(
         phone=data.phone,
         nickname=f"亏友_{data.phone[-4:]}",
-        password_hash=get_password_hash(data.password),
+        password_hash=password_hash,
     )
     db.add(user)
     db.commit()
     db.refresh(user)
     
-    token = create_access_token(str(user.id))
-    return Token(access_token=token)
+    return issue_tokens(user.id)
 
 
 @router.post("/reset-password")
@@ -167,11 +214,59 @@ def reset_password(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="用户不存在",
         )
+    # 算哈希期间不占用数据库连接（rollback 会让 user 过期，提交前重新加载）
+    db.rollback()
+    password_hash = get_password_hash(data.new_password)
     
-    # 更新密码
-    user.password_hash = get_password_hash(data.new_password)
+    # 更新密码，之前签发的 token 全部作废（其他设备需要重新登录）
+    user.password_hash = password_hash
+    revocations.revoke_user(db, user.id)
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
     
     return {"message": "密码重置成功"}
 
+
+@router.post("/refresh", response_model=Token)
+def refresh(
+    data: RefreshRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    用 refresh token 换一对新的 token：
+    - 旧的 refresh token 立即作废，只能用一次；重复使用返回 401
+    - 改过密码之后，之前签发的 refresh token 一律 401
+    """
+    payload = decode_claims(data.refresh_token, REFRESH_TOKEN_TYPE)
+    user_id = int(payload["sub"])
+    # 换新很少发生，先拉一次吊销名单，别的进程刚吊销的也能立即生效
+    revocations.sync(db)
+    if revocations.is_revoked(payload["jti"], user_id, payload["iat"]):
+        raise credentials_exception()
+    # jti 唯一：两个请求同时拿同一个 refresh token 来换，只有一个能成功
+    if not revocations.revoke_token(db, payload["jti"], user_id, payload["exp"]):
+        db.rollback()
+        raise credentials_exception()
+    db.commit()
+    return issue_tokens(user_id)
+
+
+@router.post("/logout")
+def logout(
+    data: LogoutRequest,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+):
+    """退出登录：吊销当前 access token，传了 refresh token 的话一并吊销"""
+    access = decode_claims(token)
+    user_id = int(access["sub"])
+    if "jti" in access:
+        revocations.revoke_token(db, access["jti"], user_id, access["exp"])
+    if data.refresh_token:
+        refresh_claims = decode_claims(data.refresh_token, REFRESH_TOKEN_TYPE)
+        if int(refresh_claims["sub"]) != user_id:
+            raise credentials_exception()
+        revocations.revoke_token(db, refresh_claims["jti"], user_id, refresh_claims["exp"])
+    db.commit()
+    return {"message": "已退出登录"}
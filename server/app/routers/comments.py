@@ -1,31 +1,37 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user
+from app.core.cache import feed_cache
+from app.core.counters import bump_comments
+from app.core.deps import get_db, get_current_user_id
+from app.core.notifier import NotificationEvent, notifier
+from app.core.responses import FastJSONResponse
+from app.core.routing import DBRouter
 from app.models.comment import Comment
-from app.models.post import Post
-from app.models.user import User
 from app.schemas.comment import CommentCreate, CommentOut
 
 
-router = APIRouter(prefix="/posts/{post_id}/comments", tags=["comments"])
+router = DBRouter(prefix="/posts/{post_id}/comments", tags=["comments"])
+
+# 只读列表走预先构造好的 Core 语句，列名和 CommentOut 一致，行直接转 dict 输出
+_COMMENT_ROWS = (
+    select(Comment.content, Comment.id, Comment.user_id, Comment.post_id)
+    .where(Comment.post_id == bindparam("post_id"))
+    .order_by(Comment.created_at.desc())
+)
 
 
 @router.get("/", response_model=List[CommentOut])
 def list_comments(
     post_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
 ):
-    comments = (
-        db.query(Comment)
-        .filter(Comment.post_id == post_id)
-        .order_by(Comment.created_at.desc())
-        .all()
-    )
-    return comments
+    rows = db.execute(_COMMENT_ROWS, {"post_id": post_id})
+    return FastJSONResponse([row._asdict() for row in rows])
 
 
 @router.post("/", response_model=CommentOut, status_code=status.HTTP_201_CREATED)
@@ -33,10 +39,10 @@ def create_comment(
     post_id: int,
     data: CommentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+    # 同步更新帖子评论数（原子 UPDATE，并发评论不会丢计数）
+    if bump_comments(db, post_id, 1) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
@@ -44,15 +50,18 @@ def create_comment(
 
     comment = Comment(
         post_id=post_id,
-        user_id=current_user.id,
+        user_id=current_user_id,
         content=data.content,
     )
     db.add(comment)
 
-    # 同步更新帖子评论数
-    post.comments_count += 1
-
     db.commit()
+    feed_cache.invalidate_post(post_id)
+    notifier.publish(
+        NotificationEvent(
+            type="comment", actor_id=current_user_id, post_id=post_id, text=data.content
+        )
+    )
     db.refresh(comment)
     return comment
 
@@ -1,26 +1,35 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_db, get_current_user
+from app.core.etag import etag_matches, not_modified, row_etag
+from app.core.routing import DBRouter
 from app.models.user import User
 from app.models.gift import Gift, ExchangeRecord
 from app.models.recovery import UserBalance
 from app.schemas.gift import GiftOut, ExchangeRecordOut, ExchangeRequest
 
-router = APIRouter(prefix="/gifts", tags=["gifts"])
+router = DBRouter(prefix="/gifts", tags=["gifts"])
 
 
 @router.get("", response_model=List[GiftOut])
 def get_gifts(
+    response: Response,
     type: str | None = None,  # physical, virtual, limited
     db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
 ):
     """获取礼品列表"""
     query = db.query(Gift)
     if type:
         query = query.filter(Gift.type == type)
     gifts = query.all()
+    # 库存等字段没变时直接 304
+    etag = row_etag(*gifts, scope=f"gifts:{type}")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return gifts
 
 
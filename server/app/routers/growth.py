@@ -1,8 +1,11 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import Depends
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_db, get_current_user
+from app.core.responses import FastJSONResponse
+from app.core.routing import DBRouter
 from app.models.user import User
 from app.models.growth import UserLevel, PointsRecord
 from app.models.recovery import UserBalance
@@ -13,7 +16,21 @@ from app.schemas.growth import (
     GrowthSummaryOut,
 )
 
-router = APIRouter(prefix="/growth", tags=["growth"])
+router = DBRouter(prefix="/growth", tags=["growth"])
+
+_POINTS_RECORD_ROWS = (
+    select(
+        PointsRecord.id,
+        PointsRecord.user_id,
+        PointsRecord.amount,
+        PointsRecord.description,
+        PointsRecord.created_at,
+    )
+    .where(PointsRecord.user_id == bindparam("user_id"))
+    .order_by(PointsRecord.created_at.desc())
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
 
 
 @router.get("/summary", response_model=GrowthSummaryOut)
@@ -92,12 +109,8 @@ def get_points_records(
     db: Session = Depends(get_db),
 ):
     """获取积分记录"""
-    records = (
-        db.query(PointsRecord)
-        .filter(PointsRecord.user_id == current_user.id)
-        .order_by(PointsRecord.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    rows = db.execute(
+        _POINTS_RECORD_ROWS,
+        {"user_id": current_user.id, "skip": skip, "limit": limit},
     )
-    return records
+    return FastJSONResponse([row._asdict() for row in rows])
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user
+from app.core.cache import feed_cache
+from app.core.counters import bump_likes
+from app.core.deps import get_db, get_current_user_id
+from app.core.likes import like_buffer
+from app.core.notifier import NotificationEvent, notifier
+from app.core.routing import DBRouter
 from app.models.interaction import Interaction
 from app.models.post import Post
-from app.models.user import User
 
 
-router = APIRouter(prefix="/posts/{post_id}/interactions", tags=["interactions"])
+router = DBRouter(prefix="/posts/{post_id}/interactions", tags=["interactions"])
 
 
 @router.post("/")
@@ -15,7 +20,7 @@ def interact_post(
     post_id: int,
     action: str,  # like / heart
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
 ):
     if action not in {"like", "heart"}:
         raise HTTPException(
@@ -23,38 +28,62 @@ def interact_post(
             detail="Invalid action type",
         )
 
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+    likes = db.query(Post.likes).filter(Post.id == post_id).scalar()
+    if likes is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
         )
 
-    # 简化：同一用户对同一帖子多次点击相同 action 会切换开关
-    existing = (
+    # 简化：同一用户对同一帖子多次点击相同 action 会切换开关。
+    # 先删后插：删掉了就是取消；否则插入，(user_id, post_id, action_type) 唯一索引
+    # 保证并发的重复点击只有一个能插进去，输掉的一方视为已经点过，不再重复计数。
+    removed = (
         db.query(Interaction)
         .filter(
             Interaction.post_id == post_id,
-            Interaction.user_id == current_user.id,
+            Interaction.user_id == current_user_id,
             Interaction.action_type == action,
         )
-        .first()
+        .delete(synchronize_session=False)
     )
+    delta = -1 if removed else 1
+    if not removed:
+        try:
+            with db.begin_nested():
+                db.add(
+                    Interaction(
+                        post_id=post_id,
+                        user_id=current_user_id,
+                        action_type=action,
+                    )
+                )
+        except IntegrityError:
+            delta = 0
 
-    if existing:
-        db.delete(existing)
-        if action == "like":
-            post.likes = max(0, post.likes - 1)
-    else:
-        inter = Interaction(
-            post_id=post_id,
-            user_id=current_user.id,
-            action_type=action,
-        )
-        db.add(inter)
-        if action == "like":
-            post.likes += 1
+    if action != "like" or not delta:
+        db.commit()
+        return {"success": True, "likes": likes + like_buffer.pending(post_id)}
+
+    if like_buffer.enabled:
+        # 写后合并模式：只追加增量，posts.likes 和热度分由后台批量更新
+        delta_id = like_buffer.record(db, post_id, delta)
+        try:
+            db.commit()
+        except Exception:
+            like_buffer.discard(post_id, delta_id)
+            raise
+        _notify_like(post_id, current_user_id, delta)
+        return {"success": True, "likes": likes + like_buffer.pending(post_id)}
 
+    likes = bump_likes(db, post_id, delta)
     db.commit()
-    return {"success": True, "likes": post.likes}
+    feed_cache.invalidate_post(post_id)
+    _notify_like(post_id, current_user_id, delta)
+    return {"success": True, "likes": likes}
+
 
+def _notify_like(post_id: int, user_id: int, delta: int) -> None:
+    # 只有点赞才通知，取消点赞不通知
+    if delta > 0:
+        notifier.publish(NotificationEvent(type="like", actor_id=user_id, post_id=post_id))
@@ -1,21 +1,26 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import Depends, Header, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 
 from app.core.deps import get_db, get_current_user
+from app.core.etag import etag_matches, not_modified, row_etag
+from app.core.routing import DBRouter
 from app.models.user import User
 from app.models.medal import Medal, UserMedal, MedalRarity
 from app.schemas.medal import MedalOut, MedalWithProgress
 
-router = APIRouter(prefix="/medals", tags=["medals"])
+router = DBRouter(prefix="/medals", tags=["medals"])
 
 
 @router.get("", response_model=List[MedalWithProgress])
 def get_medals(
+    response: Response,
     rarity: str | None = None,  # common, rare, epic, legendary
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
 ):
     """获取勋章列表（带用户进度）"""
     query = db.query(Medal)
@@ -28,7 +33,7 @@ def get_medals(
             pass
 
     medals = query.all()
-    result = []
+    user_medals = []
 
     for medal in medals:
         user_medal = (
@@ -44,16 +49,38 @@ def get_medals(
 
         if not user_medal:
             # 初始化用户勋章记录
-            user_medal = UserMedal(
-                user_id=current_user.id,
-                medal_id=medal.id,
-                is_unlocked=False,
-                progress=0,
-            )
-            db.add(user_medal)
+            try:
+                with db.begin_nested():
+                    user_medal = UserMedal(
+                        user_id=current_user.id,
+                        medal_id=medal.id,
+                        is_unlocked=False,
+                        progress=0,
+                    )
+                    db.add(user_medal)
+            except IntegrityError:
+                # 并发请求刚好先建了这一行（唯一索引 uq_user_medals_user_medal）
+                user_medal = (
+                    db.query(UserMedal)
+                    .filter(
+                        UserMedal.user_id == current_user.id,
+                        UserMedal.medal_id == medal.id,
+                    )
+                    .one()
+                )
             db.commit()
             db.refresh(user_medal)
 
+        user_medals.append(user_medal)
+
+    # 勋章和进度都没变时直接 304，不构造响应
+    etag = row_etag(*medals, *user_medals, scope=f"medals:{current_user.id}")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    result = []
+    for medal, user_medal in zip(medals, user_medals):
         result.append(
             MedalWithProgress(
                 id=medal.id,
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from app.core import metrics
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+def get_metrics():
+    """运行时指标（缓存命中率等），供监控采集"""
+    return metrics.snapshot()
@@ -1,61 +1,248 @@
+import asyncio
+import json
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user
-from app.models.notification import Notification
+from app.core.config import settings
+from app.core.deps import (
+    decode_stream_ticket,
+    decode_user_id,
+    get_current_user,
+    get_current_user_id,
+    get_db,
+)
+from app.core.broadcasts import broadcast_rows
+from app.core.pagination import cursor_headers, decode_cursor, encode_cursor, paginate
+from app.core.pubsub import broker, sse_message
+from app.core.responses import FastJSONResponse
+from app.core.security import create_stream_ticket
+from app.core.unread import (
+    bump_unread,
+    get_broadcast_seen_id,
+    get_unread,
+    mark_broadcasts_seen,
+)
+from app.core.routing import DBRouter
+from app.models.notification import Broadcast, Notification
+from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas.notification import NotificationOut
 
 
-router = APIRouter(prefix="/notifications", tags=["notifications"])
+router = DBRouter(prefix="/notifications", tags=["notifications"])
+
+# 推送接口：浏览器 EventSource 不能带请求头，改用 /notifications/stream-ticket 换来的短期凭证（?ticket=）；
+# access token 只认请求头，不放进 URL
+_optional_oauth2 = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+_NOTIFICATION_ROWS = (
+    select(
+        Notification.id,
+        Notification.type,
+        Notification.title,
+        Notification.content,
+        Notification.related_id,
+        Notification.is_read,
+        Notification.created_at,
+        Notification.actor_count,
+        Notification.latest_actors,
+        Notification.updated_at,
+    )
+    .where(Notification.user_id == bindparam("user_id"))
+)
+
+
+def _notification_out(row) -> dict:
+    out = row._asdict()
+    out["latest_actors"] = json.loads(row.latest_actors) if row.latest_actors else []
+    return out
 
 
 @router.get("/", response_model=List[NotificationOut])
 def list_notifications(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    cursor: str | None = Query(default=None),
+    skip: int = 0,
+    limit: int = Query(default=20, ge=1, le=100),
 ):
-    qs = (
-        db.query(Notification)
-        .filter(Notification.user_id == current_user.id)
-        .order_by(Notification.created_at.desc())
-        .all()
+    """
+    通知列表，按时间倒序游标分页；下一页游标在 X-Next-Cursor 响应头里。
+    全站广播（id 为负数）在这里和个人通知按时间合并。
+    """
+    before = decode_cursor(cursor) if cursor else None
+    # 两边各取够一页（offset 分页时取 skip+limit），合并后再截取
+    take = limit if before else skip + limit
+    rows, _ = paginate(
+        db,
+        _NOTIFICATION_ROWS.params(user_id=current_user.id),
+        cursor, 0, take,
+        Notification.created_at,
+        Notification.id,
+    )
+    items = [_notification_out(row) for row in rows]
+    items += broadcast_rows(
+        db,
+        current_user.created_at,
+        get_broadcast_seen_id(db, current_user.id),
+        before,
+        take,
     )
-    return qs
+    items.sort(key=lambda item: (item["created_at"], item["id"]), reverse=True)
+    items = items[:limit] if before else items[skip:skip + limit]
+
+    next_cursor = None
+    if len(items) == limit:
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+    return FastJSONResponse(items, headers=cursor_headers(next_cursor))
+
+
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    """未读数（App 角标）：维护好的个人通知计数 + 未读广播数，不扫通知表"""
+    return {"unread": get_unread(db, current_user_id)}
+
+
+@router.post("/stream-ticket")
+async def create_notification_stream_ticket(
+    current_user_id: int = Depends(get_current_user_id),
+):
+    """换一张推送凭证，STREAM_TICKET_EXPIRE_SECONDS 秒内用它连 /notifications/stream?ticket="""
+    return {
+        "ticket": create_stream_ticket(str(current_user_id)),
+        "expires_in": settings.STREAM_TICKET_EXPIRE_SECONDS,
+    }
+
+
+@router.get("/stream")
+async def stream_notifications(
+    header_token: str | None = Depends(_optional_oauth2),
+    ticket: str | None = Query(default=None),
+):
+    """
+    实时推送（Server-Sent Events）。请求头带 access token，或者 ?ticket= 带 /stream-ticket 换来的凭证。事件：
+    - unread：连上时的未读数，以及标记已读后的最新未读数
+    - notification：新的或合并更新的通知，带最新未读数
+    - resync：推送积压被丢弃，客户端应重新拉取 /notifications/ 和未读数
+    空闲时每隔 PUSH_HEARTBEAT_SECONDS 秒发一行注释保持连接。
+    """
+    if header_token:
+        user_id = decode_user_id(header_token)
+    elif ticket:
+        user_id = decode_stream_ticket(ticket)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # 长连接不占用数据库会话：鉴权和读取未读数用一个短会话完成
+    unread = await run_in_threadpool(_load_unread, user_id)
+    return StreamingResponse(
+        _event_stream(user_id, unread),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _load_unread(user_id: int) -> int:
+    with SessionLocal() as db:
+        if db.query(User.id).filter(User.id == user_id).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return get_unread(db, user_id)
+
+
+async def _event_stream(user_id: int, unread: int):
+    sub = broker.subscribe(user_id)
+    try:
+        yield sse_message("unread", {"unread": unread})
+        while True:
+            if sub.overflowed:
+                # 积压的消息已不完整，整体丢掉，让客户端重新拉取
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.overflowed = False
+                yield sse_message("resync", {})
+            try:
+                message = await asyncio.wait_for(
+                    sub.queue.get(), timeout=settings.PUSH_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            yield message
+    finally:
+        broker.unsubscribe(sub)
+
+
+def _publish_unread(db: Session, user_id: int) -> None:
+    broker.publish(user_id, "unread", {"unread": get_unread(db, user_id)})
 
 
 @router.post("/{notification_id}/read")
 def mark_read(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
 ):
-    n = (
+    if notification_id < 0:
+        # 全站广播：推进已读游标
+        if db.get(Broadcast, -notification_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Notification not found",
+            )
+        mark_broadcasts_seen(db, current_user_id, -notification_id)
+        db.commit()
+        _publish_unread(db, current_user_id)
+        return {"success": True}
+
+    updated = (
         db.query(Notification)
         .filter(
             Notification.id == notification_id,
-            Notification.user_id == current_user.id,
+            Notification.user_id == current_user_id,
+            Notification.is_read.is_(False),
         )
-        .first()
+        .update({"is_read": True}, synchronize_session=False)
     )
-    if not n:
-        return {"success": True}
-    n.is_read = True
-    db.commit()
+    if updated:
+        bump_unread(db, current_user_id, -updated)
+        db.commit()
+        _publish_unread(db, current_user_id)
     return {"success": True}
 
 
 @router.post("/read-all")
 def mark_all_read(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
 ):
-    db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read.is_(False),
-    ).update({"is_read": True})
+    updated = (
+        db.query(Notification)
+        .filter(
+            Notification.user_id == current_user_id,
+            Notification.is_read.is_(False),
+        )
+        .update({"is_read": True}, synchronize_session=False)
+    )
+    # 按实际标记的条数扣减，而不是直接清零：并发写入的新通知不会被算成已读
+    if updated:
+        bump_unread(db, current_user_id, -updated)
+    mark_broadcasts_seen(db, current_user_id)
     db.commit()
+    _publish_unread(db, current_user_id)
     return {"success": True}
-
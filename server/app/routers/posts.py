@@ -1,37 +1,153 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user
-from app.models.post import Post
+from app.core.cache import feed_cache
+from app.core.config import settings
+from app.core.deps import get_db, get_current_user, get_current_user_id
+from app.core.etag import body_etag, etag_matches, not_modified, row_etag
+from app.core.likes import like_buffer
+from app.core.pagination import cursor_headers, decode_cursor, encode_cursor, paginate
+from app.core.ranking import refresh_hot_score, remove_hot_score
+from app.core.responses import FastJSONResponse, dumps
+from app.core.search import index_post, remove_post, search_post_ids
+from app.core.tags import (
+    join_tags,
+    normalize_tags,
+    remove_post_tags,
+    split_tags,
+    sync_post_tags,
+)
+from app.core.routing import DBRouter
+from app.models.interaction import Interaction
+from app.models.post import Post, PostScore, PostTag, TagStat
 from app.models.user import User
-from app.schemas.post import PostCreate, PostOut
+from app.schemas.interaction import InteractionStateOut
+from app.schemas.post import PostAuthor, PostCreate, PostOut, TagStatOut
 
 
-router = APIRouter(prefix="/posts", tags=["posts"])
+router = DBRouter(prefix="/posts", tags=["posts"])
+
+MAX_STATE_IDS = 100
+
+ANONYMOUS_AUTHOR = PostAuthor(nickname="匿名亏友")
+_ANONYMOUS_AUTHOR_DICT = ANONYMOUS_AUTHOR.model_dump()
+
+# 只读列表走 Core select，直接拿轻量的 Row（不进 identity map），作者信息在同一条 SQL 里 join 出来。
+# 语句结构固定，SQLAlchemy 会缓存编译结果。
+_POST_ROWS = select(
+    Post.id,
+    Post.user_id,
+    Post.content,
+    Post.amount,
+    Post.mood,
+    Post.is_anonymous,
+    Post.tags,
+    Post.likes,
+    Post.comments_count,
+    Post.created_at,
+    User.nickname.label("author_nickname"),
+    User.avatar.label("author_avatar"),
+).outerjoin(User, User.id == Post.user_id)
+
+
+def _author_out(post: Post, user: User | None) -> PostAuthor | None:
+    """匿名帖不暴露作者昵称和头像"""
+    if post.is_anonymous:
+        return ANONYMOUS_AUTHOR
+    if user is None:
+        return None
+    return PostAuthor(id=user.id, nickname=user.nickname, avatar=user.avatar)
+
+
+def _post_row_out(row) -> dict:
+    """把 _POST_ROWS 的一行转成和 PostOut 一致的 dict"""
+    if row.is_anonymous:
+        author = _ANONYMOUS_AUTHOR_DICT
+    elif row.author_nickname is None:
+        author = None
+    else:
+        author = {
+            "id": row.user_id,
+            "nickname": row.author_nickname,
+            "avatar": row.author_avatar,
+        }
+    return {
+        "content": row.content,
+        "amount": row.amount,
+        "mood": row.mood,
+        "is_anonymous": bool(row.is_anonymous),
+        "tags": split_tags(row.tags),
+        "id": row.id,
+        "user_id": row.user_id,
+        "likes": row.likes + like_buffer.pending(row.id),
+        "comments_count": row.comments_count,
+        "author": author,
+    }
+
+
+def _post_rows_by_ids(db: Session, ids: list[int]) -> list[dict]:
+    """按给定顺序取帖子（热门、搜索先拿到 id 列表再回表）"""
+    if not ids:
+        return []
+    by_id = {row.id: row for row in db.execute(_POST_ROWS.where(Post.id.in_(ids)))}
+    return [_post_row_out(by_id[i]) for i in ids if i in by_id]
+
+
+def _paginate(
+    db: Session,
+    stmt,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    created_col=Post.created_at,
+    id_col=Post.id,
+):
+    """
+    帖子流按 (created_at, id) 倒序分页，返回 (rows, next_cursor)。
+    按标签筛选时排序列换成 post_tags 上的冗余列，才能走 (tag, created_at, post_id) 索引。
+    """
+    return paginate(db, stmt, cursor, skip, limit, created_col, id_col)
 
 
 @router.get("/", response_model=List[PostOut])
 def list_posts(
     db: Session = Depends(get_db),
     tag: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
     skip: int = 0,
     limit: int = 20,
+    if_none_match: str | None = Header(default=None),
 ):
-    q = db.query(Post)
+    cache_key = feed_cache.key(tag, cursor, skip, limit)
+    if settings.FEED_CACHE_ENABLED:
+        page = feed_cache.get(cache_key)
+        if page is not None:
+            if etag_matches(if_none_match, page.headers["ETag"]):
+                return not_modified(page.headers["ETag"], page.headers)
+            return Response(page.body, media_type="application/json", headers=page.headers)
+    generation = feed_cache.generation
+
     if tag:
-        q = q.filter(Post.tags.contains(tag))
-    posts = (
-        q.order_by(Post.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-    # 把 tags 字符串拆成 list
-    for p in posts:
-        p.tags = p.tags.split(",") if p.tags else []
-    return posts
+        stmt = _POST_ROWS.join(PostTag, PostTag.post_id == Post.id).where(PostTag.tag == tag)
+        rows, next_cursor = _paginate(
+            db, stmt, cursor, skip, limit,
+            created_col=PostTag.created_at,
+            id_col=PostTag.post_id,
+        )
+    else:
+        rows, next_cursor = _paginate(db, _POST_ROWS, cursor, skip, limit)
+
+    # 直接缓存序列化后的字节，命中时不再查库和序列化
+    body = dumps([_post_row_out(row) for row in rows])
+    headers = {"ETag": body_etag(body), **cursor_headers(next_cursor)}
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.set(cache_key, body, headers, [row.id for row in rows], generation)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers["ETag"], headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @router.post("/", response_model=PostOut, status_code=status.HTTP_201_CREATED)
@@ -40,58 +156,158 @@ def create_post(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    tags_str = ",".join(data.tags) if data.tags else None
+    tags = normalize_tags(data.tags)
     post = Post(
         user_id=current_user.id,
         content=data.content,
         amount=data.amount,
         mood=data.mood,
         is_anonymous=data.is_anonymous,
-        tags=tags_str,
+        tags=join_tags(tags),
     )
     db.add(post)
+    db.flush()
+    sync_post_tags(db, post, tags)
+    refresh_hot_score(db, post)
+    index_post(db, post.id, post.content)
     db.commit()
+    # 新帖只会出现在各个 feed 的最前面，游标页不受影响
+    feed_cache.invalidate_offset_pages(["", *tags])
     db.refresh(post)
-    post.tags = data.tags
+    post.tags = tags
+    post.author = _author_out(post, current_user)
     return post
 
 
-@router.get("/me", response_model=List[PostOut])
-def get_my_posts(
+@router.get("/hot", response_model=List[PostOut])
+def list_hot_posts(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = Query(default=None),
     skip: int = 0,
     limit: int = 20,
 ):
-    """获取当前用户发布的帖子列表"""
-    posts = (
-        db.query(Post)
-        .filter(Post.user_id == current_user.id)
-        .order_by(Post.created_at.desc())
-        .offset(skip)
+    """热门吐槽：按预先维护的热度分倒序，游标为 (score, post_id)"""
+    q = db.query(PostScore.post_id, PostScore.score)
+    if cursor:
+        score, post_id = decode_cursor(cursor, key_type=float)
+        q = q.filter(tuple_(PostScore.score, PostScore.post_id) < (score, post_id))
+    q = q.order_by(PostScore.score.desc(), PostScore.post_id.desc())
+    if not cursor:
+        q = q.offset(skip)
+    ranked = q.limit(limit).all()
+    next_cursor = None
+    if ranked and len(ranked) == limit:
+        next_cursor = encode_cursor(ranked[-1].score, ranked[-1].post_id)
+
+    posts = _post_rows_by_ids(db, [row.post_id for row in ranked])
+    return FastJSONResponse(posts, headers=cursor_headers(next_cursor))
+
+
+@router.get("/search", response_model=List[PostOut])
+def search_posts(
+    q: str = Query(min_length=1, max_length=100),
+    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None),
+    limit: int = 20,
+):
+    """全文搜索帖子内容，按相关度排序，游标分页"""
+    ids, next_cursor = search_post_ids(db, q, cursor, limit)
+    posts = _post_rows_by_ids(db, ids)
+    return FastJSONResponse(posts, headers=cursor_headers(next_cursor))
+
+
+@router.get("/tags", response_model=List[TagStatOut])
+def list_tags(
+    db: Session = Depends(get_db),
+    limit: int = 50,
+):
+    """热门标签及其帖子数"""
+    return (
+        db.query(TagStat)
+        .filter(TagStat.post_count > 0)
+        .order_by(TagStat.post_count.desc())
         .limit(limit)
         .all()
     )
-    # 把 tags 字符串拆成 list
-    for p in posts:
-        p.tags = p.tags.split(",") if p.tags else []
-    return posts
+
+
+@router.get("/interactions/state", response_model=List[InteractionStateOut])
+def get_interaction_states(
+    ids: str = Query(description="逗号分隔的帖子 id，最多 100 个"),
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    """批量查询当前用户对一组帖子是否已点赞 / 心碎（一次查询，走唯一索引）"""
+    try:
+        post_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma separated integers",
+        )
+    if len(post_ids) > MAX_STATE_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_STATE_IDS} ids per request",
+        )
+
+    done = set()
+    if post_ids:
+        done = set(
+            db.execute(
+                select(Interaction.post_id, Interaction.action_type).where(
+                    Interaction.user_id == current_user_id,
+                    Interaction.post_id.in_(post_ids),
+                    Interaction.action_type.in_(("like", "heart")),
+                )
+            ).all()
+        )
+    return [
+        InteractionStateOut(
+            post_id=post_id,
+            liked=(post_id, "like") in done,
+            hearted=(post_id, "heart") in done,
+        )
+        for post_id in post_ids
+    ]
+
+
+@router.get("/me", response_model=List[PostOut])
+def get_my_posts(
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+    cursor: str | None = Query(default=None),
+    skip: int = 0,
+    limit: int = 20,
+):
+    """获取当前用户发布的帖子列表"""
+    stmt = _POST_ROWS.where(Post.user_id == current_user_id)
+    rows, next_cursor = _paginate(db, stmt, cursor, skip, limit)
+    posts = [_post_row_out(row) for row in rows]
+    return FastJSONResponse(posts, headers=cursor_headers(next_cursor))
 
 
 @router.get("/{post_id}", response_model=PostOut)
 def get_post(
     post_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),  # 保证登录
+    current_user_id: int = Depends(get_current_user_id),  # 保证登录
+    if_none_match: str | None = Header(default=None),
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+    # 和列表一样走 Core 行（作者资料 join 在同一行里），不改会话里的 ORM 对象
+    row = db.execute(_POST_ROWS.where(Post.id == post_id)).first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
         )
-    post.tags = post.tags.split(",") if post.tags else []
-    return post
+    # 输出里叠加了尚未合并的点赞增量（写后合并模式），ETag 也随之变化
+    out = _post_row_out(row)
+    # 帖子和作者资料都没变化时直接 304，不做序列化
+    etag = row_etag(row, (out["likes"],), scope="post")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return FastJSONResponse(out, headers={"ETag": etag})
 
 
 @router.put("/{post_id}", response_model=PostOut)
@@ -117,16 +333,22 @@ def update_post(
         )
     
     # 更新帖子内容
-    tags_str = ",".join(data.tags) if data.tags else None
+    old_tags = set(split_tags(post.tags))
+    tags = normalize_tags(data.tags)
     post.content = data.content
     post.amount = data.amount
     post.mood = data.mood
     post.is_anonymous = data.is_anonymous
-    post.tags = tags_str
+    post.tags = join_tags(tags)
+    sync_post_tags(db, post, tags)
+    index_post(db, post.id, post.content)
     
     db.commit()
+    feed_cache.invalidate_post(post.id)
+    feed_cache.invalidate_feeds(list(old_tags ^ set(tags)))
     db.refresh(post)
-    post.tags = data.tags
+    post.tags = tags
+    post.author = _author_out(post, current_user)
     return post
 
 
@@ -151,7 +373,13 @@ def delete_post(
             detail="You can only delete your own posts",
         )
     
+    old_tags = split_tags(post.tags)
+    remove_post_tags(db, post.id)
+    remove_hot_score(db, post.id)
+    remove_post(db, post.id)
     db.delete(post)
     db.commit()
+    feed_cache.invalidate_post(post_id)
+    feed_cache.invalidate_offset_pages(["", *old_tags])
     return None
 
@@ -1,9 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import Depends, HTTPException
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 import random
 
 from app.core.deps import get_db, get_current_user
+from app.core.responses import FastJSONResponse
+from app.core.routing import DBRouter
 from app.models.user import User
 from app.models.recovery import RecoveryRecord, RecoveryRecordType, UserBalance
 from app.schemas.recovery import (
@@ -13,7 +16,22 @@ from app.schemas.recovery import (
     LotteryDrawResponse,
 )
 
-router = APIRouter(prefix="/recovery", tags=["recovery"])
+router = DBRouter(prefix="/recovery", tags=["recovery"])
+
+_RECOVERY_RECORD_ROWS = (
+    select(
+        RecoveryRecord.id,
+        RecoveryRecord.user_id,
+        RecoveryRecord.type,
+        RecoveryRecord.amount,
+        RecoveryRecord.description,
+        RecoveryRecord.created_at,
+    )
+    .where(RecoveryRecord.user_id == bindparam("user_id"))
+    .order_by(RecoveryRecord.created_at.desc())
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
 
 
 # 抽奖奖品配置
@@ -122,12 +140,8 @@ def get_recovery_records(
     db: Session = Depends(get_db),
 ):
     """获取回血记录列表"""
-    records = (
-        db.query(RecoveryRecord)
-        .filter(RecoveryRecord.user_id == current_user.id)
-        .order_by(RecoveryRecord.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    rows = db.execute(
+        _RECOVERY_RECORD_ROWS,
+        {"user_id": current_user.id, "skip": skip, "limit": limit},
     )
-    return records
+    return FastJSONResponse([row._asdict() for row in rows])
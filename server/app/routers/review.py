@@ -1,14 +1,15 @@
 from datetime import datetime, timedelta
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 
 from app.core.deps import get_db, get_current_user
+from app.core.routing import DBRouter
 from app.models.user import User
 from app.models.post import Post
 
-router = APIRouter(prefix="/review", tags=["review"])
+router = DBRouter(prefix="/review", tags=["review"])
 
 
 @router.get("/summary")
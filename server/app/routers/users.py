@@ -1,16 +1,19 @@
 import json
 import os
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import Depends, HTTPException, status, UploadFile, File
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from app.core.cache import feed_cache
 from app.core.deps import get_db, get_current_user
+from app.core.identity import invalidate_user
+from app.core.routing import DBRouter
 from app.models.user import User
 from app.schemas.user import UserOut, UserUpdate
 
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = DBRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserOut)
@@ -80,6 +83,9 @@ def update_me(
     
     db.commit()
     db.refresh(current_user)
+    invalidate_user(current_user.id)
+    # 帖子流里带了作者昵称和头像，资料变了要清掉缓存页
+    feed_cache.clear()
     
     # 返回更新后的用户信息
     user_dict = {
@@ -137,6 +143,8 @@ async def upload_avatar(
     current_user.avatar = avatar_url
     db.commit()
     db.refresh(current_user)
+    invalidate_user(current_user.id)
+    feed_cache.clear()
     
     return JSONResponse(content={
         "avatar_url": avatar_url,
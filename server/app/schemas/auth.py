@@ -3,7 +3,17 @@ from pydantic import BaseModel
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str | None = None
     token_type: str = "bearer"
+    expires_in: int | None = None  # access token 有效秒数
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None  # 一并吊销，防止退出后还能换新 token
 
 
 class LoginRequest(BaseModel):
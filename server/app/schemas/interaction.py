@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class InteractionStateOut(BaseModel):
+    """当前用户对某个帖子的互动状态"""
+    post_id: int
+    liked: bool
+    hearted: bool
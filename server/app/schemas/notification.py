@@ -2,6 +2,11 @@ from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
 
+class NotificationActor(BaseModel):
+    id: int
+    nickname: str | None = None
+
+
 class NotificationOut(BaseModel):
     id: int
     type: str
@@ -10,5 +15,8 @@ class NotificationOut(BaseModel):
     related_id: str | None = None
     is_read: bool
     created_at: datetime
+    actor_count: int = 1
+    latest_actors: list[NotificationActor] = []
+    updated_at: datetime | None = None
     model_config = ConfigDict(from_attributes=True)
 
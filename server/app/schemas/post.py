@@ -1,4 +1,11 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, StringConstraints
+
+from app.models.post import TAG_MAX_LENGTH
+
+# 单个标签：超过 post_tags.tag 的长度时直接 422，不让数据库报错
+Tag = Annotated[str, StringConstraints(strip_whitespace=True, max_length=TAG_MAX_LENGTH)]
 
 
 class PostBase(BaseModel):
@@ -6,17 +13,31 @@ class PostBase(BaseModel):
     amount: float
     mood: str | None = None
     is_anonymous: bool = False
-    tags: list[str] = []
+    tags: list[Tag] = []
 
 
 class PostCreate(PostBase):
     pass
 
 
+class PostAuthor(BaseModel):
+    """帖子作者（匿名帖只有占位昵称，没有 id 和头像）"""
+    id: int | None = None
+    nickname: str
+    avatar: str | None = None
+
+
 class PostOut(PostBase):
     id: int
     user_id: int
     likes: int
     comments_count: int
+    author: PostAuthor | None = None
     model_config = ConfigDict(from_attributes=True)
 
+
+
+class TagStatOut(BaseModel):
+    tag: str
+    post_count: int
+    model_config = ConfigDict(from_attributes=True)
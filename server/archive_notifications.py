@@ -0,0 +1,77 @@
+"""
+通知归档任务：把超过保留期的已读通知移到 notifications_archive，控制通知表大小
+运行方式: python archive_notifications.py [--days 90] [--batch 1000]
+  适合用 cron 每天跑一次；未读通知不归档，所以不影响未读数
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import delete, insert, select
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.notification import Notification, NotificationArchive
+
+ARCHIVED_COLUMNS = [
+    "id",
+    "user_id",
+    "type",
+    "title",
+    "content",
+    "related_id",
+    "actor_count",
+    "latest_actors",
+    "is_read",
+    "created_at",
+    "updated_at",
+]
+
+
+def archive_notifications(days: int = settings.NOTIFY_ARCHIVE_AFTER_DAYS, batch: int = 1000) -> int:
+    """分批搬运，每批一个事务（先复制再删除），返回归档的条数"""
+    Base.metadata.create_all(bind=engine, tables=[NotificationArchive.__table__])
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    db = SessionLocal()
+    total = 0
+    try:
+        while True:
+            ids = db.execute(
+                select(Notification.id)
+                .where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+                .order_by(Notification.id)
+                .limit(batch)
+            ).scalars().all()
+            if not ids:
+                break
+            db.execute(
+                insert(NotificationArchive).from_select(
+                    ARCHIVED_COLUMNS,
+                    select(*(getattr(Notification, c) for c in ARCHIVED_COLUMNS))
+                    .where(Notification.id.in_(ids)),
+                )
+            )
+            db.execute(delete(Notification).where(Notification.id.in_(ids)))
+            db.commit()
+            total += len(ids)
+        print(f"✓ 已归档 {total} 条 {days} 天前的已读通知")
+        return total
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ 归档失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="归档旧的已读通知")
+    parser.add_argument("--days", type=int, default=settings.NOTIFY_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    archive_notifications(days=args.days, batch=args.batch)
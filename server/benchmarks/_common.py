@@ -0,0 +1,144 @@
+"""
+压测脚本公共工具：临时 SQLite 库、造数据、计时。
+所有脚本都在 server 目录下用 `python -m benchmarks.xxx` 运行。
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# 导入路由会顺带注册所有模型（不导入 app.main，避免在当前目录建库）
+from app.routers import (  # noqa: F401
+    auth,
+    users,
+    posts,
+    comments,
+    interactions,
+    notifications,
+    recovery,
+    gifts,
+    growth,
+    medals,
+    review,
+)
+from app.core.ranking import hot_score
+from app.core.tags import normalize_tags, split_tags
+from app.db.base import Base, ensure_indexes
+from app.models.post import Post, PostScore, PostTag
+from app.models.user import User
+
+
+TAGS = ["深度套牢", "抄底失败", "追涨杀跌", "割肉离场", "韭菜日记", "基金", "A股", "美股"]
+
+
+def make_session_factory(name: str):
+    """在临时目录建一个独立的 SQLite 库，返回 (sessionmaker, engine, 文件路径)"""
+    path = os.path.join(tempfile.mkdtemp(prefix="kuleme_bench_"), f"{name}.db")
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine), engine, path
+
+
+def seed_users(db, count: int) -> None:
+    db.execute(
+        insert(User),
+        [
+            {"phone": f"138{i:08d}", "nickname": f"亏友_{i:04d}"}
+            for i in range(1, count + 1)
+        ],
+    )
+    db.commit()
+
+
+def seed_posts(db, count: int, users: int = 100, batch: int = 20000) -> None:
+    """批量造帖子，created_at 从现在往前每条间隔 1 秒"""
+    rng = random.Random(42)
+    start = datetime.utcnow()
+    done = 0
+    while done < count:
+        rows = []
+        for i in range(done, min(done + batch, count)):
+            tags = rng.sample(TAGS, rng.randint(0, 2))
+            rows.append(
+                {
+                    "user_id": rng.randint(1, users),
+                    "content": f"第 {i} 次亏钱，这次又是{rng.choice(TAGS)}",
+                    "amount": round(rng.uniform(100, 50000), 2),
+                    "mood": rng.choice(["崩溃", "麻木", "后悔", None]),
+                    "is_anonymous": rng.random() < 0.2,
+                    "tags": ",".join(tags) if tags else None,
+                    "likes": rng.randint(0, 500),
+                    "comments_count": rng.randint(0, 50),
+                    "created_at": start - timedelta(seconds=i),
+                }
+            )
+        db.execute(insert(Post), rows)
+        db.commit()
+        done += len(rows)
+
+
+def backfill_scores(db, after_id: int = 0) -> None:
+    """给 id > after_id 的帖子补热度分"""
+    rows = (
+        db.query(Post.id, Post.likes, Post.comments_count, Post.created_at)
+        .filter(Post.id > after_id)
+        .all()
+    )
+    for start in range(0, len(rows), 20000):
+        db.execute(
+            insert(PostScore),
+            [
+                {"post_id": r.id, "score": hot_score(r.likes, r.comments_count, r.created_at)}
+                for r in rows[start:start + 20000]
+            ],
+        )
+    db.commit()
+
+
+def backfill_tags(db, after_id: int = 0) -> None:
+    """给 id > after_id 的帖子补 post_tags"""
+    rows = (
+        db.query(Post.id, Post.tags, Post.created_at)
+        .filter(Post.id > after_id, Post.tags.isnot(None))
+        .all()
+    )
+    values = [
+        {"post_id": r.id, "tag": tag, "created_at": r.created_at}
+        for r in rows
+        for tag in normalize_tags(split_tags(r.tags))
+    ]
+    for start in range(0, len(values), 20000):
+        db.execute(insert(PostTag), values[start:start + 20000])
+    db.commit()
+
+
+def measure(fn, repeat: int) -> list[float]:
+    """执行 repeat 次，返回每次耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[k]
+
+
+def summarize(samples: list[float]) -> str:
+    return (
+        f"p50={statistics.median(samples):7.2f}ms "
+        f"p99={percentile(samples, 99):7.2f}ms"
+    )
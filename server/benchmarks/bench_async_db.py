@@ -0,0 +1,139 @@
+"""
+同步 / 异步数据库引擎对比：大量并发客户端请求帖子详情（GET /posts/{id}，带登录），
+比较吞吐、延迟，以及服务进程的内存和线程数。
+DB_ASYNC 在导入时决定路由形态，所以每种模式各起一个服务子进程。
+运行方式: python -m benchmarks.bench_async_db [并发客户端数] [持续秒数]
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.core.security import create_access_token
+from benchmarks._common import make_session_factory, percentile, seed_posts, seed_users
+
+POSTS = 2000
+USERS = 100
+
+
+def serve(port: int) -> None:
+    """子进程：按环境变量里的 DB_ASYNC 建应用并启动 uvicorn"""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from app.routers import posts
+
+    app = FastAPI()
+    app.include_router(posts.router)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+def proc_status(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM", "Threads"):
+                values[key] = int(value.split()[0])
+    return values
+
+
+async def load(port: int, clients: int, seconds: float, pid: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    peak = {"VmRSS": 0, "Threads": 0}
+    deadline = time.perf_counter() + seconds
+    rng = random.Random(7)
+    tokens = [create_access_token(str(uid)) for uid in range(1, USERS + 1)]
+
+    async def client(i):
+        nonlocal errors
+        headers = {"Authorization": f"Bearer {tokens[i % USERS]}"}
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                r = await http.get(f"/posts/{rng.randint(1, POSTS)}", headers=headers)
+                ok = r.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - t0) * 1000)
+            else:
+                errors += 1
+
+    async def sample():
+        while time.perf_counter() < deadline:
+            status = proc_status(pid)
+            for key in peak:
+                peak[key] = max(peak[key], status[key])
+            await asyncio.sleep(0.2)
+
+    limits = httpx.Limits(max_connections=clients + 10)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30
+    ) as http:
+        await asyncio.gather(*(client(i) for i in range(clients)), sample())
+    return {"latencies": latencies, "errors": errors, **peak}
+
+
+def run_mode(label: str, async_db: bool, path: str, clients: int, seconds: float) -> None:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {
+        **os.environ,
+        "DB_ASYNC": "true" if async_db else "false",
+        "SQLITE_DB_PATH": os.path.basename(path),
+        "PYTHONPATH": os.getcwd(),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_async_db", "serve", str(port)],
+        cwd=os.path.dirname(path), env=env, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(200):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/posts/1", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        idle = proc_status(proc.pid)
+        result = asyncio.run(load(port, clients, seconds, proc.pid))
+    finally:
+        proc.kill()
+        proc.wait()
+
+    # 请求一直拿不到连接时可能一条都没成功
+    latencies = result["latencies"] or [float("nan")]
+    print(
+        f"{label:<4} {len(result['latencies']) / seconds:7.1f} req/s  错误 {result['errors']:>5}  "
+        f"p50={percentile(latencies, 50):8.1f}ms p99={percentile(latencies, 99):8.1f}ms  |  "
+        f"内存 {idle['VmRSS'] / 1024:.1f}MB -> 峰值 {result['VmRSS'] / 1024:.1f}MB  "
+        f"线程 {idle['Threads']} -> 峰值 {result['Threads']}"
+    )
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    Session, _, path = make_session_factory("async_db")
+    with Session() as db:
+        seed_users(db, USERS)
+        seed_posts(db, POSTS, users=USERS)
+    print(f"数据库: {path}，{POSTS} 条帖子，{clients} 个并发客户端，每种模式 {seconds:.0f}s")
+
+    run_mode("同步", False, path, clients, seconds)
+    run_mode("异步", True, path, clients, seconds)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "serve":
+        serve(int(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,75 @@
+"""
+全站通知压测：对比"给每个用户插一行通知"和"广播表 + 读取时合并"两种做法。
+- 发送成本：写入行数和耗时
+- 读取成本：某个用户拉通知列表和未读数的延迟
+运行方式: python -m benchmarks.bench_broadcast [用户数]
+"""
+import sys
+import time
+
+from sqlalchemy import func, insert
+
+from app.core.broadcasts import create_broadcast
+from app.models.notification import Broadcast, Notification
+from app.models.user import User
+from app.routers.notifications import get_unread_count, list_notifications
+from benchmarks._common import make_session_factory, measure, seed_users, summarize
+
+
+ANNOUNCEMENTS = 5
+BATCH = 20000
+
+
+def naive_send(db, users: int, title: str, content: str) -> None:
+    """对照组：按用户批量插入通知"""
+    for start in range(1, users + 1, BATCH):
+        db.execute(
+            insert(Notification),
+            [
+                {"user_id": uid, "type": "system", "title": title, "content": content}
+                for uid in range(start, min(start + BATCH, users + 1))
+            ],
+        )
+    db.commit()
+
+
+def bench_reads(Session, user_id: int) -> None:
+    def read():
+        with Session() as db:
+            user = db.get(User, user_id)
+            list_notifications(db=db, current_user=user, cursor=None, skip=0, limit=20)
+            get_unread_count(db=db, current_user_id=user.id)
+
+    read()
+    print(f"  读取列表 + 未读数: {summarize(measure(read, 200))}")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{users} 个用户，发 {ANNOUNCEMENTS} 条全站通知")
+
+    Session, _, _ = make_session_factory("broadcast_naive")
+    with Session() as db:
+        seed_users(db, users)
+    t0 = time.perf_counter()
+    with Session() as db:
+        for i in range(ANNOUNCEMENTS):
+            naive_send(db, users, f"公告 {i}", "今晚系统维护")
+        rows = db.query(func.count(Notification.id)).scalar()
+    print(f"逐用户插入: 写入 {rows} 行，用时 {(time.perf_counter() - t0) * 1000:.0f}ms")
+    bench_reads(Session, users // 2)
+
+    Session, _, _ = make_session_factory("broadcast_merge")
+    with Session() as db:
+        seed_users(db, users)
+    t0 = time.perf_counter()
+    with Session() as db:
+        for i in range(ANNOUNCEMENTS):
+            create_broadcast(db, f"公告 {i}", "今晚系统维护")
+        rows = db.query(func.count(Broadcast.id)).scalar()
+    print(f"广播表:     写入 {rows} 行，用时 {(time.perf_counter() - t0) * 1000:.0f}ms")
+    bench_reads(Session, users // 2)
+
+
+if __name__ == "__main__":
+    main()
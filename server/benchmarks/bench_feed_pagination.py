@@ -0,0 +1,63 @@
+"""
+对比社区帖子流 OFFSET 分页与游标分页在不同深度下的单页耗时。
+运行方式: python -m benchmarks.bench_feed_pagination [帖子数]
+"""
+import sys
+
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.routers.posts import list_posts
+from benchmarks._common import (
+    make_session_factory,
+    measure,
+    seed_posts,
+    seed_users,
+    summarize,
+)
+
+
+PAGE_SIZE = 20
+DEPTHS = [1, 50, 200, 1000, 5000]
+
+
+def main():
+    # 只测数据库分页本身，关掉页面缓存
+    settings.FEED_CACHE_ENABLED = False
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    Session, _, path = make_session_factory("feed_pagination")
+    with Session() as db:
+        seed_users(db, 100)
+        seed_posts(db, total)
+    print(f"数据库: {path}，帖子数: {total}")
+
+    def fetch(cursor=None, skip=0):
+        # 每次请求一个新 Session，和线上 get_db 的用法一致
+        with Session() as db:
+            response = list_posts(
+                db=db, tag=None, cursor=cursor, skip=skip, limit=PAGE_SIZE, if_none_match=None
+            )
+        return response.headers.get(NEXT_CURSOR_HEADER)
+
+    # 先顺着游标走一遍，记下每个深度对应的游标
+    cursors = {1: None}
+    cursor = None
+    for page in range(1, max(DEPTHS)):
+        cursor = fetch(cursor=cursor)
+        if cursor is None:
+            break
+        cursors[page + 1] = cursor
+
+    for depth in DEPTHS:
+        if depth not in cursors:
+            continue
+        skip = (depth - 1) * PAGE_SIZE
+        offset_samples = measure(lambda: fetch(skip=skip), repeat=30)
+        cursor_samples = measure(lambda: fetch(cursor=cursors[depth]), repeat=30)
+        print(
+            f"第 {depth:5d} 页  offset: {summarize(offset_samples)}  "
+            f"cursor: {summarize(cursor_samples)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
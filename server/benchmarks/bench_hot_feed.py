@@ -0,0 +1,75 @@
+"""
+热门吐槽流压测：帖子表从几万增长到百万级时，/posts/hot 单页 p99 是否保持平稳。
+同时给出"每次请求现算热度再全表排序"的做法作对比（数据量大时只跑少量次数）。
+运行方式: python -m benchmarks.bench_hot_feed [规模1,规模2,...]
+"""
+import sys
+
+from sqlalchemy import func
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.ranking import COMMENT_WEIGHT
+from app.models.post import Post
+from app.routers.posts import list_hot_posts
+from benchmarks._common import (
+    backfill_scores,
+    make_session_factory,
+    measure,
+    seed_posts,
+    seed_users,
+    summarize,
+)
+
+
+PAGE_SIZE = 20
+
+
+def main():
+    sizes = (
+        [int(x) for x in sys.argv[1].split(",")]
+        if len(sys.argv) > 1
+        else [10_000, 100_000, 1_000_000]
+    )
+    Session, _, path = make_session_factory("hot_feed")
+    with Session() as db:
+        seed_users(db, 1000)
+    print(f"数据库: {path}")
+
+    def fetch(cursor=None):
+        with Session() as db:
+            response = list_hot_posts(db=db, cursor=cursor, skip=0, limit=PAGE_SIZE)
+        return response.headers.get(NEXT_CURSOR_HEADER)
+
+    def naive():
+        # 对照组：每次请求现算热度并全表排序
+        with Session() as db:
+            engagement = Post.likes + COMMENT_WEIGHT * Post.comments_count
+            (
+                db.query(Post)
+                .order_by((func.log(engagement + 1) + func.julianday(Post.created_at)).desc())
+                .limit(PAGE_SIZE)
+                .all()
+            )
+
+    seeded = 0
+    for size in sorted(sizes):
+        with Session() as db:
+            # 只追加差额，让同一张表逐步长大
+            seed_posts(db, size - seeded, users=1000)
+            backfill_scores(db, after_id=seeded)
+        seeded = size
+
+        deep_cursor = None
+        for _ in range(10):
+            deep_cursor = fetch(deep_cursor)
+        first_page = measure(fetch, repeat=200)
+        deep_page = measure(lambda: fetch(deep_cursor), repeat=200)
+        naive_samples = measure(naive, repeat=5 if size >= 500_000 else 20)
+        print(
+            f"{size:>9,d} 条  首页 {summarize(first_page)}  "
+            f"第 11 页 {summarize(deep_page)}  现算排序 {summarize(naive_samples)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
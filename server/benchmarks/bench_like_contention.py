@@ -0,0 +1,108 @@
+"""
+点赞计数并发压测：多个线程同时给同一条帖子点赞 / 取消，检查最终计数是否准确，并给出吞吐。
+对照组是改造前的 Python 读-改-写（post.likes += 1），并发时会丢更新。
+运行方式: python -m benchmarks.bench_like_contention [线程数] [用户数]
+"""
+import sys
+import threading
+import time
+
+from sqlalchemy import func
+
+from app.models.interaction import Interaction
+from app.models.post import Post
+from app.routers.interactions import interact_post
+from benchmarks._common import make_session_factory, seed_posts, seed_users
+
+
+def legacy_like(db, post_id: int, user_id: int) -> None:
+    """改造前的写法：先读出帖子，在 Python 里加一再写回"""
+    post = db.query(Post).filter(Post.id == post_id).first()
+    db.add(Interaction(post_id=post_id, user_id=user_id, action_type="like"))
+    post.likes += 1
+    db.commit()
+
+
+def run(Session, threads: int, users: int, action) -> float:
+    """users 个用户分给 threads 个线程，各自点一次赞，返回耗时（秒）"""
+    errors = []
+
+    def worker(uids):
+        for uid in uids:
+            with Session() as db:
+                try:
+                    action(db, uid)
+                except Exception as e:  # noqa: BLE001
+                    errors.append(e)
+
+    chunks = [range(i + 1, users + 1, threads) for i in range(threads)]
+    pool = [threading.Thread(target=worker, args=(c,)) for c in chunks]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    if errors:
+        print(f"  {len(errors)} 次请求失败，例如: {errors[0]!r}")
+    return elapsed
+
+
+def reset(Session, post_id: int) -> None:
+    with Session() as db:
+        db.query(Interaction).delete()
+        db.query(Post).filter(Post.id == post_id).update({Post.likes: 0})
+        db.commit()
+
+
+def check(Session, post_id: int, label: str, expected: int, elapsed: float, ops: int) -> bool:
+    with Session() as db:
+        likes = db.query(Post.likes).filter(Post.id == post_id).scalar()
+        rows = (
+            db.query(func.count(Interaction.id))
+            .filter(Interaction.post_id == post_id, Interaction.action_type == "like")
+            .scalar()
+        )
+    ok = likes == expected == rows
+    print(
+        f"{label:<18} likes={likes:>5} 互动记录={rows:>5} 期望={expected:>5} "
+        f"{ops / elapsed:8.0f} 次/秒  {'OK' if ok else '计数错误'}"
+    )
+    return ok
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    Session, _, path = make_session_factory("like_contention")
+    with Session() as db:
+        seed_users(db, users)
+        seed_posts(db, 1, users=users)
+    print(f"数据库: {path}，{threads} 线程，{users} 个用户抢同一条帖子")
+    post_id = 1
+
+    def like(db, uid):
+        interact_post(post_id=post_id, action="like", db=db, current_user_id=uid)
+
+    reset(Session, post_id)
+    elapsed = run(Session, threads, users, lambda db, uid: legacy_like(db, post_id, uid))
+    check(Session, post_id, "读-改-写(对照)", users, elapsed, users)
+
+    reset(Session, post_id)
+    elapsed = run(Session, threads, users, like)
+    ok = check(Session, post_id, "原子 UPDATE", users, elapsed, users)
+
+    # 每个用户连点两次：点赞再取消，最终应归零
+    reset(Session, post_id)
+
+    def toggle_twice(db, uid):
+        like(db, uid)
+        like(db, uid)
+
+    elapsed = run(Session, threads, users, toggle_twice)
+    ok = check(Session, post_id, "原子 UPDATE 切换", 0, elapsed, users * 2) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
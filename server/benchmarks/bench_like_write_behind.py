@@ -0,0 +1,41 @@
+"""
+点赞写后合并压测：大量用户同时给同一条热门帖子点赞，
+对比逐条原子 UPDATE 和写后合并（LIKE_WRITE_BEHIND）两种模式的吞吐，并检查合并后的计数。
+运行方式: python -m benchmarks.bench_like_write_behind [线程数] [用户数]
+"""
+import sys
+
+from app.core.likes import like_buffer
+from app.routers.interactions import interact_post
+from benchmarks._common import make_session_factory, seed_posts, seed_users
+from benchmarks.bench_like_contention import check, reset, run
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 4000
+    Session, _, path = make_session_factory("like_write_behind")
+    with Session() as db:
+        seed_users(db, users)
+        seed_posts(db, 1, users=users)
+    print(f"数据库: {path}，{threads} 线程，{users} 个用户抢同一条帖子")
+    post_id = 1
+
+    def like(db, uid):
+        interact_post(post_id=post_id, action="like", db=db, current_user_id=uid)
+
+    reset(Session, post_id)
+    elapsed = run(Session, threads, users, like)
+    ok = check(Session, post_id, "逐条 UPDATE", users, elapsed, users)
+
+    reset(Session, post_id)
+    like_buffer.start(Session)
+    elapsed = run(Session, threads, users, like)
+    like_buffer.stop()
+    ok = check(Session, post_id, "写后合并", users, elapsed, users) and ok
+    print(f"合并统计: {like_buffer.stats()}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
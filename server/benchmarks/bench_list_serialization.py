@@ -0,0 +1,142 @@
+"""
+只读列表接口微基准：ORM 对象 + Pydantic(from_attributes) 校验 与 Core select + 直接序列化 的吞吐对比。
+运行方式: python -m benchmarks.bench_list_serialization [每页条数]
+输出每个接口每秒能处理的行数（rows/s）。
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.responses import orjson
+from app.core.tags import split_tags
+from app.models.comment import Comment
+from app.models.growth import PointsRecord
+from app.models.notification import Notification
+from app.models.post import Post
+from app.models.recovery import RecoveryRecord, RecoveryRecordType
+from app.models.user import User
+from app.routers.comments import list_comments
+from app.routers.growth import get_points_records
+from app.routers.notifications import list_notifications
+from app.routers.posts import _author_out, list_posts
+from app.routers.recovery import get_recovery_records
+from app.schemas.comment import CommentOut
+from app.schemas.growth import PointsRecordOut
+from app.schemas.notification import NotificationOut
+from app.schemas.post import PostOut
+from app.schemas.recovery import RecoveryRecordOut
+from benchmarks._common import make_session_factory, seed_posts, seed_users
+
+
+ROUNDS = 200
+
+
+def seed_lists(db, rows: int) -> None:
+    now = datetime.utcnow()
+    times = [now - timedelta(seconds=i) for i in range(rows)]
+    db.execute(insert(Comment), [
+        {"post_id": 1, "user_id": 1, "content": f"评论 {i}，一起亏", "created_at": t}
+        for i, t in enumerate(times)
+    ])
+    db.execute(insert(Notification), [
+        {"user_id": 1, "type": "like", "title": "收到点赞", "content": f"有人赞了你的帖子 {i}",
+         "related_id": str(i), "is_read": i % 2 == 0, "created_at": t}
+        for i, t in enumerate(times)
+    ])
+    db.execute(insert(RecoveryRecord), [
+        {"user_id": 1, "type": RecoveryRecordType.lottery_cost, "amount": -1.0,
+         "description": "参与抽奖投入", "created_at": t}
+        for t in times
+    ])
+    db.execute(insert(PointsRecord), [
+        {"user_id": 1, "amount": 5, "description": "每日发帖", "created_at": t}
+        for t in times
+    ])
+    db.commit()
+
+
+def orm_path(db, model, out_schema, where, limit, prepare=None) -> bytes:
+    """改造前的做法：查 ORM 对象，再经过 response_model 校验和 JSON 编码"""
+    adapter = TypeAdapter(List[out_schema])
+    objs = (
+        db.query(model)
+        .filter(where)
+        .order_by(model.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    if prepare:
+        prepare(db, objs)
+    data = adapter.dump_python(adapter.validate_python(objs, from_attributes=True), mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def prepare_posts(db, posts) -> None:
+    user_ids = {p.user_id for p in posts if not p.is_anonymous}
+    users = {u.id: u for u in db.query(User).filter(User.id.in_(user_ids))}
+    for p in posts:
+        p.tags = split_tags(p.tags)
+        p.author = _author_out(p, users.get(p.user_id))
+
+
+def prepare_notifications(db, notifications) -> None:
+    for n in notifications:
+        n.latest_actors = json.loads(n.latest_actors) if n.latest_actors else []
+
+
+def rows_per_second(Session, fn, rows: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        with Session() as db:
+            fn(db)
+    return rows * ROUNDS / (time.perf_counter() - t0)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    settings.FEED_CACHE_ENABLED = False
+    Session, _, path = make_session_factory("list_serialization")
+    with Session() as db:
+        seed_users(db, 50)
+        seed_posts(db, max(rows, 1000), users=50)
+        seed_lists(db, rows)
+        user = db.query(User).filter(User.id == 1).first()
+        db.expunge(user)
+    print(f"数据库: {path}，每页 {rows} 行，JSON: {'orjson' if orjson else '标准库 json'}")
+
+    cases = {
+        "list_posts": (
+            lambda db: orm_path(db, Post, PostOut, Post.id > 0, rows, prepare_posts),
+            lambda db: list_posts(db=db, tag=None, cursor=None, skip=0, limit=rows, if_none_match=None),
+        ),
+        "list_comments": (
+            lambda db: orm_path(db, Comment, CommentOut, Comment.post_id == 1, rows),
+            lambda db: list_comments(1, db=db, current_user_id=user.id),
+        ),
+        "list_notifications": (
+            lambda db: orm_path(db, Notification, NotificationOut, Notification.user_id == 1, rows, prepare_notifications),
+            lambda db: list_notifications(db=db, current_user=user, cursor=None, skip=0, limit=rows),
+        ),
+        "get_recovery_records": (
+            lambda db: orm_path(db, RecoveryRecord, RecoveryRecordOut, RecoveryRecord.user_id == 1, rows),
+            lambda db: get_recovery_records(skip=0, limit=rows, current_user=user, db=db),
+        ),
+        "get_points_records": (
+            lambda db: orm_path(db, PointsRecord, PointsRecordOut, PointsRecord.user_id == 1, rows),
+            lambda db: get_points_records(skip=0, limit=rows, current_user=user, db=db),
+        ),
+    }
+    for name, (before, after) in cases.items():
+        old = rows_per_second(Session, before, rows)
+        new = rows_per_second(Session, after, rows)
+        print(f"{name:22s} ORM+Pydantic {old:10,.0f} rows/s   Core+直接序列化 {new:10,.0f} rows/s   x{new / old:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+登录风暴压测：大量并发密码登录的同时，测普通读接口（GET /gifts）的延迟。
+对比两种配置：
+- 不限流：哈希线程数不设上限，相当于改造前直接在接口线程里算 bcrypt
+- 限流：默认的哈希线程池（PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE），超出直接 503
+运行方式: python -m benchmarks.bench_login_storm [并发登录数] [持续秒数]
+"""
+import asyncio
+import socket
+import sys
+import threading
+import time
+
+import bcrypt
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import insert
+
+from app.core import security
+from app.core.config import settings
+from app.core.deps import get_db
+from app.models.user import User
+from app.routers import auth, gifts
+from benchmarks._common import make_session_factory, percentile
+
+READERS = 10
+BCRYPT_ROUNDS = 10  # 压测用低一点的 cost，缩短运行时间
+
+
+async def storm(http, logins: int, seconds: float, phones: list[str]) -> dict:
+    counts = {"ok": 0, "busy": 0, "other": 0}
+    reads: list[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def login(i):
+        while time.perf_counter() < deadline:
+            r = await http.post(
+                "/auth/login/password",
+                json={"phone": phones[i % len(phones)], "password": "kuleme123"},
+            )
+            key = "ok" if r.status_code == 200 else "busy" if r.status_code == 503 else "other"
+            counts[key] += 1
+            if r.status_code == 503:
+                await asyncio.sleep(float(r.headers.get("Retry-After", 1)))
+
+    async def read():
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            await http.get("/gifts")
+            reads.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(login(i) for i in range(logins)), *(read() for _ in range(READERS)))
+    return {**counts, "reads": reads}
+
+
+def report(label: str, result: dict, seconds: float) -> None:
+    reads = result["reads"]
+    print(
+        f"{label:<8} 登录成功 {result['ok'] / seconds:6.1f}/s  503 {result['busy']:>5}  "
+        f"其他错误 {result['other']:>3}  |  /gifts {len(reads):>5} 次 "
+        f"p50={percentile(reads, 50):8.1f}ms p99={percentile(reads, 99):8.1f}ms"
+    )
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    settings.PASSWORD_BCRYPT_ROUNDS = BCRYPT_ROUNDS
+
+    Session, _, path = make_session_factory("login_storm")
+    password_hash = bcrypt.hashpw(b"kuleme123", bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+    phones = [f"139{i:08d}" for i in range(logins)]
+    with Session() as db:
+        db.execute(
+            insert(User),
+            [{"phone": p, "nickname": p[-4:], "password_hash": password_hash} for p in phones],
+        )
+        db.commit()
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(gifts.router)
+    app.dependency_overrides[get_db] = bench_db
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    print(f"数据库: {path}，{logins} 个并发登录，持续 {seconds:.0f}s，{READERS} 个读客户端")
+
+    async def run(label: str, pool, concurrent_logins: int, duration: float) -> None:
+        security.hash_pool = pool
+        limits = httpx.Limits(max_connections=logins + READERS + 10)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None
+        ) as http:
+            result = await storm(http, concurrent_logins, duration, phones)
+        report(label, result, duration)
+
+    bounded = security.HashPool(
+        workers=settings.PASSWORD_HASH_WORKERS, queue=settings.PASSWORD_HASH_QUEUE
+    )
+    asyncio.run(run("无登录", bounded, 0, 3))
+    asyncio.run(run("不限流", security.HashPool(workers=logins, queue=0), logins, seconds))
+    asyncio.run(run("限流", bounded, logins, seconds))
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
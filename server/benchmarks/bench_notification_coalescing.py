@@ -0,0 +1,88 @@
+"""
+合并通知效果：模拟一条爆款帖子被几千人点赞、评论，外加一批普通帖子的零星互动，
+对比不合并和按窗口合并两种方式最终写入 notifications 的行数。
+运行方式: python -m benchmarks.bench_notification_coalescing [爆款点赞数]
+"""
+import random
+import sys
+import time
+
+from sqlalchemy import func
+
+from app.core.notifier import NotificationEvent, Notifier
+from app.models.notification import Notification
+from benchmarks._common import make_session_factory, seed_posts, seed_users
+
+
+USERS = 30000
+NORMAL_POSTS = 200
+BATCH = 200
+
+
+def make_events(viral_likes: int) -> list[NotificationEvent]:
+    rng = random.Random(7)
+    events = []
+    # 爆款帖子（id=1）：大量不同的人点赞，少量评论
+    for actor_id in rng.sample(range(2, USERS + 1), viral_likes):
+        events.append(NotificationEvent(type="like", actor_id=actor_id, post_id=1))
+    for _ in range(viral_likes // 20):
+        events.append(
+            NotificationEvent(
+                type="comment", actor_id=rng.randint(2, USERS), post_id=1, text="同亏"
+            )
+        )
+    # 普通帖子：每条几个赞、一两条评论
+    for post_id in range(2, NORMAL_POSTS + 2):
+        for _ in range(rng.randint(0, 5)):
+            events.append(
+                NotificationEvent(type="like", actor_id=rng.randint(1, USERS), post_id=post_id)
+            )
+        for _ in range(rng.randint(0, 2)):
+            events.append(
+                NotificationEvent(
+                    type="comment", actor_id=rng.randint(1, USERS), post_id=post_id, text="抱抱"
+                )
+            )
+    rng.shuffle(events)
+    return events
+
+
+def run(label: str, window_minutes: int, events: list[NotificationEvent]) -> int:
+    Session, _, _ = make_session_factory(f"notify_{window_minutes}")
+    with Session() as db:
+        seed_users(db, USERS)
+        seed_posts(db, NORMAL_POSTS + 1, users=USERS)
+    notifier = Notifier(
+        maxsize=1, batch_size=BATCH, batch_wait_ms=0,
+        coalesce_window_minutes=window_minutes,
+    )
+    t0 = time.perf_counter()
+    for start in range(0, len(events), BATCH):
+        with Session() as db:
+            notifier.write(db, events[start:start + BATCH])
+            db.commit()
+    elapsed = time.perf_counter() - t0
+    with Session() as db:
+        rows = db.query(func.count(Notification.id)).scalar()
+        viral = (
+            db.query(Notification.type, Notification.actor_count, Notification.content)
+            .filter(Notification.related_id == "1")
+            .all()
+        )
+    print(f"{label:<8} 通知行数={rows:>6}  写入耗时={elapsed * 1000:8.1f}ms")
+    for row in viral[:3]:
+        print(f"         爆款帖子: [{row.type}] x{row.actor_count} {row.content}")
+    return rows
+
+
+def main():
+    viral_likes = min(int(sys.argv[1]) if len(sys.argv) > 1 else 20000, USERS - 1)
+    events = make_events(viral_likes)
+    print(f"事件数: {len(events)}（爆款帖子点赞 {viral_likes}）")
+    raw = run("不合并", 0, events)
+    merged = run("合并", 24 * 60, events)
+    print(f"节省行数: {raw - merged}（{(raw - merged) / raw:.1%}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+实时推送压测：一个 worker 进程能挂住多少空闲 SSE 连接、每秒能推出多少条消息。
+服务端（uvicorn + 推送中转）跑在本进程，客户端连接放在子进程里，避免两边抢同一个 GIL。
+运行方式: python -m benchmarks.bench_push_fanout [连接数] [消息数]
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.core.pubsub import broker
+from app.core.security import create_access_token
+from app.routers import notifications
+from benchmarks._common import make_session_factory, seed_users
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def client(port: int, connections: int, expected: int) -> None:
+    """子进程：建立连接，收满 expected 条 notification 后输出最后一条的到达时间"""
+    received = 0
+    done = asyncio.Event()
+    last_at = 0.0
+
+    async def listen(http, user_id):
+        nonlocal received, last_at
+        token = create_access_token(str(user_id))
+        async with http.stream("GET", "/notifications/stream", params={"token": token}) as r:
+            async for line in r.aiter_lines():
+                if line == "event: notification":
+                    received += 1
+                    last_at = time.time()
+                    if received >= expected:
+                        done.set()
+
+    limits = httpx.Limits(max_connections=connections + 10)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None
+    ) as http:
+        tasks = [asyncio.create_task(listen(http, uid)) for uid in range(1, connections + 1)]
+        print("ready", flush=True)
+        try:
+            await asyncio.wait_for(done.wait(), timeout=300)
+        except asyncio.TimeoutError:
+            pass
+        print(f"received {received} {last_at}", flush=True)
+        for t in tasks:
+            t.cancel()
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+    Session, _, path = make_session_factory("push_fanout")
+    with Session() as db:
+        seed_users(db, connections)
+    # 推送接口用 SessionLocal 做鉴权，这里换成压测库
+    notifications.SessionLocal = Session
+    app = FastAPI()
+    app.include_router(notifications.router)
+    broker.start()
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base_rss = rss_mb()
+    print(f"数据库: {path}，{connections} 个连接，{messages} 条消息")
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_push_fanout", "--client",
+         str(port), str(connections), str(messages)],
+        stdout=subprocess.PIPE, text=True, cwd=os.getcwd(),
+    )
+    proc.stdout.readline()  # ready
+    t0 = time.perf_counter()
+    while broker.stats()["connections"] < connections:
+        if time.perf_counter() - t0 > 120:
+            print(f"只建立了 {broker.stats()['connections']} 个连接")
+            break
+        time.sleep(0.1)
+    print(
+        f"建立连接: {broker.stats()['connections']} 个，用时 {time.perf_counter() - t0:.1f}s，"
+        f"内存 +{rss_mb() - base_rss:.1f}MB（约 {(rss_mb() - base_rss) * 1024 / connections:.1f}KB/连接）"
+    )
+
+    # 空闲几秒，看连接是否都挂得住
+    time.sleep(3)
+    print(f"空闲 3s 后仍在线: {broker.stats()['connections']} 个")
+
+    payload = {"type": "like", "title": "有人赞了你的吐槽", "content": "压测消息", "unread": 1}
+    start_wall = time.time()
+    t0 = time.perf_counter()
+    for i in range(messages):
+        broker.publish(i % connections + 1, "notification", payload)
+    publish_s = time.perf_counter() - t0
+
+    out = proc.stdout.readline().split()
+    proc.terminate()
+    received, last_at = int(out[1]), float(out[2])
+    elapsed = max(last_at - start_wall, 1e-9)
+    stats = broker.stats()
+    print(f"发布: {messages / publish_s:,.0f} 条/秒（发布端）")
+    print(
+        f"送达: {received}/{messages} 条，{received / elapsed:,.0f} 条/秒（端到端），"
+        f"丢弃 {stats['dropped']} 条"
+    )
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--client":
+        asyncio.run(client(int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])))
+    else:
+        main()
@@ -0,0 +1,106 @@
+"""
+SQLite 生产配置压测：读线程查帖子详情和最新帖子，写线程发评论（插入评论 + 原子加评论数），
+读写同时进行，对比默认配置（rollback journal、所有线程共用一个连接池）
+和生产配置（WAL + PRAGMA、唯一写连接、只读连接池）的吞吐、延迟和 "database is locked" 次数。
+运行方式: python -m benchmarks.bench_sqlite_profile [读线程数] [写线程数] [持续秒数]
+"""
+import random
+import sys
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.counters import bump_comments
+from app.db.routing import RoutingSession
+from app.db.session import sqlite_engines
+from app.models.comment import Comment
+from app.models.post import Post
+from benchmarks._common import make_session_factory, percentile, seed_posts, seed_users
+
+POSTS = 20000
+USERS = 200
+
+
+def read_op(db, rng) -> None:
+    db.query(Post).filter(Post.id == rng.randint(1, POSTS)).first()
+    db.query(Post.id, Post.content, Post.likes).order_by(Post.created_at.desc()).limit(20).all()
+
+
+def write_op(db, rng) -> None:
+    post_id = rng.randint(1, POSTS)
+    bump_comments(db, post_id, 1)
+    db.add(Comment(post_id=post_id, user_id=rng.randint(1, USERS), content="又亏了"))
+    db.commit()
+
+
+def run(Session, readers: int, writers: int, seconds: float) -> dict:
+    results = {"read": [], "write": [], "locked": 0, "other": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(op, key, seed):
+        rng = random.Random(seed)
+        samples = []
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                with Session() as db:
+                    op(db, rng)
+                samples.append((time.perf_counter() - t0) * 1000)
+            except OperationalError as e:
+                with lock:
+                    results["locked" if "locked" in str(e) else "other"] += 1
+        with lock:
+            results[key].extend(samples)
+
+    threads = [
+        threading.Thread(target=worker, args=(read_op, "read", i)) for i in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=(write_op, "write", 1000 + i)) for i in range(writers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def report(label: str, result: dict, seconds: float) -> None:
+    parts = [f"{label:<6}"]
+    for key, name in (("read", "读"), ("write", "写")):
+        samples = result[key] or [float("nan")]
+        parts.append(
+            f"{name} {len(result[key]) / seconds:7.1f} ops/s p99={percentile(samples, 99):7.1f}ms"
+        )
+    parts.append(f"locked {result['locked']:>4}  其他错误 {result['other']}")
+    print("  ".join(parts))
+
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    _, seed_engine, path = make_session_factory("sqlite_profile")
+    with sessionmaker(bind=seed_engine)() as db:
+        seed_users(db, USERS)
+        seed_posts(db, POSTS, users=USERS)
+    seed_engine.dispose()
+    uri = f"sqlite:///{path}"
+    print(f"数据库: {path}，{POSTS} 条帖子，{readers} 个读线程，{writers} 个写线程，每种配置 {seconds:.0f}s")
+
+    # 默认配置：和 db/session.py 的开发配置一致（sqlite3 默认等锁 5 秒）
+    default_engine = create_engine(uri, connect_args={"check_same_thread": False})
+    report("默认", run(sessionmaker(bind=default_engine), readers, writers, seconds), seconds)
+    default_engine.dispose()
+
+    writer, reader = sqlite_engines(create_engine, uri)
+    Session = sessionmaker(class_=RoutingSession, writer=writer, reader=reader)
+    report("生产", run(Session, readers, writers, seconds), seconds)
+
+
+if __name__ == "__main__":
+    main()
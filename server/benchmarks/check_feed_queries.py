@@ -0,0 +1,85 @@
+"""
+检查帖子流接口的 SQL 语句数不随每页条数增长（没有 N+1），也不超过 EXPECTED_QUERIES。
+运行方式: python -m benchmarks.check_feed_queries
+不通过时以非 0 状态退出；CI 里由 .github/workflows/server-checks.yml 在 server 目录下运行。
+"""
+import sys
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.routers.posts import get_my_posts, list_hot_posts, list_posts
+from app.models.user import User
+from benchmarks._common import (
+    backfill_scores,
+    backfill_tags,
+    make_session_factory,
+    seed_posts,
+    seed_users,
+)
+
+
+PAGE_SIZES = [5, 20, 50]
+
+# 每个接口一页的语句数上限：改动让语句变多时先确认是有意的，再调这里
+EXPECTED_QUERIES = {
+    "list_posts": 1,
+    "list_posts(tag)": 1,
+    "get_my_posts": 1,
+    "list_hot_posts": 2,  # 热度分排序 + 取帖子
+}
+
+
+def main():
+    settings.FEED_CACHE_ENABLED = False
+    Session, engine, path = make_session_factory("feed_queries")
+    with Session() as db:
+        seed_users(db, 100)
+        seed_posts(db, 500)
+        backfill_tags(db)
+        backfill_scores(db)
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    def count(fn) -> int:
+        statements.clear()
+        with Session() as db:
+            fn(db)
+        return len(statements)
+
+    with Session() as db:
+        user = db.query(User).filter(User.id == 1).first()
+        db.expunge(user)
+
+    endpoints = {
+        "list_posts": lambda db, n: list_posts(
+            db=db, tag=None, cursor=None, skip=0, limit=n, if_none_match=None
+        ),
+        "list_posts(tag)": lambda db, n: list_posts(
+            db=db, tag="深度套牢", cursor=None, skip=0, limit=n, if_none_match=None
+        ),
+        "get_my_posts": lambda db, n: get_my_posts(
+            db=db, current_user_id=user.id, cursor=None, skip=0, limit=n
+        ),
+        "list_hot_posts": lambda db, n: list_hot_posts(
+            db=db, cursor=None, skip=0, limit=n
+        ),
+    }
+
+    failed = False
+    for name, endpoint in endpoints.items():
+        counts = [count(lambda db: endpoint(db, n)) for n in PAGE_SIZES]
+        ok = len(set(counts)) == 1 and max(counts) <= EXPECTED_QUERIES[name]
+        failed |= not ok
+        detail = ", ".join(f"{n} 条/页: {c}" for n, c in zip(PAGE_SIZES, counts))
+        print(f"{'✓' if ok else '✗'} {name}: {detail}（上限 {EXPECTED_QUERIES[name]}）")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
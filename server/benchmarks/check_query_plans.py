@@ -0,0 +1,375 @@
+"""
+检查所有接口发出的 SQL 都能走索引：造好数据后把每个接口调一遍，记录执行过的语句，
+逐条 EXPLAIN，出现全表扫描或者临时排序（SQLite 的 USE TEMP B-TREE）就算失败。
+运行方式:
+  python -m benchmarks.check_query_plans                 临时 SQLite 库
+  python -m benchmarks.check_query_plans postgresql://…  空的 PostgreSQL 库（会在里面建表造数据）
+PostgreSQL 上数据量小时全表扫描反而更便宜，所以先关掉 enable_seqscan / enable_sort 再 EXPLAIN：
+计划里还有 Seq Scan / Sort 说明确实没有能用的索引。
+有问题时以非 0 状态退出。SQLite 没有 ANALYZE 统计时计划和数据量无关，造少量数据就够；
+tests/test_query_plans.py 用同样的流程在 pytest 里检查（CI 见 .github/workflows/server-checks.yml）。
+"""
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.deps import get_db
+from app.core.notifier import NotificationEvent, Notifier
+from app.core.search import ensure_search_index
+from app.db.backfill import backfill_search_index
+from app.db.base import Base, ensure_indexes
+from app.models.comment import Comment
+from app.models.gift import ExchangeRecord, Gift, GiftType
+from app.models.growth import PointsRecord
+from app.models.interaction import Interaction
+from app.models.medal import Medal, MedalRarity, UserMedal
+from app.models.notification import Broadcast, Notification
+from app.models.recovery import RecoveryRecord, RecoveryRecordType, UserBalance
+from app.routers import (
+    auth,
+    comments,
+    gifts,
+    growth,
+    interactions,
+    medals,
+    notifications,
+    posts,
+    recovery,
+    review,
+    users,
+)
+from benchmarks._common import (
+    backfill_scores,
+    backfill_tags,
+    make_session_factory,
+    seed_posts,
+    seed_users,
+)
+
+USERS = 50
+POSTS = 500
+PHONE = "13800000001"  # seed_users 造的 1 号用户
+
+# 允许全表扫描的小表（配置类数据，行数固定在几十行以内）
+ALLOWED_SCANS = {
+    "medals": "勋章配置",
+    "gifts": "礼品目录",
+}
+
+# 允许排序的全文检索表：按相关度排序没法走索引，排序的只是匹配到的行
+RELEVANCE_TABLES = ("posts_fts", "post_search")
+
+# 只看会按条件读表的语句；INSERT ... VALUES、事务控制语句不用看
+_EXPLAINED = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+_PG_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+_PG_SORT = re.compile(r"(^|->)\s*Sort\s+\(")
+
+
+def seed(db, users: int = USERS, posts: int = POSTS) -> None:
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    seed_users(db, users)
+    seed_posts(db, posts, users=users)
+    backfill_tags(db)
+    backfill_scores(db)
+
+    def ago(i: int) -> datetime:
+        return now - timedelta(minutes=i)
+
+    db.execute(
+        insert(Comment),
+        [
+            {
+                "post_id": rng.randint(1, posts),
+                "user_id": rng.randint(1, users),
+                "content": f"第 {i} 条评论",
+                "created_at": ago(i),
+            }
+            for i in range(posts * 2)
+        ],
+    )
+    pairs = {
+        (rng.randint(1, users), rng.randint(1, posts), rng.choice(["like", "heart"]))
+        for _ in range(posts * 2)
+    }
+    db.execute(
+        insert(Interaction),
+        [{"user_id": u, "post_id": p, "action_type": a} for u, p, a in pairs],
+    )
+    db.execute(
+        insert(Notification),
+        [
+            {
+                "user_id": rng.randint(1, users),
+                "type": "like",
+                "title": "有人赞了你",
+                "content": "……",
+                "related_id": str(rng.randint(1, posts)),
+                "is_read": rng.random() < 0.5,
+                "created_at": ago(i),
+                "updated_at": ago(i),
+            }
+            for i in range(posts * 2)
+        ],
+    )
+    db.execute(
+        insert(Broadcast),
+        [{"title": f"公告 {i}", "content": "……", "created_at": ago(i * 60)} for i in range(50)],
+    )
+    db.execute(
+        insert(RecoveryRecord),
+        [
+            {
+                "user_id": rng.randint(1, users),
+                "type": RecoveryRecordType.reward,
+                "amount": 5,
+                "description": "奖励",
+                "created_at": ago(i),
+            }
+            for i in range(posts)
+        ],
+    )
+    db.execute(
+        insert(PointsRecord),
+        [
+            {"user_id": rng.randint(1, users), "amount": 10, "description": "发帖", "created_at": ago(i)}
+            for i in range(posts)
+        ],
+    )
+    db.execute(
+        insert(ExchangeRecord),
+        [
+            {"user_id": rng.randint(1, users), "gift_id": 1, "gift_name": "周边", "created_at": ago(i)}
+            for i in range(posts)
+        ],
+    )
+    db.execute(
+        insert(Medal),
+        [
+            {
+                "name": f"勋章 {i}",
+                "description": "……",
+                "icon": "emoji_events",
+                "rarity": list(MedalRarity)[i % 4],
+                "unlock_condition": "发帖",
+                "target_value": 10,
+            }
+            for i in range(20)
+        ],
+    )
+    db.execute(
+        insert(UserMedal),
+        [
+            {"user_id": u, "medal_id": m, "is_unlocked": m % 3 == 0}
+            for u in range(2, users + 1)
+            for m in range(1, 21)
+        ],
+    )
+    db.execute(
+        insert(Gift),
+        [
+            {"name": f"礼品 {i}", "type": GiftType.virtual, "points_required": 0, "stock": 100}
+            for i in range(10)
+        ],
+    )
+    db.execute(
+        insert(UserBalance),
+        [{"user_id": u, "recovery_balance": 100.0, "points": 1000} for u in range(1, users + 1)],
+    )
+    backfill_search_index(db)
+    db.commit()
+
+
+def make_database(url: str | None):
+    if url is None:
+        return make_session_factory("query_plans")[:2]
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine), engine
+
+
+def build_app(Session) -> FastAPI:
+    def check_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    for module in (
+        auth, users, posts, comments, interactions, notifications,
+        recovery, gifts, growth, medals, review,
+    ):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = check_db
+    return app
+
+
+def exercise(client: TestClient) -> None:
+    """把每个接口至少调一遍（翻页的接口再带游标调一次）"""
+    token = client.post("/auth/login", json={"phone": PHONE, "code": "123456"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    def call(method: str, path: str, **kwargs):
+        r = client.request(method, path, headers=headers, **kwargs)
+        if r.status_code >= 500:
+            raise RuntimeError(f"{method} {path}: {r.status_code} {r.text}")
+        return r
+
+    def next_page(path: str, **kwargs):
+        r = call("GET", path, **kwargs)
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor:
+            params = {**kwargs.pop("params", {}), "cursor": cursor}
+            call("GET", path, params=params, **kwargs)
+
+    client.post("/auth/login/password", json={"phone": PHONE, "password": "wrong"})
+    client.post("/auth/register", json={"phone": "13900000000", "code": "123456", "password": "kuleme123"})
+    client.post(
+        "/auth/reset-password",
+        json={"phone": "13900000000", "code": "123456", "new_password": "kuleme456"},
+    )
+    client.post("/auth/login/password", json={"phone": "13900000000", "password": "kuleme456"})
+    client.post("/auth/refresh", json={"refresh_token": token["refresh_token"]})
+
+    call("GET", "/users/me")
+    call("PUT", "/users/me", json={"nickname": "亏友_0001", "tags": ["基金"]})
+
+    post_id = call("POST", "/posts/", json={"content": "又抄底失败了", "amount": 100, "tags": ["抄底失败"]}).json()["id"]
+    next_page("/posts/", params={"limit": 20})
+    next_page("/posts/", params={"limit": 20, "tag": "深度套牢"})
+    next_page("/posts/hot", params={"limit": 20})
+    next_page("/posts/me", params={"limit": 20})
+    next_page("/posts/search", params={"q": "抄底", "limit": 20})
+    call("GET", "/posts/tags")
+    call("GET", "/posts/interactions/state", params={"ids": ",".join(str(i) for i in range(1, 51))})
+    call("GET", f"/posts/{post_id}")
+    call("PUT", f"/posts/{post_id}", json={"content": "又追涨了", "amount": 200, "tags": ["追涨杀跌"]})
+
+    target = 2
+    call("POST", f"/posts/{target}/comments/", json={"content": "惨"})
+    call("GET", f"/posts/{target}/comments/")
+    call("POST", f"/posts/{target}/interactions/", params={"action": "like"})
+    call("POST", f"/posts/{target}/interactions/", params={"action": "like"})
+    call("DELETE", f"/posts/{post_id}")
+
+    next_page("/notifications/", params={"limit": 20})
+    call("GET", "/notifications/unread-count")
+    call("POST", "/notifications/1/read")
+    call("POST", "/notifications/-1/read")
+    call("POST", "/notifications/read-all")
+
+    call("GET", "/recovery/balance")
+    call("POST", "/recovery/lottery/draw", json={})
+    call("GET", "/recovery/records")
+    call("GET", "/gifts")
+    call("POST", "/gifts/1/exchange", json={"gift_id": 1})
+    call("GET", "/gifts/exchange-records")
+    call("GET", "/growth/summary")
+    call("GET", "/growth/level")
+    call("GET", "/growth/points-records")
+    call("GET", "/medals")
+    call("GET", "/review/summary")
+    call("POST", "/review/message", params={"message": "别再追高了"})
+    call("POST", "/auth/logout", json={"refresh_token": token["refresh_token"]})
+
+
+def plan_problems(conn, statement: str, parameters) -> tuple[list[str], list[str]]:
+    """返回 (执行计划, 有问题的行)"""
+    allow_sort = any(table in statement for table in RELEVANCE_TABLES)
+    if conn.dialect.name == "postgresql":
+        trans = conn.begin()
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        conn.exec_driver_sql("SET LOCAL enable_sort = off")
+        plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+        trans.rollback()
+        bad = [
+            line for line in plan
+            if (m := _PG_SEQ_SCAN.search(line)) and m.group(1) not in ALLOWED_SCANS
+            or not allow_sort and _PG_SORT.search(line.strip())
+        ]
+        return plan, bad
+
+    plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    tables = set(Base.metadata.tables)
+    bad = [
+        line for line in plan
+        if (m := _SQLITE_SCAN.match(line)) and m.group(1) in tables and m.group(1) not in ALLOWED_SCANS
+        or not allow_sort and "USE TEMP B-TREE" in line
+    ]
+    return plan, bad
+
+
+def write_notifications(Session) -> None:
+    """
+    通知管道的合并查询也在热路径上。接口里的 publish 在管道没启动时直接忽略，
+    这里用一个不启动后台线程的 Notifier 把点赞、评论事件同步写一批
+    """
+    pipeline = Notifier(
+        maxsize=1,
+        batch_size=settings.NOTIFY_BATCH_SIZE,
+        batch_wait_ms=0,
+        coalesce_window_minutes=settings.NOTIFY_COALESCE_WINDOW_MINUTES,
+    )
+    events = [
+        NotificationEvent("like", actor_id=3, post_id=2),
+        NotificationEvent("comment", actor_id=3, post_id=2, text="惨"),
+    ]
+    with Session() as db:
+        pipeline.write(db, events)
+        db.commit()
+
+
+def collect_statements(Session, engine) -> dict[str, object]:
+    """把接口和通知管道都跑一遍，返回执行过的语句（按文本去重，参数取第一次执行时的）"""
+    statements: dict[str, object] = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and _EXPLAINED.match(statement):
+            statements.setdefault(statement, parameters)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        exercise(TestClient(build_app(Session)))
+        write_notifications(Session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else None
+    settings.FEED_CACHE_ENABLED = False
+    Session, engine = make_database(url)
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+    with Session() as db:
+        seed(db)
+    statements = collect_statements(Session, engine)
+
+    failed = 0
+    with engine.connect() as conn:
+        for statement, parameters in statements.items():
+            plan, bad = plan_problems(conn, statement, parameters)
+            if not bad:
+                continue
+            failed += 1
+            print(f"✗ {' '.join(statement.split())}")
+            for line in plan:
+                print(f"    {'!' if line in bad else ' '} {line}")
+    print(f"\n共检查 {len(statements)} 条语句，{failed} 条没有走索引")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+数据库迁移脚本：按已有通知回填每个用户的未读数 notification_counters
+运行方式: python migrate_notification_counters.py [--force]
+  默认只在 notification_counters 为空时回填；--force 会清空后全量重算
+"""
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.backfill import backfill_notification_counters
+from app.db.session import SessionLocal
+
+
+def migrate_notification_counters(force: bool = False):
+    """按 notifications 里的未读条数重算计数"""
+    db = SessionLocal()
+    try:
+        count = backfill_notification_counters(db, force)
+        if count is None:
+            print("✓ notification_counters 已有数据，跳过回填")
+            return
+        db.commit()
+        print(f"✓ 已回填 {count} 个用户的未读通知数")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ 迁移失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_notification_counters(force="--force" in sys.argv)
@@ -0,0 +1,35 @@
+"""
+数据库迁移脚本：为已有帖子回填热度分表 post_scores
+运行方式: python migrate_post_scores.py [--force]
+  默认只在 post_scores 为空时回填；--force 会清空后全量重算
+"""
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.backfill import backfill_post_scores
+from app.db.session import SessionLocal
+
+
+def migrate_post_scores(force: bool = False):
+    """按帖子当前的点赞/评论数重算热度分"""
+    db = SessionLocal()
+    try:
+        total = backfill_post_scores(db, force)
+        if total is None:
+            print("✓ post_scores 已有数据，跳过回填")
+            return
+        db.commit()
+        print(f"✓ 已回填 {total} 条帖子热度分")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ 迁移失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_post_scores(force="--force" in sys.argv)
@@ -0,0 +1,35 @@
+"""
+数据库迁移脚本：根据 posts.tags 回填帖子标签关联表 post_tags 和标签计数 tag_stats
+运行方式: python migrate_post_tags.py [--force]
+  默认只在 post_tags 为空时回填；--force 会清空后全量重建
+"""
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.backfill import backfill_post_tags
+from app.db.session import SessionLocal
+
+
+def migrate_post_tags(force: bool = False):
+    """回填 post_tags 并重算 tag_stats"""
+    db = SessionLocal()
+    try:
+        result = backfill_post_tags(db, force)
+        if result is None:
+            print("✓ post_tags 已有数据，跳过回填")
+            return
+        db.commit()
+        print(f"✓ 已回填 {result[0]} 条帖子标签，{result[1]} 个标签计数")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ 迁移失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_post_tags(force="--force" in sys.argv)
@@ -0,0 +1,38 @@
+"""
+重建帖子全文检索索引（SQLite FTS5 / PostgreSQL tsvector）
+运行方式: python rebuild_search_index.py [--force]
+  默认只在索引为空时构建；--force 会清空后全量重建
+"""
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.search import ensure_search_index
+from app.db.backfill import backfill_search_index
+from app.db.session import SessionLocal, engine
+
+
+def rebuild_search_index(force: bool = False):
+    """按 posts.content 重建检索索引"""
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+    db = SessionLocal()
+    try:
+        total = backfill_search_index(db, force)
+        if total is None:
+            print("✓ 检索索引已有数据，跳过重建")
+            return
+        db.commit()
+        print(f"✓ 已为 {total} 条帖子建立检索索引")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ 重建失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_search_index(force="--force" in sys.argv)
@@ -0,0 +1,34 @@
+"""
+发送全站系统通知：只在 broadcasts 表写一行，用户读通知时合并进去
+运行方式: python send_broadcast.py "标题" "内容"
+"""
+import argparse
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.broadcasts import create_broadcast
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.notification import Broadcast
+
+
+def send_broadcast(title: str, content: str) -> int:
+    Base.metadata.create_all(bind=engine, tables=[Broadcast.__table__])
+    db = SessionLocal()
+    try:
+        broadcast = create_broadcast(db, title, content)
+        print(f"✓ 已发送全站通知 #{broadcast.id}: {title}")
+        return broadcast.id
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="发送全站系统通知")
+    parser.add_argument("title")
+    parser.add_argument("content")
+    args = parser.parse_args()
+    send_broadcast(args.title, args.content)
@@ -42,5 +42,8 @@ echo ""
 echo "按 Ctrl+C 停止服务"
 echo ""
 
+# 升级数据库结构（已是最新版本时什么都不做；服务启动时只检查版本）
+python -m app.db.migrate || exit 1
+
 # 启动服务
 uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
@@ -0,0 +1,53 @@
+"""
+全站广播的已读游标：客户端传来的广播 id 不能把游标推到最新广播之后，
+否则之后发的广播一直算已读。
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.broadcasts import create_broadcast
+from app.core.unread import get_broadcast_seen_id, mark_broadcasts_seen
+from benchmarks._common import make_session_factory, seed_users
+from benchmarks.check_query_plans import PHONE, build_app
+
+
+@pytest.fixture
+def Session():
+    Session, engine, _ = make_session_factory("broadcast_read")
+    with Session() as db:
+        seed_users(db, 1)
+    yield Session
+    engine.dispose()
+
+
+@pytest.fixture
+def client(Session):
+    client = TestClient(build_app(Session))
+    token = client.post("/auth/login", json={"phone": PHONE, "code": "123456"}).json()
+    client.headers["Authorization"] = f"Bearer {token['access_token']}"
+    return client
+
+
+def _unread(client) -> int:
+    return client.get("/notifications/unread-count").json()["unread"]
+
+
+def test_marking_unknown_broadcast_read_does_not_hide_later_ones(Session, client):
+    with Session() as db:
+        create_broadcast(db, "公告 1", "……")
+    assert _unread(client) == 1
+
+    assert client.post("/notifications/-99999/read").status_code == 404
+    assert _unread(client) == 1
+
+    with Session() as db:
+        create_broadcast(db, "公告 2", "……")
+    assert _unread(client) == 2
+
+
+def test_seen_cursor_is_clamped_to_latest_broadcast(Session):
+    with Session() as db:
+        latest = create_broadcast(db, "公告", "……").id
+        mark_broadcasts_seen(db, 1, latest + 1000)
+        db.commit()
+        assert get_broadcast_seen_id(db, 1) == latest
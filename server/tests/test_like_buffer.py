@@ -0,0 +1,81 @@
+"""
+点赞写后合并：多个进程（这里用两个 LikeBuffer 模拟）共用一个库时，
+一个进程记下的增量被另一个进程合并后，不能再叠加到 posts.likes 上。
+"""
+import pytest
+
+from app.core.likes import LikeBuffer
+from app.models.interaction import LikeDelta
+from app.models.post import Post
+from benchmarks._common import make_session_factory, seed_posts, seed_users
+
+POST_ID = 1
+
+
+@pytest.fixture
+def Session():
+    Session, engine, _ = make_session_factory("like_buffer")
+    with Session() as db:
+        seed_users(db, 1)
+        seed_posts(db, 1, users=1)
+    yield Session
+    engine.dispose()
+
+
+@pytest.fixture
+def buffers(Session):
+    # 间隔设得很长，后台线程不会自己合并，只测手动调用的 flush
+    started = [LikeBuffer(interval_ms=3600 * 1000, batch=100) for _ in range(2)]
+    for buffer in started:
+        buffer.start(Session)
+    yield started
+    for buffer in started:
+        buffer.stop()
+
+
+def _likes(Session) -> int:
+    with Session() as db:
+        return db.get(Post, POST_ID).likes
+
+
+def test_deltas_merged_by_another_buffer_are_no_longer_pending(Session, buffers):
+    recorder, flusher = buffers
+    base = _likes(Session)
+    with Session() as db:
+        recorder.record(db, POST_ID, 1)
+        recorder.record(db, POST_ID, 1)
+        db.commit()
+    assert recorder.pending(POST_ID) == 2
+
+    assert flusher.flush() == 2
+    assert _likes(Session) == base + 2
+
+    # 自己这轮没有可合并的，但会核对出这两条已经被别的进程合并
+    assert recorder.flush() == 0
+    assert recorder.pending(POST_ID) == 0
+    assert recorder.stats()["pending"] == 0
+    assert recorder.stats()["merged_elsewhere"] == 2
+
+
+def test_own_pending_deltas_survive_the_check(Session, buffers):
+    recorder, _ = buffers
+    with Session() as db:
+        recorder.record(db, POST_ID, 1)
+        db.commit()
+    # 没有别的进程合并时，核对不能误删还在表里的增量
+    with Session() as db:
+        recorder._prune(db)
+        assert db.query(LikeDelta).count() == 1
+    assert recorder.pending(POST_ID) == 1
+
+
+def test_uncommitted_delta_is_not_pruned(Session, buffers):
+    recorder, _ = buffers
+    with Session() as db:
+        recorder.record(db, POST_ID, 1)
+        # 还没提交：别的连接看不到这条增量，核对时不能把它当成已合并
+        with Session() as other:
+            recorder._prune(other)
+        assert recorder.pending(POST_ID) == 1
+        db.commit()
+    assert recorder.pending(POST_ID) == 1
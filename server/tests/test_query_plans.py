@@ -0,0 +1,123 @@
+"""
+热点语句的执行计划检查（SQLite EXPLAIN QUERY PLAN）。
+造一份小数据库，把所有接口和通知管道跑一遍（流程同 benchmarks/check_query_plans.py），
+再逐条检查：指定的热点语句走到预期的索引，所有语句都没有全表扫描和临时排序。
+没有 ANALYZE 统计时 SQLite 的计划和数据量无关，少量数据就够。
+运行方式（server 目录下）: python -m pytest -q
+"""
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.core.search import ensure_search_index
+from benchmarks.check_query_plans import collect_statements, make_database, plan_problems, seed
+
+# 热点语句 -> (语句里的特征片段, 应该用到的索引)
+HOT_STATEMENTS = {
+    "帖子流": (
+        "FROM posts LEFT OUTER JOIN users ON users.id = posts.user_id "
+        "ORDER BY posts.created_at DESC, posts.id DESC",
+        "ix_posts_created_at_id",
+    ),
+    "帖子流翻页": (
+        "WHERE (posts.created_at, posts.id) < (?, ?) ORDER BY posts.created_at DESC",
+        "ix_posts_created_at_id",
+    ),
+    "按标签的帖子流": (
+        "WHERE post_tags.tag = ? ORDER BY post_tags.created_at DESC",
+        "ix_post_tags_tag_created_at_post_id",
+    ),
+    "我的帖子": (
+        "WHERE posts.user_id = ? ORDER BY posts.created_at DESC",
+        "ix_posts_user_id_created_at_id",
+    ),
+    "热门帖子": (
+        "FROM post_scores ORDER BY post_scores.score DESC",
+        "ix_post_scores_score_post_id",
+    ),
+    "热门标签": ("FROM tag_stats WHERE tag_stats.post_count > ?", "ix_tag_stats_post_count"),
+    "帖子评论": (
+        "FROM comments WHERE comments.post_id = ? ORDER BY comments.created_at DESC",
+        "ix_comments_post_id_created_at",
+    ),
+    "帖子的互动": (
+        "FROM interactions WHERE ? = interactions.post_id",
+        "ix_interactions_post_id_user_id_action_type",
+    ),
+    "通知列表": (
+        "FROM notifications WHERE notifications.user_id = ?",
+        "ix_notifications_user_id_created_at_id",
+    ),
+    "通知合并": (
+        "FROM notifications WHERE notifications.user_id IN",
+        "ix_notifications_user_id_is_read_created_at",
+    ),
+    "全部已读": (
+        "UPDATE notifications SET is_read=? WHERE notifications.user_id = ?",
+        "ix_notifications_user_id_is_read_created_at",
+    ),
+    "广播": ("FROM broadcasts WHERE broadcasts.created_at >= ?", "ix_broadcasts_created_at_id"),
+    "回血记录": (
+        "FROM recovery_records WHERE recovery_records.user_id = ?",
+        "ix_recovery_records_user_id_created_at",
+    ),
+    "积分记录": (
+        "FROM points_records WHERE points_records.user_id = ?",
+        "ix_points_records_user_id_created_at",
+    ),
+    "兑换记录": (
+        "FROM exchange_records WHERE exchange_records.user_id = ?",
+        "ix_exchange_records_user_id_created_at",
+    ),
+    "勋章进度": (
+        "FROM user_medals WHERE user_medals.user_id = ? AND user_medals.medal_id = ?",
+        "uq_user_medals_user_medal",
+    ),
+}
+
+
+def _one_line(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+@pytest.fixture(scope="module")
+def explained():
+    """{语句: (执行计划, 有问题的行)}"""
+    feed_cache = settings.FEED_CACHE_ENABLED
+    settings.FEED_CACHE_ENABLED = False
+    try:
+        Session, engine = make_database(None)
+        with engine.begin() as conn:
+            ensure_search_index(conn)
+        with Session() as db:
+            seed(db, users=20, posts=100)
+        statements = collect_statements(Session, engine)
+        with engine.connect() as conn:
+            results = {
+                _one_line(statement): plan_problems(conn, statement, parameters)
+                for statement, parameters in statements.items()
+            }
+        engine.dispose()
+    finally:
+        settings.FEED_CACHE_ENABLED = feed_cache
+    return results
+
+
+@pytest.mark.parametrize("name", HOT_STATEMENTS)
+def test_hot_statement_uses_index(explained, name):
+    fragment, index = HOT_STATEMENTS[name]
+    matched = {
+        statement: result for statement, result in explained.items() if fragment in statement
+    }
+    assert matched, f"{name}: 没有执行到包含 {fragment!r} 的语句"
+    for statement, (plan, bad) in matched.items():
+        assert not bad, f"{name}: {statement}\n{plan}"
+        assert any(re.search(rf"\bINDEX {index}\b", line) for line in plan), (
+            f"{name} 没有用到 {index}: {statement}\n{plan}"
+        )
+
+
+def test_no_full_scans_or_temp_sorts(explained):
+    failures = [f"{statement}\n    {plan}" for statement, (plan, bad) in explained.items() if bad]
+    assert not failures, "\n".join(failures)